@@ -1,17 +1,22 @@
+import os
+import threading
+import time
+_IMPORT_STARTED = time.perf_counter()  # Reference point for the startup probe
+
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox, filedialog
 from datetime import datetime
-import database # Your database module
+import date_format
+from storage import SqliteStore
+from db_worker import DatabaseWorker
+from entry_cache import EntryCache
+from maintenance import MaintenanceScheduler
+from instrumentation import configure_logging, dump_spans, get_logger, recorder, span, timed
 import signal # <<< IMPORT SIGNAL MODULE
-import win32gui # Add this import for Windows-specific functionality
-import win32con # Add this import for Windows-specific functionality
-import win32api # Add this import for Windows-specific functionality
-import ctypes
-from ctypes import wintypes
-import json
+# win32gui/win32con and ctypes are imported in setup_window_style(), the only place using them
 # from PIL import Image # Uncomment if you add icons (and install Pillow: pip install Pillow)
-from views import SettingsView, LibraryView # Updated import
+from views import SettingsView, LibraryView, VirtualEntryList, DebugOverlay, RenderScheduler, EntryEditor # Updated import
 
 # --- App Configuration ---
 APP_NAME = "Code Journal"
@@ -33,6 +38,18 @@ COLOR_TITLE_BAR = "#FFFFFF"
 COLOR_CARD_BORDER = "#E0E0E0" 
 COLOR_DATE_TEXT = "#4B5563" 
 
+# Entries list: cards are recycled, so long content is clipped to a fixed card height
+ENTRY_CARD_MAX_CHARS = 400
+
+# Startup probe: time from importing this module to the first painted frame
+STARTUP_TARGET_MS = 300
+ENV_STARTUP_PROBE = "CODE_JOURNAL_STARTUP_PROBE"  # Print the time and exit (see benchmarks/bench_startup.py)
+
+# The automatic backup (see backup.py) waits until the app has settled after startup
+AUTO_BACKUP_DELAY_MS = 60_000
+
+log = get_logger("ui")
+
 # Win32 Constants
 GWL_STYLE = -16
 WS_MINIMIZEBOX = 0x00020000
@@ -43,9 +60,12 @@ WS_VISIBLE = 0x10000000
 GWLP_HWNDPARENT = -8
 
 class App(ctk.CTk):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, store=None, **kwargs):
         super().__init__(*args, **kwargs)
 
+        # Journal backend; anything implementing storage.JournalStore works
+        self.store = store if store is not None else SqliteStore()
+
         # Set up window properties
         self.title(APP_NAME)
         self.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
@@ -62,12 +82,18 @@ class App(ctk.CTk):
         # Force window to show in taskbar and Alt+Tab
         # self.after(100, self.setup_window_style) # Temporarily disabled for debugging double window issue
 
-        try:
-            database.create_table()
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Could not initialize database: {e}")
-            self.destroy()
-            return
+        # All database work runs on this worker; calls are queued in order, so
+        # the migration below finishes before any view's first query.
+        self.db_worker = DatabaseWorker(self, self.store)
+        # Day buckets and Entries windows, invalidated through the change bus
+        self.entry_cache = EntryCache(self.store)
+        self.db_worker.call(self.store.create_table, on_error=self._on_database_init_error)
+        # Long card lists are built in time slices; see views/render_scheduler.py
+        self.render_scheduler = RenderScheduler(self)
+        # WAL checkpoints, ANALYZE and vacuuming while the user is idle; see maintenance.py
+        self.maintenance = MaintenanceScheduler(self, self.db_worker, self.store)
+        for sequence in ("<KeyPress>", "<ButtonPress>", "<MouseWheel>"):
+            self.bind_all(sequence, self.maintenance.note_activity, add="+")
 
         # --- Fonts ---
         self.font_main = ctk.CTkFont(family="Inter", size=13)
@@ -83,9 +109,85 @@ class App(ctk.CTk):
         # --- Main Application Structure ---
         self.setup_main_content()
 
+        # Ctrl+Shift+D toggles a live view of operation timings
+        self.debug_overlay = None
+        self.bind_all("<Control-Shift-D>", self.toggle_debug_overlay)
+
+        self._first_paint_pending = True
+        self.bind("<Map>", self._on_first_map, add="+")
+
+    def _on_first_map(self, event):
+        if event.widget is self and self._first_paint_pending:
+            self._first_paint_pending = False
+            # Idle callbacks run in order, so this one runs after the widgets have drawn
+            self.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        elapsed_ms = (time.perf_counter() - _IMPORT_STARTED) * 1000
+        recorder.record("startup.first_paint", time.time() - elapsed_ms / 1000, elapsed_ms)
+        if elapsed_ms > STARTUP_TARGET_MS:
+            log.warning("First paint after %.0f ms (target %d ms)", elapsed_ms, STARTUP_TARGET_MS)
+        else:
+            log.info("First paint after %.0f ms", elapsed_ms)
+        if os.environ.get(ENV_STARTUP_PROBE):
+            print(f"first_paint_ms={elapsed_ms:.1f}", flush=True)
+            self.db_worker.shutdown()
+            self.destroy()
+            return
+        self.maintenance.start()
+        self.after(AUTO_BACKUP_DELAY_MS, self._start_auto_backup)
+
+    def _start_auto_backup(self):
+        """Back the journal up on a background thread if the last backup is old enough"""
+        db_path = getattr(self.store, "path", None)
+        if not db_path:
+            return
+        import backup  # Only needed once the app is up
+        try:
+            interval = backup.BackupManager.interval()
+            manager = backup.BackupManager.from_config(db_path)
+        except ValueError as e:
+            log.warning("Automatic backups disabled: %s", e)
+            return
+        if interval is None:
+            return
+
+        def run():
+            try:
+                if manager.is_due(interval):
+                    manager.backup()
+            except Exception:
+                log.exception("Automatic backup failed")
+
+        threading.Thread(target=run, name="auto-backup", daemon=True).start()
+
+    def reload_journal(self):
+        """Forget everything loaded from the journal after it was replaced (e.g. restored from a backup)"""
+        self.entry_cache.clear()
+        self._view_revisions.clear()
+        self._today_day = None  # The next Today load starts from an empty model
+        # Journal revisions may have gone backwards; let subscribers see the external change
+        self.db_worker.call(self.store.check_external_changes)
+
+    def toggle_debug_overlay(self, event=None):
+        if self.debug_overlay is not None and self.debug_overlay.winfo_exists():
+            self.debug_overlay.close()
+            self.debug_overlay = None
+        else:
+            self.debug_overlay = DebugOverlay(self)
+
+    def _on_database_init_error(self, error):
+        messagebox.showerror("Database Error", f"Could not initialize database: {error}")
+        self.db_worker.shutdown()
+        self.destroy()
+
     def setup_window_style(self):
         """Force window to show in taskbar and Alt+Tab"""
         try:
+            import ctypes
+            import win32con
+            import win32gui
+
             # Get window handle
             hwnd = self.winfo_id()
             
@@ -117,7 +219,7 @@ class App(ctk.CTk):
             self.update_idletasks()
             
         except Exception as e:
-            print(f"Error setting window style: {e}")
+            log.warning("Error setting window style: %s", e)
 
     def setup_main_content(self):
         """Set up the main content area"""
@@ -176,39 +278,46 @@ class App(ctk.CTk):
         self.main_content_container.grid_rowconfigure(0, weight=1)
 
         self.current_view_frame = None
-        self.views = {}
+        self.current_view_key = None
+        self.views = {}  # view key -> frame, filled in on first navigation
+        self._view_revisions = {}  # view key -> database revision it last loaded
+        # Views are built the first time they are shown, so startup only pays for the first one
+        self._view_factories = {
+            "new_entry": self._build_new_entry_view,
+            "entries": self._build_entries_view,
+            "today": self._build_today_view,
+            "library": lambda: LibraryView(parent_tk=self.main_content_container, app_instance=self, store=self.store),
+            "settings": lambda: SettingsView(parent_tk=self.main_content_container, app_instance=self, store=self.store),
+        }
+
+    def get_view(self, view_key):
+        """Return the frame for view_key, building it on first use (None if unknown)."""
+        view_frame = self.views.get(view_key)
+        if view_frame is None and view_key in self._view_factories:
+            with span(f"view.{view_key}.build"):
+                view_frame = self._view_factories[view_key]()
+            view_frame.grid(row=0, column=0, sticky="nsew", in_=self.main_content_container)
+            view_frame.grid_remove()  # Hidden until switch_to_view() shows it
+            self.views[view_key] = view_frame
+        return view_frame
 
-        # Initialize all views
+    def _build_new_entry_view(self):
         self.view_new_entry = ctk.CTkFrame(self.main_content_container, fg_color=COLOR_CONTENT_BACKGROUND, corner_radius=12)
         self.setup_new_entry_view_widgets(self.view_new_entry)
-        self.views["new_entry"] = self.view_new_entry
+        return self.view_new_entry
 
+    def _build_entries_view(self):
         self.view_entries = ctk.CTkFrame(self.main_content_container, fg_color=COLOR_CONTENT_BACKGROUND, corner_radius=12)
         self.setup_entries_view_widgets(self.view_entries)
-        self.views["entries"] = self.view_entries
-        
+        return self.view_entries
+
+    def _build_today_view(self):
         self.view_today = ctk.CTkFrame(self.main_content_container, fg_color=COLOR_CONTENT_BACKGROUND, corner_radius=12)
         self.setup_today_view(self.view_today)
-        self.views["today"] = self.view_today
-
-        # Initialize Library and Settings Views using their new classes
-        self.view_library = LibraryView(parent_tk=self.main_content_container, app_instance=self, database=database)
-        self.views["library"] = self.view_library
-
-        self.view_settings = SettingsView(parent_tk=self.main_content_container, app_instance=self, database=database)
-        self.views["settings"] = self.view_settings
-
-        # Configure all views
-        for view_key, view_frame in self.views.items():
-            view_frame.grid(row=0, column=0, sticky="nsew", in_=self.main_content_container)
-            view_frame.grid_remove()  # Hide them initially
-        
-        # Show initial view (Today view)
-        self.show_today_view()
+        return self.view_today
 
     def setup_today_view(self, parent_frame):
         """Setup the Today view to show today's entries."""
-        print("Setting up Today view...")  # Debug print
         parent_frame.grid_columnconfigure(0, weight=1)
         parent_frame.grid_rowconfigure(1, weight=1)
 
@@ -232,10 +341,8 @@ class App(ctk.CTk):
             anchor="w"
         )
         title.grid(row=0, column=0, sticky="w")
-        print("Title created and gridded")  # Debug print
 
         # Refresh button
-        print("Creating refresh button...")  # Debug print
         self.refresh_button = ctk.CTkButton(
             header_frame,
             text="↻ Refresh",
@@ -248,12 +355,6 @@ class App(ctk.CTk):
             corner_radius=8
         )
         self.refresh_button.grid(row=0, column=1, sticky="e", padx=(10, 0))
-        print("Refresh button created and gridded")  # Debug print
-
-        # Force update of header frame
-        header_frame.update_idletasks()
-        print(f"Header frame dimensions: {header_frame.winfo_width()}x{header_frame.winfo_height()}")  # Debug print
-        print(f"Refresh button dimensions: {self.refresh_button.winfo_width()}x{self.refresh_button.winfo_height()}")  # Debug print
 
         # Main content area
         content_frame = ctk.CTkFrame(parent_frame, fg_color=COLOR_APP_BACKGROUND, corner_radius=12)
@@ -280,89 +381,204 @@ class App(ctk.CTk):
         self.today_entries_scrollable.grid(row=1, column=0, padx=20, pady=(0,20), sticky="nsew")
         self.today_entries_scrollable.grid_columnconfigure(0, weight=1)
 
-        # Load today's entries
-        self.load_today_entries()
-        print("Today view setup complete")  # Debug print
+        # Keyed model of the cards currently shown (see load_today_entries)
+        self._today_day = None
+        self._today_cards = {}
+        self._today_revision = None
+        self._today_message_label = None
+        self._today_load_seq = 0
+        # Today's entries are loaded by show_today_view()
 
     def refresh_today_entries(self):
         """Refresh today's entries with visual feedback"""
-        # Disable button and show loading state
+        # Disable button and show loading state until the query comes back
         self.refresh_button.configure(state="disabled", text="Refreshing...")
-        
-        # Schedule the actual refresh after a short delay to show the button state
-        self.after(100, self._perform_refresh)
+        self.load_today_entries(on_done=self._on_refresh_done)
 
-    def _perform_refresh(self):
-        """Perform the actual refresh operation"""
-        try:
-            self.load_today_entries()
-        finally:
-            # Re-enable button and restore text
-            self.refresh_button.configure(state="normal", text="↻ Refresh")
-            
-            # Show a subtle visual confirmation
-            self.refresh_button.configure(fg_color=COLOR_PRIMARY_HOVER)
-            self.after(200, lambda: self.refresh_button.configure(fg_color=COLOR_PRIMARY))
+    def _on_refresh_done(self):
+        """Restore the refresh button once the entries are shown"""
+        # Re-enable button and restore text
+        self.refresh_button.configure(state="normal", text="↻ Refresh")
+        
+        # Show a subtle visual confirmation
+        self.refresh_button.configure(fg_color=COLOR_PRIMARY_HOVER)
+        self.after(200, lambda: self.refresh_button.configure(fg_color=COLOR_PRIMARY))
+
+    def load_today_entries(self, on_done=None):
+        """Bring the Today view up to date with the database.
+
+        The view keeps a keyed model of its cards (entry id -> card) and only
+        asks the database worker for the day's ids plus the rows added or
+        edited since the newest journal revision it has shown, then patches
+        the cards in place. on_done, if given, is
+        called on the Tk thread once the view is updated (or an error is shown).
+        """
+        self._today_load_seq += 1
+        load_seq = self._today_load_seq
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        if today != self._today_day:
+            # New day (or first load): start from an empty model
+            self._clear_today_cards()
+            self._today_day = today
+            self._show_today_message("Loading today's entries...")
+
+        log.debug("Loading entries for %s", today)
+
+        def on_success(changes):
+            if load_seq == self._today_load_seq and today == self._today_day:
+                self._apply_today_changes(*changes)
+            if on_done:
+                on_done()
+
+        def on_error(error):
+            if load_seq == self._today_load_seq:
+                self._render_today_error(error)
+            if on_done:
+                on_done()
+
+        changes = self.entry_cache.peek_day_changes(today, self._today_revision)
+        if changes is not None:
+            on_success(changes)
+            return
+        self.db_worker.call(self.entry_cache.get_day_changes, today, self._today_revision,
+                            on_success=on_success, on_error=on_error)
 
-    def load_today_entries(self):
-        """Load and display today's entries in the Today view."""
-        # Clear existing entries
+    def _clear_today_cards(self):
+        self.render_scheduler.cancel("today")
         for widget in self.today_entries_scrollable.winfo_children():
             widget.destroy()
-
-        try:
-            today = datetime.now().strftime("%Y-%m-%d")
-            print(f"Loading entries for date: {today}")  # Debug log
-            entries = database.get_entries_by_date(today)
-            print(f"Found {len(entries)} entries")  # Debug log
-
-            if not entries:
-                no_entries_label = ctk.CTkLabel(self.today_entries_scrollable,
-                                              text="No entries for today yet. Click 'New Entry' to add one!",
-                                              font=self.font_main,
-                                              text_color=COLOR_TEXT_SECONDARY)
-                no_entries_label.pack(padx=10, pady=20)
+        self._today_cards = {}
+        self._today_revision = None
+        self._today_message_label = None
+
+    def _show_today_message(self, text, text_color=COLOR_TEXT_SECONDARY):
+        if self._today_message_label is None:
+            self._today_message_label = ctk.CTkLabel(self.today_entries_scrollable, text=text,
+                                                     font=self.font_main, text_color=text_color)
+            self._today_message_label.pack(padx=10, pady=20)
+        else:
+            self._today_message_label.configure(text=text, text_color=text_color)
+
+    def _hide_today_message(self):
+        if self._today_message_label is not None:
+            self._today_message_label.destroy()
+            self._today_message_label = None
+
+    @timed("view.today.apply_changes")
+    def _apply_today_changes(self, ids, changed_entries):
+        """Patch the Today cards: drop deleted entries, refresh edited ones, insert new ones at the top.
+
+        New cards are built through the render scheduler: the first screenful
+        at once, the rest in time slices. A still-running build is completed
+        first so the model is whole before it is diffed.
+        """
+        self.render_scheduler.finish("today")
+        current_ids = set(ids)
+        for entry_id in [entry_id for entry_id in self._today_cards if entry_id not in current_ids]:
+            self._today_cards.pop(entry_id).destroy()
+
+        known_ids = set(self._today_cards).union(entry.id for entry in changed_entries)
+        if changed_entries:
+            self._today_revision = max(self._today_revision or 0, max(entry.revision for entry in changed_entries))
+        new_entries = []
+        for entry in changed_entries:
+            card = self._today_cards.get(entry.id)
+            if card is None:
+                new_entries.append(entry)
             else:
-                for entry in entries:
-                    entry_card = ctk.CTkFrame(self.today_entries_scrollable,
-                                            fg_color=COLOR_CONTENT_BACKGROUND,
-                                            border_width=1,
-                                            border_color=COLOR_CARD_BORDER,
-                                            corner_radius=10)
-                    entry_card.pack(fill="x", padx=0, pady=(0,10))
-
-                    # Format time using created_at if available, otherwise use date
-                    try:
-                        time_str = entry.get('created_at', entry['date'])
-                        time_obj = datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
-                        formatted_time = time_obj.strftime("%I:%M %p")
-                    except (ValueError, TypeError) as e:
-                        print(f"Error formatting time: {e}")  # Debug log
-                        formatted_time = ""
-
-                    time_label = ctk.CTkLabel(entry_card,
-                                            text=formatted_time,
-                                            font=self.font_entry_date,
-                                            text_color=COLOR_DATE_TEXT,
-                                            anchor="w")
-                    time_label.pack(fill="x", padx=15, pady=(10,5))
-
-                    content_label = ctk.CTkLabel(entry_card,
-                                               text=entry['content'],
-                                               font=self.font_entry_content,
-                                               text_color=COLOR_TEXT_PRIMARY,
-                                               wraplength=self.today_entries_scrollable.winfo_width() - 60,
-                                               justify="left",
-                                               anchor="w")
-                    content_label.pack(fill="x", padx=15, pady=(0,10))
+                self._fill_today_card(card, entry)
+
+        first_existing = next(iter(self._today_cards.values()), None)
+        if not current_ids <= known_ids or (
+                new_entries and first_existing is not None
+                and (new_entries[-1].created_ts, new_entries[-1].id) < first_existing.sort_key):
+            # Rows we never saw, or entries restored or moved onto today that
+            # belong below the top card; rebuild from scratch.
+            self._today_day = None
+            self.load_today_entries()
+            return
 
-        except Exception as e:
-            print(f"Error in load_today_entries: {e}")  # Debug log
-            error_label = ctk.CTkLabel(self.today_entries_scrollable,
-                                     text=f"Error loading entries: {e}",
-                                     font=self.font_main,
-                                     text_color="red")
-            error_label.pack(padx=10, pady=20)
+        log.debug("Found %d new entries", len(new_entries))
+
+        if not new_entries:
+            if not self._today_cards:
+                self._show_today_message("No entries for today yet. Click 'New Entry' to add one!")
+            return
+
+        self._hide_today_message()
+        new_cards = {}
+
+        def build(entry):
+            card = self._create_today_card(entry)
+            if first_existing is not None:
+                card.pack(fill="x", padx=0, pady=(0,10), before=first_existing)
+            else:
+                card.pack(fill="x", padx=0, pady=(0,10))
+            new_cards[entry.id] = card
+
+        def merge():
+            # Keep the model in display order (newest first)
+            new_cards.update(self._today_cards)
+            self._today_cards = new_cards
+
+        def on_cancel():
+            merge()
+            # Older new entries were never built; rebuild the day when it is shown again
+            self._today_day = None
+            self._view_revisions.pop("today", None)
+
+        self.render_scheduler.submit("today", new_entries, build, on_done=merge, on_cancel=on_cancel)
+
+    def _create_today_card(self, entry):
+        entry_card = ctk.CTkFrame(self.today_entries_scrollable,
+                                fg_color=COLOR_CONTENT_BACKGROUND,
+                                border_width=1,
+                                border_color=COLOR_CARD_BORDER,
+                                corner_radius=10)
+
+        header = self._create_card_header(entry_card)
+        formatted_time = date_format.format_time(entry.created_ts)
+        time_label = ctk.CTkLabel(header,
+                                text=formatted_time,
+                                font=self.font_entry_date,
+                                text_color=COLOR_DATE_TEXT,
+                                anchor="w")
+        time_label.pack(side="left", fill="x", expand=True)
+
+        entry_card.content_label = ctk.CTkLabel(entry_card,
+                                   text="",
+                                   font=self.font_entry_content,
+                                   text_color=COLOR_TEXT_PRIMARY,
+                                   wraplength=self.today_entries_scrollable.winfo_width() - 60,
+                                   justify="left",
+                                   anchor="w")
+        entry_card.content_label.pack(fill="x", padx=15, pady=(0,10))
+        self._fill_today_card(entry_card, entry)
+        return entry_card
+
+    def _fill_today_card(self, entry_card, entry):
+        entry_card.entry = entry
+        entry_card.sort_key = (entry.created_ts, entry.id)
+        entry_card.content_label.configure(text=entry.content)
+
+    def _create_card_header(self, entry_card):
+        """Header row of an entry card with Edit/Delete buttons acting on entry_card.entry"""
+        header = ctk.CTkFrame(entry_card, fg_color="transparent")
+        header.pack(fill="x", padx=15, pady=(10,5))
+        for text, action in (("Delete", self.delete_entry), ("Edit", self.edit_entry)):
+            ctk.CTkButton(header, text=text, width=56, height=22, font=self.font_main,
+                          fg_color="transparent", text_color=COLOR_TEXT_SECONDARY,
+                          hover_color=COLOR_APP_BACKGROUND,
+                          command=lambda action=action: entry_card.entry and action(entry_card.entry)
+                          ).pack(side="right", padx=(5,0))
+        return header
+
+    def _render_today_error(self, e):
+        log.error("Error in load_today_entries: %s", e)
+        self._clear_today_cards()
+        self._today_day = None
+        self._show_today_message(f"Error loading entries: {e}", text_color="red")
 
     def setup_new_entry_view_widgets(self, parent_frame):
         parent_frame.grid_columnconfigure(0, weight=1) 
@@ -399,16 +615,74 @@ class App(ctk.CTk):
         title = ctk.CTkLabel(parent_frame, text="Your Journal Entries", font=self.font_header, text_color=COLOR_TEXT_PRIMARY)
         title.grid(row=0, column=0, padx=30, pady=(30,15), sticky="w")
         
-        self.entries_scrollable_frame = ctk.CTkScrollableFrame(parent_frame, fg_color="transparent",
-                                                               border_width=0, corner_radius=0)
-        self.entries_scrollable_frame.grid(row=1, column=0, padx=30, pady=(0,30), sticky="nsew")
-        self.entries_scrollable_frame.grid_columnconfigure(0, weight=1)
+        self.entries_list = VirtualEntryList(parent_frame,
+                                             fetch_rows=self._fetch_entry_rows,
+                                             count_rows=self._count_entry_rows,
+                                             create_card=self._create_entry_card,
+                                             fill_card=self._fill_entry_card,
+                                             empty_text="No entries yet. Add your first one!",
+                                             font=self.font_main, empty_text_color=COLOR_TEXT_SECONDARY,
+                                             fg_color="transparent", corner_radius=0)
+        self.entries_list.grid(row=1, column=0, padx=30, pady=(0,30), sticky="nsew")
+
+    def _fetch_entry_rows(self, offset, limit, callback):
+        rows = self.entry_cache.peek_page(offset, limit)
+        if rows is not None:
+            callback(rows)
+            return
+        self.db_worker.call(self.entry_cache.get_entries_page, offset, limit,
+                            on_success=callback, on_error=lambda e: callback(None))
+
+    def _count_entry_rows(self, callback):
+        count = self.entry_cache.peek_count()
+        if count is not None:
+            callback(count)
+            return
+        def on_error(e):
+            callback(None)
+            messagebox.showerror("Database Error", f"Failed to load entries: {e}")
+        self.db_worker.call(self.entry_cache.count_entries, on_success=callback, on_error=on_error)
+
+    def _create_entry_card(self, parent):
+        """Create a reusable card for the Entries list."""
+        entry_card = ctk.CTkFrame(parent, fg_color=COLOR_CONTENT_BACKGROUND,
+                                  border_width=1, border_color=COLOR_CARD_BORDER, corner_radius=10)
+        entry_card.entry = None
+        header = self._create_card_header(entry_card)
+        entry_card.date_label = ctk.CTkLabel(header, text="", font=self.font_entry_date,
+                                             text_color=COLOR_DATE_TEXT, anchor="w")
+        entry_card.date_label.pack(side="left", fill="x", expand=True)
+        entry_card.content_label = ctk.CTkLabel(entry_card, text="", font=self.font_entry_content,
+                                                text_color=COLOR_TEXT_PRIMARY, justify="left", anchor="nw")
+        entry_card.content_label.pack(fill="both", expand=True, padx=15, pady=(0, 10))
+        return entry_card
+
+    def _fill_entry_card(self, entry_card, entry_data, wraplength):
+        """Show an entry in a pooled card. Long content is clipped to the card height."""
+        entry_card.entry = entry_data
+        if entry_data is None:
+            entry_card.date_label.configure(text="")
+            entry_card.content_label.configure(text="Loading...", wraplength=wraplength)
+            return
+
+        formatted_date = date_format.format_day(entry_data.day_number)
+
+        content = entry_data.content
+        if len(content) > ENTRY_CARD_MAX_CHARS:
+            content = content[:ENTRY_CARD_MAX_CHARS].rstrip() + "…"
+
+        entry_card.date_label.configure(text=formatted_date)
+        entry_card.content_label.configure(text=content, wraplength=wraplength)
 
     def switch_to_view(self, view_key_name):
         if self.current_view_frame:
+            if self.current_view_key != view_key_name:
+                # Don't keep building cards for a view that is no longer visible
+                self.render_scheduler.cancel(self.current_view_key)
             self.current_view_frame.grid_remove()
         
-        self.current_view_frame = self.views.get(view_key_name)
+        self.current_view_key = view_key_name
+        self.current_view_frame = self.get_view(view_key_name)
         if self.current_view_frame:
             self.current_view_frame.grid()
             self.current_view_frame.lift()
@@ -416,7 +690,7 @@ class App(ctk.CTk):
                 self.current_view_frame.refresh()
             self.update_active_nav_button_style(view_key_name)
         else:
-            print(f"Error: View '{view_key_name}' not found.")
+            log.error("View %r not found", view_key_name)
 
     def update_active_nav_button_style(self, active_view_key=None):
         view_key_to_nav_button_text = {
@@ -438,19 +712,28 @@ class App(ctk.CTk):
         else:
             self.new_entry_button_sidebar.configure(fg_color=COLOR_PRIMARY)
 
+    def refresh_if_stale(self, view_key, reload):
+        """Run reload() only if the journal changed since view_key last loaded.
+
+        Commits from other processes are picked up on the database worker
+        first; an unchanged view is shown as is, without touching its widgets.
+        """
+        def check(_event):
+            revision = self.store.current_revision()
+            if self._view_revisions.get(view_key) != revision:
+                self._view_revisions[view_key] = revision
+                reload()
+        self.db_worker.call(self.store.check_external_changes, on_success=check)
+
     def show_new_entry_view(self): self.switch_to_view("new_entry")
-    def show_entries_view(self): self.action_load_entries_into_display(); self.switch_to_view("entries")
+    def show_entries_view(self):
+        self.switch_to_view("entries")
+        self.refresh_if_stale("entries", self.action_load_entries_into_display)
     def show_today_view(self): 
-        print("Switching to Today view...")  # Debug print
         self.switch_to_view("today")
-        self.load_today_entries()  # Ensure entries are loaded when switching to Today view
-        
-        # Force update of the refresh button if it exists
-        if hasattr(self, 'refresh_button'):
-            print("Updating refresh button...")  # Debug print
-            self.refresh_button.lift()  # Ensure button is on top
-            self.refresh_button.update_idletasks()
-            print("Refresh button updated")  # Debug print
+        if self._today_day != datetime.now().strftime("%Y-%m-%d"):
+            self._view_revisions.pop("today", None)  # The date rolled over
+        self.refresh_if_stale("today", self.load_today_entries)
     def show_library_view(self): self.switch_to_view("library")
     def show_settings_view(self): self.switch_to_view("settings")
 
@@ -462,97 +745,86 @@ class App(ctk.CTk):
         try: datetime.strptime(date_str, "%Y-%m-%d")
         except ValueError: messagebox.showwarning("Input Error", "Invalid date format. Please use YYYY-MM-DD."); return
         
-        try:
-            database.add_entry(content, date_str)
-            messagebox.showinfo("Success", "Entry added successfully!")
-            self.new_entry_content_textbox.delete("1.0", "end")
-            self.new_entry_date_var.set(datetime.now().strftime("%Y-%m-%d")) 
-            
-            if self.views["entries"] == self.current_view_frame: 
-                self.action_load_entries_into_display()
-            if self.views["today"] == self.current_view_frame:
-                self.load_today_entries()
-                
-        except Exception as e: messagebox.showerror("Database Error", f"Failed to add entry: {e}")
+        self.add_entry_submit_button.configure(state="disabled")
+        self.db_worker.call(self.store.add_entry, content, date_str,
+                            on_success=lambda result: self._on_entry_added(),
+                            on_error=self._on_add_entry_error)
+
+    def _on_entry_added(self):
+        self.add_entry_submit_button.configure(state="normal")
+        messagebox.showinfo("Success", "Entry added successfully!")
+        self.new_entry_content_textbox.delete("1.0", "end")
+        self.new_entry_date_var.set(datetime.now().strftime("%Y-%m-%d")) 
+        
+        if self.views.get("entries") is self.current_view_frame:
+            self.refresh_if_stale("entries", self.action_load_entries_into_display)
+        if self.views.get("today") is self.current_view_frame:
+            self.refresh_if_stale("today", self.load_today_entries)
+
+    def edit_entry(self, entry):
+        EntryEditor(self, entry, on_saved=lambda updated: self._on_entry_changed())
+
+    def delete_entry(self, entry):
+        if not messagebox.askyesno("Delete Entry", "Delete this entry? It can be restored from the command line."):
+            return
+        self.db_worker.call(self.store.delete_entry, entry.id,
+                            on_success=lambda result: self._on_entry_changed(),
+                            on_error=lambda e: messagebox.showerror("Database Error", f"Failed to delete entry: {e}"))
+
+    def _on_entry_changed(self):
+        """Bring the visible view up to date after an edit or delete"""
+        if self.views.get("entries") is self.current_view_frame:
+            self.refresh_if_stale("entries", self.action_load_entries_into_display)
+        elif self.views.get("today") is self.current_view_frame:
+            self.refresh_if_stale("today", self.load_today_entries)
+        elif self.current_view_frame is not None and hasattr(self.current_view_frame, 'refresh'):
+            self.current_view_frame.refresh()
+
+    def _on_add_entry_error(self, e):
+        self.add_entry_submit_button.configure(state="normal")
+        messagebox.showerror("Database Error", f"Failed to add entry: {e}")
 
     def action_load_entries_into_display(self):
-        for widget in self.entries_scrollable_frame.winfo_children():
-            widget.destroy()
-        try:
-            entries = database.get_entries() 
-            if not entries:
-                no_entries_label = ctk.CTkLabel(self.entries_scrollable_frame, text="No entries yet. Add your first one!",
-                                                font=self.font_main, text_color=COLOR_TEXT_SECONDARY)
-                no_entries_label.pack(padx=10, pady=20)
-            else:
-                # Calculate dynamic wraplength once, or bind to configure event for responsiveness
-                # For simplicity here, we estimate based on typical window width and padding
-                try:
-                    # Ensure the scrollable frame has a width before calculating
-                    self.entries_scrollable_frame.update_idletasks() 
-                    base_wraplength = self.entries_scrollable_frame.winfo_width() - 60 # (padx 15*2 + some buffer)
-                    if base_wraplength <= 0: base_wraplength = 500 # Fallback if width isn't available yet
-                except tk.TclError: # Can happen if widget is not yet mapped
-                    base_wraplength = 500
-
-
-                for entry_data in entries:
-                    entry_card = ctk.CTkFrame(self.entries_scrollable_frame, fg_color=COLOR_CONTENT_BACKGROUND,
-                                              border_width=1, border_color=COLOR_CARD_BORDER, corner_radius=10)
-                    entry_card.pack(fill="x", padx=0, pady=(0,10)) 
-
-                    try:
-                        date_obj = datetime.strptime(entry_data['date'], "%Y-%m-%d")
-                        formatted_date = date_obj.strftime("%B %d, %Y") 
-                    except ValueError:
-                        formatted_date = entry_data['date'] 
-
-                    date_label = ctk.CTkLabel(entry_card, text=formatted_date, font=self.font_entry_date,
-                                              text_color=COLOR_DATE_TEXT, anchor="w")
-                    date_label.pack(fill="x", padx=15, pady=(10, 5))
-
-                    content_label = ctk.CTkLabel(entry_card, text=entry_data['content'], font=self.font_entry_content,
-                                                 text_color=COLOR_TEXT_PRIMARY, wraplength=base_wraplength, 
-                                                 justify="left", anchor="w")
-                    content_label.pack(fill="x", padx=15, pady=(0, 10))
-                    
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Failed to load entries: {e}")
-            error_label = ctk.CTkLabel(self.entries_scrollable_frame, text=f"Error loading entries: {e}",
-                                       font=self.font_main, text_color="red")
-            error_label.pack(padx=10, pady=20)
+        self.entries_list.reload()
 
     def on_closing(self, from_interrupt=False):
         do_close = False
         if from_interrupt:
-            print("Closing application due to interrupt signal...")
+            log.info("Closing application due to interrupt signal")
             do_close = True # Force close without prompt for Ctrl+C
         else:
             if messagebox.askokcancel("Quit", "Do you want to quit Code Journal?"):
                 do_close = True
         
         if do_close:
-            print("Performing cleanup before exit...")
+            log.info("Performing cleanup before exit")
             try:
-                # Assuming database.py has a close_connection for the current thread's connection
-                database.close_connection() 
-                print("Database connection for this thread closed (if one was active).")
-            except AttributeError:
-                print("database.close_connection() not found or not needed.") # In case it's not defined
+                # Let queued writes finish; the worker closes its own connection.
+                # SQLite suggests PRAGMA optimize before closing a long-lived connection
+                self.maintenance.stop()
+                self.db_worker.submit(self.store.run_maintenance, ("optimize",))
+                self.db_worker.shutdown()
+                self.store.close_connection()
+                log.info("Database connections closed")
             except Exception as e:
-                print(f"Error during database.close_connection(): {e}")
+                log.error("Error while closing the database: %s", e)
+            try:
+                dump_spans()  # Only if $CODE_JOURNAL_SPANS_DUMP is set
+            except OSError as e:
+                log.warning("Could not write span dump: %s", e)
             
             self.destroy() # This will terminate the mainloop
 
     def handle_sigint(self, signum, frame):
         """Handles SIGINT signal (e.g., Ctrl+C from terminal)."""
-        print("\nCtrl+C detected. Initiating graceful shutdown...")
+        log.info("Ctrl+C detected, shutting down")
         # Schedule the on_closing method to be called safely in the Tkinter main thread
         # Pass True to indicate it's from an interrupt, bypassing the confirmation dialog.
         self.after(0, self.on_closing, True)
 
 
 if __name__ == "__main__":
+    configure_logging()
     ctk.set_appearance_mode("Light") 
     app = App()
     
@@ -563,8 +835,8 @@ if __name__ == "__main__":
     try:
         app.mainloop()
     except SystemExit: # Can be raised by app.destroy() or other exit mechanisms
-        print("Application exited via SystemExit.")
+        log.info("Application exited via SystemExit")
     except Exception as e:
-        print(f"Unhandled exception in main loop: {e}")
+        log.exception("Unhandled exception in main loop: %s", e)
     finally:
-        print("Application has shut down.")
\ No newline at end of file
+        log.info("Application has shut down")
\ No newline at end of file
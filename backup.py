@@ -0,0 +1,420 @@
+"""
+Online backups and snapshots of the journal database.
+
+Backups are taken with SQLite's online backup API while the app keeps
+running: the source is read inside one read transaction (a consistent
+snapshot that, in WAL mode, does not block writers) and copied a few
+megabytes of pages per step, so the calling thread can report progress and
+stop between steps. sqlite3 releases the GIL during each step, which keeps
+the Tk loop responsive when a backup runs on a worker thread. Every copy is
+written to a '.part' file, checked with PRAGMA quick_check and only then
+renamed into place.
+
+Backups live in a "backups" folder next to the database and are named
+'<db name>-YYYYMMDD-HHMMSS.db'. After each backup the folder is pruned:
+the newest backup of each of the last keep_daily days and of each of the
+last keep_weekly ISO weeks are kept, plus the newest one overall. A compact
+snapshot ('...-compact.db') is written with VACUUM INTO instead, which drops
+free pages and defragments the tables but cannot report progress. Snapshots
+and pre-restore backups are taken on request and never pruned.
+
+Restoring is a verified swap. The chosen backup is integrity-checked, copied
+to a staging file and migrated to the current schema there, and the current
+journal is saved as a '...-pre-restore.db' backup. Then the staging copy is
+written over the live database in a single write transaction, so open
+connections simply see the restored data and a failure leaves the journal as
+it was.
+
+Settings are read from the "backups" object of the config file (see
+db_config.py)::
+
+    {"backups": {"directory": "~/journal-backups", "keep_daily": 7, "keep_weekly": 4, "interval_hours": 24}}
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import database
+import db_config
+import migrations
+import write_lock
+from instrumentation import get_logger, span
+from journal_io import JobCancelled
+
+BACKUP_DIR_NAME = "backups"
+KINDS = ("backup", "compact", "pre-restore")
+DEFAULT_KEEP_DAILY = 7
+DEFAULT_KEEP_WEEKLY = 4
+DEFAULT_INTERVAL_HOURS = 24
+# 1024 pages is 4 MiB at the default page size: short steps, few round trips
+DEFAULT_PAGES_PER_STEP = 1024
+# How many SQLite VM instructions run between cancel checks during checks and VACUUM INTO
+_CANCEL_CHECK_OPS = 100_000
+_STAMP_FORMAT = "%Y%m%d-%H%M%S"
+log = get_logger("backup")
+
+
+class BackupError(Exception):
+    """A backup or restore candidate failed verification."""
+
+
+class BackupInfo(NamedTuple):
+    """A backup file in the backup directory."""
+    path: str
+    created: datetime
+    kind: str  # one of KINDS
+    size_bytes: int
+
+
+def _check_cancel(cancel: Optional[threading.Event]) -> None:
+    if cancel is not None and cancel.is_set():
+        raise JobCancelled()
+
+
+def _cancellable(conn: sqlite3.Connection, cancel: Optional[threading.Event]) -> None:
+    """Make long statements on conn stop with 'interrupted' once cancel is set."""
+    if cancel is not None:
+        conn.set_progress_handler(cancel.is_set, _CANCEL_CHECK_OPS)
+
+
+def _remove(path: str) -> None:
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def copy_database(source: sqlite3.Connection, target: sqlite3.Connection,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  cancel: Optional[threading.Event] = None,
+                  pages_per_step: int = DEFAULT_PAGES_PER_STEP) -> int:
+    """Copy source into target with the backup API and return the page count.
+
+    The copy runs inside a read transaction on source, so it is a snapshot
+    even while other connections write. progress(copied_pages, total_pages)
+    is called after each step; setting cancel stops the copy at the next
+    step, and a copy that stops early leaves target unchanged.
+    """
+    pages = [0]
+
+    def step(_status, remaining, total):
+        pages[0] = total
+        if progress:
+            progress(total - remaining, total)
+        _check_cancel(cancel)
+
+    began = not source.in_transaction
+    if began:
+        source.execute("BEGIN;")
+        source.execute("SELECT COUNT(*) FROM sqlite_master;")  # Starts the read snapshot
+    try:
+        source.backup(target, pages=pages_per_step, progress=step)
+    finally:
+        if began:
+            source.rollback()
+    return pages[0]
+
+
+def verify_database(path: str, full: bool = False, cancel: Optional[threading.Event] = None) -> int:
+    """Check that path is a healthy journal this app can open; return its schema version.
+
+    quick_check by default; full runs integrity_check, which also compares
+    every index with its table. Raises BackupError on any problem.
+    """
+    if not os.path.isfile(path):
+        raise BackupError(f"{path} does not exist")
+    try:
+        conn = sqlite3.connect(database.read_only_uri(path), uri=True)
+    except sqlite3.Error as e:
+        raise BackupError(f"{path} cannot be opened: {e}") from None
+    try:
+        _cancellable(conn, cancel)
+        check = "integrity_check" if full else "quick_check"
+        problems = [row[0] for row in conn.execute(f"PRAGMA {check}(20);")]
+        if problems != ["ok"]:
+            raise BackupError(f"{path} is damaged: {'; '.join(problems)}")
+        version = migrations.get_user_version(conn)
+        if version > migrations.SCHEMA_VERSION:
+            raise BackupError(f"{path} has schema version {version}, newer than this application supports "
+                              f"({migrations.SCHEMA_VERSION})")
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries';").fetchone():
+            raise BackupError(f"{path} is not a Code Journal database")
+        return version
+    except sqlite3.OperationalError as e:
+        if cancel is not None and cancel.is_set():
+            raise JobCancelled() from None
+        raise BackupError(f"{path} cannot be read: {e}") from None
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f"{path} is not a valid database: {e}") from None
+    finally:
+        conn.close()
+
+
+def select_kept(backups: List[BackupInfo], keep_daily: int, keep_weekly: int) -> List[BackupInfo]:
+    """The backups a keep_daily/keep_weekly rotation keeps, newest first."""
+    ordered = sorted(backups, key=lambda info: info.created, reverse=True)
+    kept = ordered[:1]
+    days, weeks = set(), set()
+    for info in ordered:
+        day = info.created.date()
+        week = day.isocalendar()[:2]
+        keep = False
+        if day not in days and len(days) < keep_daily:
+            days.add(day)
+            keep = True
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks.add(week)
+            keep = True
+        if keep and info not in kept:
+            kept.append(info)
+    return kept
+
+
+class BackupManager:
+    """Takes, lists, prunes and restores backups of one database file.
+
+    The methods block; the app runs them on a worker thread. They open their
+    own connections, so they can run next to the database worker.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, directory: Optional[str] = None,
+                 keep_daily: int = DEFAULT_KEEP_DAILY, keep_weekly: int = DEFAULT_KEEP_WEEKLY,
+                 pages_per_step: int = DEFAULT_PAGES_PER_STEP):
+        self.db_path = db_path or database.database_path()
+        self.directory = directory or os.path.join(os.path.dirname(os.path.abspath(self.db_path)),
+                                                   BACKUP_DIR_NAME)
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+        self.pages_per_step = pages_per_step
+        stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        self._stem = stem
+        self._name_re = re.compile(
+            rf"^{re.escape(stem)}-(\d{{8}}-\d{{6}})(?:-(\d+))?(?:-(compact|pre-restore))?\.db$")
+
+    @classmethod
+    def from_config(cls, db_path: Optional[str] = None,
+                    config: Optional[Dict[str, Any]] = None) -> "BackupManager":
+        """A manager with the "backups" settings of the config file."""
+        if config is None:
+            config = db_config.load_config()
+        settings = config.get("backups", {})
+        directory = settings.get("directory")
+        try:
+            return cls(db_path, os.path.expanduser(directory) if directory else None,
+                       keep_daily=int(settings.get("keep_daily", DEFAULT_KEEP_DAILY)),
+                       keep_weekly=int(settings.get("keep_weekly", DEFAULT_KEEP_WEEKLY)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid backup setting: {e}") from None
+
+    @staticmethod
+    def interval(config: Optional[Dict[str, Any]] = None) -> Optional[timedelta]:
+        """How often the app backs up on its own; None when automatic backups are off."""
+        if config is None:
+            config = db_config.load_config()
+        hours = float(config.get("backups", {}).get("interval_hours", DEFAULT_INTERVAL_HOURS))
+        return timedelta(hours=hours) if hours > 0 else None
+
+    # --- Listing ---
+
+    def list_backups(self) -> List[BackupInfo]:
+        """Backups in the backup directory, newest first."""
+        backups = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            match = self._name_re.match(name)
+            if not match:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue  # Removed meanwhile
+            created = datetime.strptime(match.group(1), _STAMP_FORMAT)
+            backups.append(BackupInfo(path, created, match.group(3) or "backup", size))
+        backups.sort(key=lambda info: (info.created, info.path), reverse=True)
+        return backups
+
+    def latest(self) -> Optional[BackupInfo]:
+        backups = self.list_backups()
+        return backups[0] if backups else None
+
+    def is_due(self, interval: timedelta, now: Optional[datetime] = None) -> bool:
+        """Whether the newest backup is older than interval (or there is none)."""
+        latest = self.latest()
+        return latest is None or (now or datetime.now()) - latest.created >= interval
+
+    def _new_path(self, kind: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime(_STAMP_FORMAT)
+        suffix = "" if kind == "backup" else f"-{kind}"
+        path = os.path.join(self.directory, f"{self._stem}-{stamp}{suffix}.db")
+        number = 1
+        while os.path.exists(path):
+            number += 1
+            path = os.path.join(self.directory, f"{self._stem}-{stamp}-{number}{suffix}.db")
+        return path
+
+    def _info(self, path: str, kind: str) -> BackupInfo:
+        match = self._name_re.match(os.path.basename(path))
+        return BackupInfo(path, datetime.strptime(match.group(1), _STAMP_FORMAT), kind, os.path.getsize(path))
+
+    def _write_timeout(self) -> float:
+        return database.connection_profile().write_timeout_ms / 1000
+
+    def _connect_source(self) -> sqlite3.Connection:
+        if not os.path.isfile(self.db_path):
+            raise FileNotFoundError(f"No database at {self.db_path}")
+        profile = database.connection_profile()
+        return sqlite3.connect(self.db_path, timeout=profile.busy_timeout_ms / 1000, isolation_level=None)
+
+    # --- Taking backups ---
+
+    def backup(self, progress: Optional[Callable[[int, int], None]] = None,
+               cancel: Optional[threading.Event] = None, kind: str = "backup",
+               rotate: bool = True) -> BackupInfo:
+        """Copy the live database into a new backup file and return it.
+
+        progress(copied_pages, total_pages) is called after each step.
+        Unless rotate is False, older backups are pruned afterwards.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown backup kind: {kind!r}")
+        path = self._new_path(kind)
+        temp_path = path + ".part"
+        try:
+            with span("backup.copy"):
+                source = self._connect_source()
+                try:
+                    target = sqlite3.connect(temp_path, isolation_level=None)
+                    try:
+                        pages = copy_database(source, target, progress, cancel, self.pages_per_step)
+                        # The copy inherits WAL mode; a backup should be one self-contained file
+                        target.execute("PRAGMA journal_mode = DELETE;")
+                    finally:
+                        target.close()
+                finally:
+                    source.close()
+            with span("backup.verify"):
+                verify_database(temp_path, cancel=cancel)
+            os.replace(temp_path, path)
+        except BaseException:
+            _remove(temp_path)
+            raise
+        info = self._info(path, kind)
+        log.info("Backed up %s to %s (%d pages, %d bytes)", self.db_path, path, pages, info.size_bytes)
+        if rotate:
+            self.rotate()
+        return info
+
+    def snapshot(self, cancel: Optional[threading.Event] = None, rotate: bool = True) -> BackupInfo:
+        """Write a compacted copy of the live database with VACUUM INTO and return it."""
+        path = self._new_path("compact")
+        temp_path = path + ".part"
+        try:
+            with span("backup.snapshot"):
+                source = self._connect_source()
+                try:
+                    _cancellable(source, cancel)
+                    source.execute("VACUUM INTO ?;", (temp_path,))
+                except sqlite3.OperationalError:
+                    _check_cancel(cancel)
+                    raise
+                finally:
+                    source.close()
+            with span("backup.verify"):
+                verify_database(temp_path, cancel=cancel)
+            os.replace(temp_path, path)
+        except BaseException:
+            _remove(temp_path)
+            raise
+        info = self._info(path, "compact")
+        log.info("Wrote compact snapshot of %s to %s (%d bytes)", self.db_path, path, info.size_bytes)
+        if rotate:
+            self.rotate()
+        return info
+
+    def rotate(self) -> List[str]:
+        """Delete the regular backups the rotation policy no longer keeps; return their paths."""
+        backups = [info for info in self.list_backups() if info.kind == "backup"]
+        kept = set(select_kept(backups, self.keep_daily, self.keep_weekly))
+        removed = []
+        for info in backups:
+            if info not in kept:
+                try:
+                    _remove(info.path)
+                except OSError as e:
+                    log.warning("Could not remove old backup %s: %s", info.path, e)
+                    continue
+                removed.append(info.path)
+        if removed:
+            log.info("Removed %d old backups", len(removed))
+        return removed
+
+    # --- Restoring ---
+
+    def restore(self, path: str, progress: Optional[Callable[[int, int], None]] = None,
+                cancel: Optional[threading.Event] = None) -> BackupInfo:
+        """Replace the live database with the backup at path; return the pre-restore backup.
+
+        The candidate is verified, staged and migrated before anything is
+        touched. progress(copied_pages, total_pages) is reported while the
+        current journal is saved and again while the backup is written over
+        it; cancelling at any point leaves the journal unchanged.
+        """
+        with span("backup.restore.verify"):
+            verify_database(path, full=True, cancel=cancel)
+        staging_path = self.db_path + ".restore"
+        _remove(staging_path)
+        try:
+            with span("backup.restore.stage"):
+                candidate = sqlite3.connect(database.read_only_uri(path), uri=True, isolation_level=None)
+                staging = sqlite3.connect(staging_path, isolation_level=None)
+                try:
+                    copy_database(candidate, staging, cancel=cancel, pages_per_step=self.pages_per_step)
+                    staging.execute("PRAGMA journal_mode = DELETE;")
+                    migrations.migrate(staging)
+                finally:
+                    candidate.close()
+                    staging.close()
+                verify_database(staging_path, cancel=cancel)
+
+            # Keep the current journal, so a restore can be undone
+            saved = self.backup(progress, cancel, kind="pre-restore", rotate=False)
+
+            # The lease keeps other processes of this app from queueing writes behind the swap
+            with span("backup.restore.swap"), write_lock.lease_for(self.db_path).hold(self._write_timeout()):
+                staging = sqlite3.connect(staging_path, isolation_level=None)
+                live = self._connect_source()
+                try:
+                    # One write transaction on the live file; stopping early rolls it back
+                    copy_database(staging, live, progress, cancel, self.pages_per_step)
+                    problems = [row[0] for row in live.execute("PRAGMA quick_check(20);")]
+                finally:
+                    live.close()
+                    staging.close()
+            if problems != ["ok"]:
+                log.error("Restored database failed its check (%s); putting %s back", problems, saved.path)
+                self._write_back(saved.path)
+                raise BackupError(f"The restored journal failed its check: {'; '.join(problems)}")
+        finally:
+            _remove(staging_path)
+        log.info("Restored %s from %s", self.db_path, path)
+        return saved
+
+    def _write_back(self, path: str) -> None:
+        source = sqlite3.connect(database.read_only_uri(path), uri=True, isolation_level=None)
+        live = self._connect_source()
+        try:
+            with write_lock.lease_for(self.db_path).hold(self._write_timeout()):
+                copy_database(source, live, pages_per_step=-1)
+        finally:
+            live.close()
+            source.close()
@@ -0,0 +1,93 @@
+"""
+Benchmark: idle-time maintenance on a journal after a long session.
+
+Builds a synthetic journal (100k entries by default), then plays a session
+that leaves work behind: edits made while another connection holds a read
+transaction open (so the WAL cannot be reused and grows), and a large
+delete followed by purge_deleted() (free pages). Then it runs the idle tasks
+the way MaintenanceScheduler does, one call at a time, until none has work
+left, and reports each run's duration and the bytes reclaimed. The target is
+that no single run holds the database worker for more than 250 ms.
+
+Usage: python benchmarks/bench_maintenance.py [--entries N] [--edits N] [--purge-fraction F]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import maintenance  # noqa: E402
+from synthetic import synthetic_entries  # noqa: E402
+
+TARGET_MS = 250.0
+
+
+def _format_status(status):
+    return (f"database {status.file_bytes / 2**20:7.1f} MB   WAL {status.wal_bytes / 2**20:7.1f} MB   "
+            f"free {status.free_bytes / 2**20:7.1f} MB   auto_vacuum {status.auto_vacuum}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--edits", type=int, default=5_000)
+    parser.add_argument("--purge-fraction", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "maintenance.db")
+        database.use_database(path)
+        database.create_table()
+        start = time.perf_counter()
+        database.bulk_add_entries(synthetic_entries(args.entries, hashtags=True), batch_size=5000)
+        print(f"generated {args.entries} entries in {time.perf_counter() - start:.1f} s")
+        database.run_maintenance(("checkpoint", "truncate_wal"))
+        print(f"fresh:         {_format_status(database.get_database_status())}")
+
+        # A reader pinned to an old snapshot keeps every edit in the WAL
+        reader = sqlite3.connect(path)
+        reader.execute("BEGIN;")
+        reader.execute("SELECT COUNT(*) FROM entries;").fetchone()
+        for entry_id in range(1, args.edits + 1):
+            database.update_entry(entry_id, f"Edited during a long session #edited {entry_id}")
+        reader.rollback()
+        reader.close()
+
+        purged = int(args.entries * args.purge_fraction)
+        with database.get_db() as conn:
+            conn.execute("UPDATE entries SET deleted_at = '2000-01-01 00:00:00' WHERE id > ?;",
+                         (args.entries - purged,))
+        database.purge_deleted()
+        print(f"after session: {_format_status(database.get_database_status())}")
+
+        for task in maintenance.IDLE_TASKS:
+            while True:
+                ran = database.run_maintenance((task,))
+                results.extend(ran)
+                if not ran or not ran[-1].pending:
+                    break
+        print(f"maintained:    {_format_status(database.get_database_status())}")
+        database.close_connection()
+
+    for task in maintenance.IDLE_TASKS:
+        runs = [result for result in results if result.task == task]
+        if not runs:
+            print(f"{task:<19} nothing to do")
+            continue
+        print(f"{task:<19} {len(runs):3} runs   max {max(r.duration_ms for r in runs):7.1f} ms   "
+              f"total {sum(r.duration_ms for r in runs):8.1f} ms   "
+              f"reclaimed {sum(r.reclaimed_bytes for r in runs) / 2**20:7.1f} MB   {runs[-1].detail}")
+    worst = max((result.duration_ms for result in results), default=0.0)
+    print("PASS" if worst <= TARGET_MS else f"FAIL: a run took {worst:.0f} ms (target {TARGET_MS:.0f} ms)")
+    return 0 if worst <= TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
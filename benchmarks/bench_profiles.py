@@ -0,0 +1,99 @@
+"""
+Benchmark: connection profile presets (safe / balanced / fast).
+
+For each preset, opens a fresh journal with that profile and measures:
+single-entry commit latency (what saving one entry costs), bulk import
+throughput, and the latency of the Today and Entries reads on a warm
+database. Durability differs between presets; see db_config.py.
+
+Run it on the machine (and disk) you care about: commit latency is dominated
+by fsync and varies by orders of magnitude between SSDs, HDDs and network
+drives.
+
+Usage: python benchmarks/bench_profiles.py [--entries N] [--commits N] [--dir PATH] [--profile NAME ...]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import db_config  # noqa: E402
+
+
+def _percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[max(int(len(samples) * fraction) - 1, 0)]
+
+
+def _synthetic_entries(count):
+    for i in range(count):
+        day = 1 + i * 3650 // max(count, 1)
+        yield {'content': f"entry {i} " + "learned something about sqlite pragmas " * 4,
+               'date': time.strftime("%Y-%m-%d", time.gmtime(1262304000 + day * 86400))}
+
+
+def _time_calls(func, count):
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def bench_profile(profile, directory, entries, commits):
+    path = os.path.join(directory, f"{profile.name}.db")
+    database.use_database(path, profile)
+    database.create_table()
+
+    start = time.perf_counter()
+    database.bulk_add_entries(_synthetic_entries(entries), batch_size=5000)
+    bulk_rate = entries / (time.perf_counter() - start)
+
+    commit_ms = _time_calls(lambda: database.add_entry("one more entry", "2024-06-01"), commits)
+    today_ms = _time_calls(lambda: database.get_day_changes("2015-06-01"), 200)
+    page_ms = _time_calls(lambda: database.get_entries_page(entries // 2, 100), 200)
+
+    database.close_connection()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    return {
+        'commit_p50': statistics.median(commit_ms),
+        'commit_p95': _percentile(commit_ms, 0.95),
+        'bulk_rate': bulk_rate,
+        'today_p50': statistics.median(today_ms),
+        'page_p50': statistics.median(page_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--commits", type=int, default=200)
+    parser.add_argument("--dir", help="directory on the disk to measure (default: a temp dir)")
+    parser.add_argument("--profile", action="append", choices=sorted(db_config.PROFILES),
+                        help="preset to run (repeatable; default: all)")
+    args = parser.parse_args()
+
+    names = args.profile or list(db_config.PROFILES)
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        results = {name: bench_profile(db_config.make_profile(name), tmp, args.entries, args.commits)
+                   for name in names}
+
+    print(f"{'profile':<10} {'commit p50':>11} {'commit p95':>11} {'bulk import':>14} "
+          f"{'today p50':>10} {'page p50':>9}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['commit_p50']:8.2f} ms {result['commit_p95']:8.2f} ms "
+              f"{result['bulk_rate']:8.0f} rows/s {result['today_p50']:7.2f} ms {result['page_p50']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: formatting entry dates for display, before and after integer dates.
+
+The old render paths parsed every entry's date strings with strptime to show
+"March 05, 2024" on Entries cards and "09:30 PM" on Today cards. They now
+format day_number/created_ts through date_format's per-day and per-minute
+caches. This times both over the same synthetic rows, cold (empty cache) and
+warm, at the scale of one screen and of a full history.
+
+Usage: python benchmarks/bench_render_dates.py [--entries N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import date_format  # noqa: E402
+from storage import MemoryStore  # noqa: E402
+from synthetic import synthetic_entries  # noqa: E402
+
+
+def old_entry_card(entry):
+    # As _fill_entry_card did it; the full date-time never matched the
+    # pattern, so every card also paid for a ValueError
+    try:
+        return datetime.strptime(entry.date, "%Y-%m-%d").strftime("%B %d, %Y")
+    except ValueError:
+        return entry.date
+
+
+def old_today_card(entry):
+    try:
+        return datetime.strptime(entry.created_at or entry.date, "%Y-%m-%d %H:%M:%S").strftime("%I:%M %p")
+    except (ValueError, TypeError):
+        return ""
+
+
+def new_entry_card(entry):
+    return date_format.format_day(entry.day_number)
+
+
+def new_today_card(entry):
+    return date_format.format_time(entry.created_ts)
+
+
+def _clear_caches():
+    date_format.format_day.cache_clear()
+    date_format._format_minute.cache_clear()
+
+
+def _time_per_row(func, rows, repeat, cold):
+    best = float("inf")
+    for _ in range(repeat):
+        if cold:
+            _clear_caches()
+        start = time.perf_counter()
+        for row in rows:
+            func(row)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6 / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    store = MemoryStore()
+    store.bulk_add_entries(synthetic_entries(args.entries), batch_size=5000)
+    history = list(store.iter_entries())
+    screen = history[:20]
+
+    print(f"{'rows':<12} {'card':<8} {'strptime':>12} {'cached cold':>12} {'cached warm':>12} {'speedup':>8}")
+    for label, rows in (("one screen", screen), (f"{len(history):,}", history)):
+        for card, old, new in (("entries", old_entry_card, new_entry_card),
+                               ("today", old_today_card, new_today_card)):
+            old_us = _time_per_row(old, rows, args.repeat, cold=False)
+            cold_us = _time_per_row(new, rows, args.repeat, cold=True)
+            warm_us = _time_per_row(new, rows, args.repeat, cold=False)
+            print(f"{label:<12} {card:<8} {old_us:9.2f} µs {cold_us:9.2f} µs {warm_us:9.2f} µs "
+                  f"{old_us / warm_us:7.1f}x")
+    print("(per row; best of", args.repeat, "runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: per-read schema introspection overhead.
+
+Compares the old read path, which ran PRAGMA table_info(entries) before every
+query, with the current one that consults the cached schema description.
+Also times a fresh migration and a no-op migration on an up-to-date database.
+
+Usage: python benchmarks/bench_schema.py [--entries N] [--reads N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+
+def _legacy_read(conn, limit):
+    columns = [column[1] for column in conn.execute("PRAGMA table_info(entries);").fetchall()]
+    order = "date DESC, created_at DESC" if 'created_at' in columns else "date DESC"
+    return conn.execute(f"SELECT content, date FROM entries ORDER BY {order} LIMIT ?;", (limit,)).fetchall()
+
+
+def _plain_read(conn, limit):
+    return conn.execute(
+        "SELECT content, date FROM entries ORDER BY date DESC, created_at DESC LIMIT ?;", (limit,)
+    ).fetchall()
+
+
+def _time_per_call(func, reads):
+    start = time.perf_counter()
+    for _ in range(reads):
+        func()
+    return (time.perf_counter() - start) / reads * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench.db")
+
+        start = time.perf_counter()
+        database.create_table()
+        fresh_ms = (time.perf_counter() - start) * 1000
+
+        conn = database.get_connection()
+        conn.executemany(
+            "INSERT INTO entries (content, date, created_at) VALUES (?, ?, ?);",
+            ((f"entry {i}", f"2024-01-{i % 28 + 1:02d} 12:00:00", "2024-02-01 12:00:00")
+             for i in range(args.entries))
+        )
+        conn.commit()
+
+        start = time.perf_counter()
+        database.create_table()
+        noop_ms = (time.perf_counter() - start) * 1000
+
+        legacy_us = _time_per_call(lambda: _legacy_read(conn, 20), args.reads)
+        plain_us = _time_per_call(lambda: _plain_read(conn, 20), args.reads)
+        cached_us = _time_per_call(lambda: (database.get_schema(), _plain_read(conn, 20)), args.reads)
+
+        database.close_connection()
+
+    print(f"fresh migration:            {fresh_ms:8.2f} ms")
+    print(f"no-op migration:            {noop_ms:8.2f} ms")
+    print(f"read with PRAGMA per call:  {legacy_us:8.1f} us")
+    print(f"read with cached schema:    {cached_us:8.1f} us")
+    print(f"read, no schema check:      {plain_us:8.1f} us")
+    print(f"per-read overhead removed:  {legacy_us - cached_us:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: as-you-type full-text search latency.
+
+Builds a synthetic journal (100k entries by default), then replays typing a set
+of queries one keystroke at a time through the store's search_entries() and
+reports per-keystroke latency. The target is p95 under 20 ms. --store memory
+runs the same workload against the in-memory backend for comparison.
+
+Usage: python benchmarks/bench_search.py [--entries N] [--db PATH] [--store sqlite|memory]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import MemoryStore, SqliteStore  # noqa: E402
+from synthetic import synthetic_entries  # noqa: E402
+
+QUERIES = ["python generator", "sqlite index", "rust borrow checker", "react hook state", "the"]
+TARGET_MS = 20.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--db", help="reuse an existing journal instead of generating one")
+    parser.add_argument("--store", choices=("sqlite", "memory"), default="sqlite")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.store == "memory":
+            store = MemoryStore()
+        else:
+            store = SqliteStore(args.db or os.path.join(tmp, "search.db"))
+        store.create_table()
+        if not args.db or args.store == "memory":
+            start = time.perf_counter()
+            store.bulk_add_entries(synthetic_entries(args.entries), batch_size=5000)
+            print(f"generated {args.entries} entries in {time.perf_counter() - start:.1f} s")
+
+        timings = []
+        for query in QUERIES:
+            for end in range(1, len(query) + 1):
+                start = time.perf_counter()
+                store.search_entries(query[:end], limit=21)
+                timings.append((time.perf_counter() - start) * 1000)
+
+        store.close_connection()
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"keystrokes: {len(timings)}")
+    print(f"p50: {statistics.median(timings):6.2f} ms")
+    print(f"p95: {p95:6.2f} ms")
+    print(f"max: {timings[-1]:6.2f} ms")
+    print("PASS" if p95 <= TARGET_MS else f"FAIL: p95 above {TARGET_MS:.0f} ms")
+    return 0 if p95 <= TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
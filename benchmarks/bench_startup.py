@@ -0,0 +1,62 @@
+"""
+Benchmark: cold start to first paint.
+
+Launches the app several times with CODE_JOURNAL_STARTUP_PROBE set; the app
+reports the time from importing app_gui to its first painted frame and exits.
+The target is a median under 300 ms. Needs a display (use xvfb-run on a
+headless machine) and customtkinter.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--db PATH]
+"""
+
+import argparse
+import importlib.util
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_TARGET_MS = 300  # Same target as app_gui.STARTUP_TARGET_MS
+_RESULT_RE = re.compile(r"first_paint_ms=([\d.]+)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--db", help="journal to open (default: an empty one in a temp dir)")
+    args = parser.parse_args()
+
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        print("SKIP: no display (run under xvfb-run)")
+        return 0
+    if importlib.util.find_spec("customtkinter") is None:
+        print("SKIP: customtkinter is not installed")
+        return 0
+
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, CODE_JOURNAL_STARTUP_PROBE="1",
+                   CODE_JOURNAL_DB=args.db or os.path.join(tmp, "startup.db"))
+        for _ in range(args.runs):
+            result = subprocess.run([sys.executable, os.path.join(ROOT, "app_gui.py")], env=env,
+                                    capture_output=True, text=True, timeout=60)
+            match = _RESULT_RE.search(result.stdout)
+            if not match:
+                print(f"FAIL: the app did not report a first paint\n{result.stderr}")
+                return 1
+            timings.append(float(match.group(1)))
+
+    timings.sort()
+    median = statistics.median(timings)
+    print(f"runs: {len(timings)}")
+    print(f"first paint p50: {median:7.1f} ms")
+    print(f"first paint max: {timings[-1]:7.1f} ms")
+    print("PASS" if median <= STARTUP_TARGET_MS else f"FAIL: median above {STARTUP_TARGET_MS} ms")
+    return 0 if median <= STARTUP_TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark: tag filtering latency.
+
+Builds a synthetic journal with #hashtags (100k entries by default), then
+runs what the Library tag sidebar does as tags are toggled: the tag counts,
+the counts within the current selection, and the first pages of entries
+carrying every selected tag, for one to three tags from common to rare.
+The target is p95 under 100 ms per query, the usual limit for a response
+to feel immediate; the entry pages themselves should take a few ms, and
+the counts within a selection of one very common tag are the slowest part.
+
+Usage: python benchmarks/bench_tags.py [--entries N] [--db PATH] [--store sqlite|memory]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import MemoryStore, SqliteStore  # noqa: E402
+from synthetic import synthetic_entries  # noqa: E402
+
+TARGET_MS = 100.0
+PAGE_SIZE = 20
+
+
+def _timed(timings, label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    timings.setdefault(label, []).append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--db", help="reuse an existing journal instead of generating one")
+    parser.add_argument("--store", choices=("sqlite", "memory"), default="sqlite")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.store == "memory":
+            store = MemoryStore()
+        else:
+            store = SqliteStore(args.db or os.path.join(tmp, "tags.db"))
+        store.create_table()
+        if not args.db or args.store == "memory":
+            start = time.perf_counter()
+            store.bulk_add_entries(synthetic_entries(args.entries, hashtags=True), batch_size=5000)
+            print(f"generated {args.entries} entries in {time.perf_counter() - start:.1f} s")
+
+        tags = [tag.name for tag in store.get_tag_counts()]
+        print(f"{len(tags)} tags; most used: "
+              + ", ".join(f"#{tag.name} ({tag.entry_count:,})" for tag in store.get_tag_counts(limit=3)))
+        # Selections as a user builds them up, starting from a common and from a rare tag
+        selections = [tags[:1], tags[:2], tags[:3], tags[-1:], tags[-1:] + tags[:1], tags[-2:] + tags[:1]]
+        for _ in range(args.repeat):
+            _timed(timings, "tag counts", store.get_tag_counts)
+            for selection in selections:
+                _timed(timings, "counts within selection", store.get_tag_counts, within=selection)
+                _timed(timings, "first page", store.get_entries_with_tags, selection, PAGE_SIZE)
+                _timed(timings, "page 5", store.get_entries_with_tags, selection, PAGE_SIZE, 4 * PAGE_SIZE)
+
+        store.close_connection()
+
+    worst = 0.0
+    for label, values in timings.items():
+        values.sort()
+        p95 = values[max(int(len(values) * 0.95) - 1, 0)]
+        worst = max(worst, p95)
+        print(f"{label:<26} p50 {statistics.median(values):7.2f} ms   p95 {p95:7.2f} ms   max {values[-1]:7.2f} ms")
+    print("PASS" if worst <= TARGET_MS else f"FAIL: p95 above {TARGET_MS:.0f} ms")
+    return 0 if worst <= TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Query plan check for the hot read paths.
+
+Prints the EXPLAIN QUERY PLAN of every SELECT the hot read functions issue,
+using the checks in tests/test_query_plans.py (which `python -m pytest`
+runs). Exits with status 1 if any of them reads the entries table without an
+index or sorts through a temp B-tree.
+
+Usage: python benchmarks/check_query_plans.py
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import database  # noqa: E402
+from test_query_plans import CHECKS, build_plan_database, distinct_plans  # noqa: E402
+
+
+def main():
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        database.use_database(os.path.join(tmp, "plans.db"))
+        conn = build_plan_database()
+        for name, func in CHECKS.items():
+            for plan, problems in distinct_plans(conn, func):
+                print(f"[{'FAIL' if problems else 'ok'}] {name}: {' | '.join(plan)}")
+                failed = failed or bool(problems)
+        database.close_connection()
+
+    if failed:
+        print("Query plan check failed: a hot query scans the table or sorts in a temp B-tree.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
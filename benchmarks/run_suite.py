@@ -0,0 +1,244 @@
+"""
+Benchmark suite for the database layer and the view-loading paths.
+
+For each journal size, builds a synthetic journal in a scratch directory and
+times the hot paths: migrations (fresh and no-op), add_entry, get_entries,
+get_entries_by_date, the Entries page read, search, NDJSON import and export.
+With a display and customtkinter available (e.g. under xvfb-run), it also
+times the Today card-building loop and an Entries list reload in a withdrawn
+App window; otherwise those are recorded as skipped.
+
+Results are written as JSON. --compare checks them against a saved baseline
+and exits with status 1 if any metric regressed by more than --threshold.
+
+Usage:
+    python benchmarks/run_suite.py [--sizes 1k,100k] [--output results.json]
+    python benchmarks/run_suite.py --compare baseline.json [--threshold 0.25]
+    xvfb-run python benchmarks/run_suite.py --sizes 1k   # include the UI timings
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import journal_io  # noqa: E402
+from synthetic import parse_size, synthetic_entries  # noqa: E402
+
+DEFAULT_SIZES = "1k,100k"
+DEFAULT_THRESHOLD = 0.25
+
+
+def _summary(timings_ms):
+    timings_ms = sorted(timings_ms)
+    return {
+        'median_ms': round(statistics.median(timings_ms), 4),
+        'p95_ms': round(timings_ms[max(int(len(timings_ms) * 0.95) - 1, 0)], 4),
+        'runs': len(timings_ms),
+    }
+
+
+def _time(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return _summary(timings)
+
+
+def _runs(count, small, large):
+    """Fewer repetitions for whole-journal operations on big journals."""
+    return small if count <= 100_000 else large
+
+
+def bench_database(count, directory):
+    results = {}
+    path = os.path.join(directory, f"journal-{count}.db")
+    database.use_database(path)
+    today = date.today().isoformat()
+
+    source = os.path.join(directory, f"source-{count}.ndjson")
+    with open(source, "w", encoding="utf-8") as f:
+        for entry in synthetic_entries(count):
+            f.write(json.dumps(entry) + "\n")
+
+    scratch = iter(range(10))
+
+    def fresh_migration():
+        database.use_database(os.path.join(directory, f"fresh-{next(scratch)}.db"))
+        database.create_table()
+    results['create_table_fresh'] = _time(fresh_migration, 10)
+    database.use_database(path)
+    database.create_table()
+
+    start = time.perf_counter()
+    journal_io.import_entries(source, batch_size=5000)
+    elapsed = time.perf_counter() - start
+    results['import_ndjson'] = {**_summary([elapsed * 1000]), 'rows_per_s': round(count / elapsed)}
+
+    def fresh_process_migration():
+        # A new process re-checks the schema version; the cached copy would hide that
+        database.use_database(path)
+        database.create_table()
+    results['create_table_noop'] = _time(fresh_process_migration, 20)
+
+    results['add_entry'] = _time(lambda: database.add_entry("benchmark entry", today), 200)
+    results['get_entries'] = _time(database.get_entries, _runs(count, 5, 1))
+    results['get_entries_by_date'] = _time(lambda: database.get_entries_by_date(today), 200)
+    results['get_entries_page'] = _time(lambda: database.get_entries_page(count // 2, 100), 200)
+    results['search_entries'] = _time(lambda: database.search_entries("python generator", limit=21), 50)
+    year = date.today().year
+    results['get_daily_stats_year'] = _time(
+        lambda: database.get_daily_stats(f"{year}-01-01", f"{year}-12-31"), 100)
+    results['get_period_stats_month'] = _time(lambda: database.get_period_stats("month"), 50)
+    results['get_streaks'] = _time(database.get_streaks, 50)
+
+    target = os.path.join(directory, f"export-{count}.ndjson")
+    start = time.perf_counter()
+    exported = journal_io.export_entries(target)
+    elapsed = time.perf_counter() - start
+    results['export_ndjson'] = {**_summary([elapsed * 1000]), 'rows_per_s': round(exported / elapsed)}
+
+    database.close_connection()
+    return results
+
+
+def bench_views(count, directory):
+    """Time the Today and Entries loading paths in a real (withdrawn) App window."""
+    if not os.environ.get("DISPLAY") and sys.platform.startswith("linux"):
+        return {'skipped': "no display (run under xvfb-run)"}
+    try:
+        import customtkinter  # noqa: F401
+        from app_gui import App
+    except Exception as e:
+        return {'skipped': f"UI not importable: {e}"}
+    from storage import SqliteStore
+
+    store = SqliteStore(os.path.join(directory, f"journal-{count}.db"))
+    app = App(store=store)
+    app.withdraw()
+    results = {}
+    try:
+        def pump(done):
+            deadline = time.perf_counter() + 60
+            while not done() and time.perf_counter() < deadline:
+                app.update()
+
+        def load_today():
+            finished = []
+            app._clear_today_cards()
+            app._today_day = None
+            app.load_today_entries(on_done=lambda: finished.append(True))
+            pump(lambda: finished)
+            app.update_idletasks()
+
+        app.switch_to_view("today")
+        load_today()  # Warm the cache; the timed runs measure card building
+        results['today_cards'] = len(app._today_cards)
+        results['load_today_entries'] = _time(load_today, 10)
+
+        def reload_entries():
+            entries_list = app.entries_list
+            entries_list.reload()
+            pump(lambda: entries_list._total and not entries_list._pending_blocks)
+            app.update_idletasks()
+
+        app.switch_to_view("entries")
+        reload_entries()
+        results['action_load_entries_into_display'] = _time(reload_entries, 10)
+    finally:
+        app.db_worker.shutdown()
+        app.destroy()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return (metric, baseline value, current value, change) for every regression."""
+    regressions = []
+    for size, metrics in results['sizes'].items():
+        for name, current in metrics.items():
+            previous = baseline.get('sizes', {}).get(size, {}).get(name)
+            if not isinstance(current, dict) or not isinstance(previous, dict):
+                continue
+            if 'rows_per_s' in current and 'rows_per_s' in previous:
+                old, new = previous['rows_per_s'], current['rows_per_s']
+                change = (old - new) / old if old else 0.0
+            elif 'median_ms' in current and 'median_ms' in previous:
+                old, new = previous['median_ms'], current['median_ms']
+                change = (new - old) / old if old else 0.0
+            else:
+                continue
+            if change > threshold:
+                regressions.append((f"{size}/{name}", old, new, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma-separated journal sizes: 1k, 10k, 100k, 1m or a number")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved results JSON")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a metric counts as a regression (default 0.25)")
+    parser.add_argument("--no-ui", action="store_true", help="skip the view-loading timings")
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+        },
+        'sizes': {},
+    }
+    for label in args.sizes.split(","):
+        count = parse_size(label)
+        print(f"--- {label.strip()} entries ---", flush=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            metrics = bench_database(count, tmp)
+            if not args.no_ui:
+                views = bench_views(count, tmp)
+                if 'skipped' in views:
+                    metrics['views_skipped'] = views['skipped']
+                else:
+                    metrics.update((f"views.{name}", value) for name, value in views.items())
+        for name, value in metrics.items():
+            if isinstance(value, dict):
+                extra = f"  {value['rows_per_s']} rows/s" if 'rows_per_s' in value else ""
+                print(f"{name:<40} {value['median_ms']:10.3f} ms  p95 {value['p95_ms']:10.3f} ms{extra}")
+            else:
+                print(f"{name:<40} {value}")
+        results['sizes'][label.strip()] = metrics
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"REGRESSIONS (more than {args.threshold:.0%} worse than {args.compare}):")
+            for name, old, new, change in regressions:
+                print(f"  {name}: {old} -> {new} ({change:+.0%})")
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
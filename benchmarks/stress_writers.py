@@ -0,0 +1,144 @@
+"""
+Stress test: many processes writing one journal while others read it.
+
+Starts N writer processes that each add M entries with a little random think
+time between them, the way several app windows and scripts would, plus R
+read-only processes that keep running queries until the writers are done.
+Every write goes through the writer lease and BEGIN IMMEDIATE (write_lock.py).
+The script reports write latency percentiles over all processes, the lease
+contention counters and read latency, then checks that no write was lost and
+the database passes quick_check. The target is a p99 write latency under
+250 ms and no JournalBusy failures.
+
+Usage: python benchmarks/stress_writers.py [--writers N] [--writes M] [--readers R] [--think-ms MS]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import write_lock  # noqa: E402
+
+P99_TARGET_MS = 250.0
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+
+def _writer(path, number, writes, think_ms, start, results):
+    database.use_database(path)
+    database.create_table()
+    latencies = []
+    failures = 0
+    start.wait()
+    for i in range(writes):
+        time.sleep(random.uniform(0, think_ms) / 1000)
+        began = time.perf_counter()
+        try:
+            database.add_entry(f"Writer {number} entry {i} #stress #writer{number}", "2024-06-01")
+        except write_lock.JournalBusy:
+            failures += 1
+            continue
+        latencies.append((time.perf_counter() - began) * 1000)
+    database.close_connection()
+    results.put(('writer', latencies, failures, write_lock.stats()))
+
+
+def _reader(path, start, stop, results):
+    database.use_database(path, read_only=True)
+    database.create_table()
+    latencies = []
+    start.wait()
+    while not stop.is_set():
+        began = time.perf_counter()
+        database.count_entries()
+        database.get_entries_by_date("2024-06-01")
+        latencies.append((time.perf_counter() - began) * 1000)
+    database.close_connection()
+    results.put(('reader', latencies, 0, None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="entries added by each writer")
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--think-ms", type=float, default=5.0, help="max random pause between writes")
+    args = parser.parse_args()
+
+    # spawn behaves the same on every platform and gives each process its own connections
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "stress.db")
+        database.use_database(path)
+        database.create_table()
+        database.close_connection()
+
+        start, stop, results = context.Event(), context.Event(), context.Queue()
+        writers = [context.Process(target=_writer, args=(path, number, args.writes, args.think_ms, start, results))
+                   for number in range(args.writers)]
+        readers = [context.Process(target=_reader, args=(path, start, stop, results))
+                   for _ in range(args.readers)]
+        for process in writers + readers:
+            process.start()
+        time.sleep(1.0)  # let every process import and open the journal
+        began = time.perf_counter()
+        start.set()
+
+        write_ms, read_ms, failures, counters = [], [], 0, []
+        for _ in writers:
+            _, latencies, failed, stats = results.get()
+            write_ms.extend(latencies)
+            failures += failed
+            counters.append(stats)
+        seconds = time.perf_counter() - began
+        stop.set()
+        for _ in readers:
+            read_ms.extend(results.get()[1])
+        for process in writers + readers:
+            process.join()
+
+        conn = sqlite3.connect(path)
+        count = conn.execute("SELECT COUNT(*) FROM entries;").fetchone()[0]
+        check = conn.execute("PRAGMA quick_check;").fetchone()[0]
+        conn.close()
+
+    totals = {name: sum(stats[name] for stats in counters) for name in counters[0]}
+    totals['wait_ms_max'] = max(stats['wait_ms_max'] for stats in counters)
+    expected = args.writers * args.writes
+    print(f"{args.writers} writers x {args.writes} writes, {args.readers} readers: "
+          f"{len(write_ms)} writes in {seconds:.1f} s ({len(write_ms) / seconds:.0f}/s)")
+    print(f"write latency  p50 {_percentile(write_ms, 0.5):6.1f} ms   p95 {_percentile(write_ms, 0.95):6.1f} ms   "
+          f"p99 {_percentile(write_ms, 0.99):6.1f} ms   max {max(write_ms, default=0.0):6.1f} ms")
+    if read_ms:
+        print(f"read latency   p50 {_percentile(read_ms, 0.5):6.1f} ms   p95 {_percentile(read_ms, 0.95):6.1f} ms   "
+              f"max {max(read_ms):6.1f} ms over {len(read_ms)} reads")
+    print(f"contention:    {write_lock.format_stats(totals)}")
+    print(f"entries {count} of {expected}, quick_check {check}, {failures} JournalBusy failures")
+
+    p99 = _percentile(write_ms, 0.99)
+    problems = []
+    if count != expected - failures:
+        problems.append(f"{expected - failures - count} writes lost")
+    if check != "ok":
+        problems.append(f"quick_check: {check}")
+    if failures:
+        problems.append(f"{failures} writes timed out")
+    if p99 > P99_TARGET_MS:
+        problems.append(f"p99 write latency {p99:.0f} ms (target {P99_TARGET_MS:.0f} ms)")
+    print("FAIL: " + "; ".join(problems) if problems else "PASS")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
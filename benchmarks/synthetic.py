@@ -0,0 +1,61 @@
+"""
+Synthetic journals for the benchmarks.
+
+Entries are deterministic for a given seed. Content lengths follow a
+log-normal distribution (median around 40 words, with a long tail of
+multi-paragraph entries), and dates run back from end_date with one to six
+entries per day, so day buckets, pages and search all see realistic shapes.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, Optional
+
+TOPICS = ("python sqlite index query async thread tkinter widget cache debounce generator decorator "
+          "closure lambda regex unicode refactor pytest fixture git rebase merge docker rust borrow "
+          "lifetime trait typescript react hook render component layout promise await channel mutex").split()
+FILLER = "the a to of and in is it that for with on was as i this today learned how about from but by".split()
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def parse_size(text: str) -> int:
+    """'100k' -> 100000; plain integers are accepted too."""
+    text = text.strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    return int(text)
+
+
+def synthetic_entries(count: int, seed: int = 42, end_date: Optional[date] = None,
+                      hashtags: bool = False) -> Iterator[Dict[str, str]]:
+    """Yield count {'content', 'date'} entries, newest day first, ending at end_date (default today).
+
+    With hashtags, most entries end with one to three #topic tags drawn with
+    Zipf-like weights, so a few tags are common and most are rare.
+    """
+    rng = random.Random(seed)
+    tag_weights = [1 / rank for rank in range(1, len(TOPICS) + 1)]
+    vocabulary = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 10)))
+                  for _ in range(20000)]
+    day = end_date or date.today()
+    left_today = rng.randint(1, 6)
+    for _ in range(count):
+        if left_today == 0:
+            day -= timedelta(days=1)
+            left_today = rng.randint(1, 6)
+        left_today -= 1
+        length = min(max(int(rng.lognormvariate(3.7, 0.8)), 3), 1500)
+        words = []
+        for _ in range(length):
+            roll = rng.random()
+            if roll < 0.4:
+                words.append(rng.choice(FILLER))
+            elif roll < 0.5:
+                words.append(rng.choice(TOPICS))
+            else:
+                words.append(rng.choice(vocabulary))
+        if hashtags and rng.random() < 0.7:
+            tags = rng.choices(TOPICS, tag_weights, k=rng.randint(1, 3))
+            words.extend("#" + tag for tag in dict.fromkeys(tags))
+        yield {'content': " ".join(words), 'date': day.isoformat()}
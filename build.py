@@ -22,7 +22,13 @@ def verify_views_structure():
         'views/__init__.py',
         'views/base_view.py',
         'views/settings_view.py',
-        'views/library_view.py'
+        'views/library_view.py',
+        'views/virtual_list.py',
+        'views/debug_overlay.py',
+        'views/year_heatmap.py',
+        'views/render_scheduler.py',
+        'views/entry_editor.py',
+        'views/tag_sidebar.py'
     ]
     missing_files = [f for f in required_files if not os.path.exists(f)]
     if missing_files:
@@ -56,6 +62,18 @@ def run_pyinstaller():
             '--clean',
             '--noconfirm',
             '--add-data=database.py:.',
+            '--add-data=date_format.py:.',
+            '--add-data=tagging.py:.',
+            '--add-data=db_config.py:.',
+            '--add-data=instrumentation.py:.',
+            '--add-data=migrations.py:.',
+            '--add-data=journal_io.py:.',
+            '--add-data=backup.py:.',
+            '--add-data=maintenance.py:.',
+            '--add-data=write_lock.py:.',
+            '--add-data=db_worker.py:.',
+            '--add-data=entry_cache.py:.',
+            '--add-data=storage.py:.',
             '--add-data=views;views',  # Correct syntax for views directory on Windows
             '--add-data=code_journal_icon.ico:.',
             '--icon=code_journal_icon.ico',
@@ -70,6 +88,12 @@ def run_pyinstaller():
             '--hidden-import=views.base_view',
             '--hidden-import=views.settings_view',
             '--hidden-import=views.library_view',
+            '--hidden-import=views.virtual_list',
+            '--hidden-import=views.debug_overlay',
+            '--hidden-import=views.year_heatmap',
+            '--hidden-import=views.render_scheduler',
+            '--hidden-import=views.entry_editor',
+            '--hidden-import=views.tag_sidebar',
             # Additional data files
             '--add-data=data.db:.',
             '--add-data=requirements.txt:.',
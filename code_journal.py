@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Code Journal command-line interface.
+
+A headless front end over the same storage layer as the GUI, for scripts,
+pipes and cron jobs. It never imports Tk.
+
+    code_journal.py add "Learned about SQLite keyset pagination"
+    echo "Entry text" | code_journal.py add --date 2024-05-01
+    code_journal.py list --from 2024-01-01 --to 2024-01-31 --format ndjson
+    code_journal.py today
+    code_journal.py search "generator expressions"
+    code_journal.py tags                                  # tag counts
+    code_journal.py tags python sqlite --entries          # entries tagged with both
+    code_journal.py edit 42 --date 2024-05-02            # content from stdin
+    code_journal.py delete 42
+    code_journal.py changes --since 1200 > changes.ndjson
+    generate_entries | code_journal.py import -          # NDJSON on stdin
+    code_journal.py export - --format ndjson | gzip > backup.ndjson.gz
+    code_journal.py backup                                # online backup, then rotation
+    code_journal.py backup --compact                      # VACUUM INTO snapshot
+    code_journal.py backups
+    code_journal.py restore-backup backups/data-20240501-120000.db
+    code_journal.py maintenance                           # checkpoint, ANALYZE, reclaim free pages
+
+Every command accepts --db PATH and --profile NAME (see db_config.py).
+Commands that only read (list, today, search, tags, changes, export, backup,
+backups) open the journal read-only, so they run alongside the app or any
+other writer; commands that write wait for the writer lease (write_lock.py).
+Exit status is 0 on success, 1 on errors and 2 on usage errors.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Optional, TextIO
+
+import backup
+import database
+import db_config
+import journal_io
+import maintenance
+from instrumentation import configure_logging
+from storage import SqliteStore
+
+OUTPUT_FORMATS = ("text", "ndjson", "json")
+
+
+def _write_entries(entries, fmt: str, out: TextIO) -> int:
+    """Write Entry rows in an output format and return how many were written."""
+    count = 0
+    if fmt == "json":
+        out.write("[")
+    for entry in entries:
+        if fmt == "text":
+            out.write(f"{entry.date}  {' '.join(entry.content.split())}\n")
+        else:
+            record = json.dumps({'id': entry.id, 'content': entry.content,
+                                 'date': entry.date, 'created_at': entry.created_at})
+            if fmt == "json":
+                out.write(f"{',' if count else ''}\n    {record}")
+            else:
+                out.write(record + "\n")
+        count += 1
+    if fmt == "json":
+        out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def _limited(entries, limit: Optional[int]):
+    for index, entry in enumerate(entries):
+        if limit is not None and index >= limit:
+            return
+        yield entry
+
+
+def _validate_date(text: str) -> str:
+    try:
+        datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {text!r}, expected YYYY-MM-DD") from None
+    return text
+
+
+def cmd_add(args, store) -> int:
+    content = _read_content(args.content)
+    if not content:
+        print("error: entry content cannot be empty", file=sys.stderr)
+        return 1
+    entry_id = store.add_entry(content, args.date or datetime.now().strftime("%Y-%m-%d"))
+    if not args.quiet:
+        print(entry_id)
+    return 0
+
+
+def cmd_list(args, store) -> int:
+    entries = store.iter_entries(page_size=args.page_size, start_date=args.start, end_date=args.end)
+    _write_entries(_limited(entries, args.limit), args.format, sys.stdout)
+    return 0
+
+
+def cmd_today(args, store) -> int:
+    _ids, entries = store.get_day_changes(args.date or datetime.now().strftime("%Y-%m-%d"))
+    _write_entries(entries, args.format, sys.stdout)
+    return 0
+
+
+def cmd_search(args, store) -> int:
+    results = store.search_entries(" ".join(args.query), limit=args.limit, offset=args.offset,
+                                   highlight=("", "") if args.format != "text" else ("«", "»"))
+    if args.format == "text":
+        for result in results:
+            sys.stdout.write(f"{result.date}  {' '.join(result.snippet.split())}\n")
+    else:
+        records = [json.dumps(result._asdict()) for result in results]
+        if args.format == "ndjson":
+            sys.stdout.writelines(record + "\n" for record in records)
+        else:
+            sys.stdout.write("[" + ",".join(f"\n    {record}" for record in records)
+                             + ("\n]\n" if records else "]\n"))
+    return 0
+
+
+def _read_content(content: Optional[str]) -> str:
+    if content is None or content == "-":
+        content = sys.stdin.read()
+    return content.strip()
+
+
+def cmd_edit(args, store) -> int:
+    content = _read_content(args.content) if args.content is not None or args.date is None else None
+    if content == "":
+        print("error: entry content cannot be empty", file=sys.stderr)
+        return 1
+    entry = store.update_entry(args.id, content, args.date)
+    if not args.quiet:
+        print(entry.revision)
+    return 0
+
+
+def cmd_delete(args, store) -> int:
+    for entry_id in args.ids:
+        store.delete_entry(entry_id)
+    return 0
+
+
+def cmd_restore(args, store) -> int:
+    for entry_id in args.ids:
+        store.restore_entry(entry_id)
+    return 0
+
+
+def cmd_changes(args, store) -> int:
+    """Write each change after a journal revision as NDJSON, oldest first."""
+    for change in store.iter_changes_since(args.since, page_size=args.page_size):
+        sys.stdout.write(json.dumps(change._asdict()) + "\n")
+    if not args.quiet:
+        print(f"revision {store.get_journal_revision()}", file=sys.stderr)
+    return 0
+
+
+def cmd_tags(args, store) -> int:
+    if args.entries:
+        if not args.tags:
+            print("error: --entries needs at least one tag", file=sys.stderr)
+            return 1
+        limit = args.limit if args.limit is not None else store.count_entries()
+        _write_entries(store.get_entries_with_tags(args.tags, limit=limit), args.format, sys.stdout)
+        return 0
+    tag_counts = store.get_tag_counts(args.tags, args.limit)
+    if args.format == "text":
+        sys.stdout.writelines(f"{tag.entry_count:>8}  #{tag.name}\n" for tag in tag_counts)
+    else:
+        records = [json.dumps(tag._asdict()) for tag in tag_counts]
+        if args.format == "ndjson":
+            sys.stdout.writelines(record + "\n" for record in records)
+        else:
+            sys.stdout.write("[" + ",".join(f"\n    {record}" for record in records)
+                             + ("\n]\n" if records else "]\n"))
+    return 0
+
+
+def _report_progress(args):
+    if not args.progress:
+        return None
+    def report(count):
+        print(f"\r{count} entries...", end="", file=sys.stderr, flush=True)
+    return report
+
+
+def cmd_import(args, store) -> int:
+    progress = _report_progress(args)
+    if args.path == "-":
+        count = journal_io.read_entries(sys.stdin, args.format or "ndjson", progress=progress,
+                                        batch_size=args.batch_size, store=store)
+    else:
+        count = journal_io.import_entries(args.path, args.format, progress=progress,
+                                          batch_size=args.batch_size, store=store)
+    if progress:
+        print(file=sys.stderr)
+    if not args.quiet:
+        print(f"imported {count} entries", file=sys.stderr)
+    return 0
+
+
+def cmd_export(args, store) -> int:
+    progress = _report_progress(args)
+    if args.path == "-":
+        count = journal_io.write_entries(sys.stdout, args.format or "ndjson", progress=progress,
+                                         page_size=args.page_size, store=store)
+    else:
+        count = journal_io.export_entries(args.path, args.format, progress=progress,
+                                          page_size=args.page_size, store=store)
+    if progress:
+        print(file=sys.stderr)
+    if not args.quiet:
+        print(f"exported {count} entries", file=sys.stderr)
+    return 0
+
+
+def _backup_manager(args, store) -> backup.BackupManager:
+    manager = backup.BackupManager.from_config(store.path)
+    if args.dir:
+        manager.directory = args.dir
+    return manager
+
+
+def _report_pages(args):
+    if not args.progress:
+        return None
+    def report(copied, total):
+        print(f"\r{copied} of {total} pages...", end="", file=sys.stderr, flush=True)
+    return report
+
+
+def cmd_backup(args, store) -> int:
+    manager = _backup_manager(args, store)
+    if args.compact:
+        info = manager.snapshot()
+    else:
+        progress = _report_pages(args)
+        info = manager.backup(progress=progress)
+        if progress:
+            print(file=sys.stderr)
+    if not args.quiet:
+        print(info.path)
+    return 0
+
+
+def cmd_backups(args, store) -> int:
+    for info in _backup_manager(args, store).list_backups():
+        sys.stdout.write(f"{info.created:%Y-%m-%d %H:%M:%S}  {info.kind:<11}  "
+                         f"{info.size_bytes:>12,}  {info.path}\n")
+    return 0
+
+
+def cmd_restore_backup(args, store) -> int:
+    progress = _report_pages(args)
+    saved = _backup_manager(args, store).restore(args.path, progress=progress)
+    if progress:
+        print(file=sys.stderr)
+    if not args.quiet:
+        print(f"restored {args.path}; the previous journal was saved to {saved.path}", file=sys.stderr)
+    return 0
+
+
+def _print_status(store) -> None:
+    status = store.get_database_status()
+    print(f"database {status.file_bytes:,} bytes, WAL {status.wal_bytes:,} bytes, "
+          f"{status.free_bytes:,} bytes free, auto_vacuum {status.auto_vacuum}", file=sys.stderr)
+
+
+def cmd_maintenance(args, store) -> int:
+    if args.status:
+        _print_status(store)
+        return 0
+    tasks = args.tasks or (("vacuum",) if args.vacuum else maintenance.IDLE_TASKS)
+    for result in store.run_maintenance(tasks):
+        print(f"{result.task:<19} {result.duration_ms:9.1f} ms  {result.reclaimed_bytes:>12,} bytes  {result.detail}")
+    if not args.quiet:
+        _print_status(store)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="code_journal", description="Code Journal command-line interface.")
+    parser.add_argument("--db", help="journal database (default: see db_config.py)")
+    parser.add_argument("--profile", choices=sorted(db_config.PROFILES), help="connection tuning profile")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log debug output to stderr")
+    subcommands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    add = subcommands.add_parser("add", help="add an entry (content from the argument or stdin)")
+    add.add_argument("content", nargs="?", help="entry text; '-' or omitted reads stdin")
+    add.add_argument("--date", type=_validate_date, help="entry date, YYYY-MM-DD (default: today)")
+    add.add_argument("-q", "--quiet", action="store_true", help="don't print the new entry's id")
+    add.set_defaults(func=cmd_add)
+
+    list_ = subcommands.add_parser("list", help="list entries, newest first")
+    list_.add_argument("--from", dest="start", type=_validate_date, help="first day (inclusive)")
+    list_.add_argument("--to", dest="end", type=_validate_date, help="last day (inclusive)")
+    list_.add_argument("-n", "--limit", type=int, help="stop after this many entries")
+    list_.add_argument("--format", choices=OUTPUT_FORMATS, default="text")
+    list_.add_argument("--page-size", type=int, default=database.DEFAULT_PAGE_SIZE, help=argparse.SUPPRESS)
+    list_.set_defaults(func=cmd_list, read_only=True)
+
+    today = subcommands.add_parser("today", help="show today's entries (or another day's)")
+    today.add_argument("--date", type=_validate_date, help="day to show, YYYY-MM-DD")
+    today.add_argument("--format", choices=OUTPUT_FORMATS, default="text")
+    today.set_defaults(func=cmd_today, read_only=True)
+
+    search = subcommands.add_parser("search", help="full-text search, best matches first")
+    search.add_argument("query", nargs="+")
+    search.add_argument("-n", "--limit", type=int, default=20)
+    search.add_argument("--offset", type=int, default=0)
+    search.add_argument("--format", choices=OUTPUT_FORMATS, default="text")
+    search.set_defaults(func=cmd_search, read_only=True)
+
+    tags = subcommands.add_parser("tags", help="count #tags, or list the entries carrying all given tags")
+    tags.add_argument("tags", nargs="*", metavar="tag", help="count only entries carrying all of these tags")
+    tags.add_argument("--entries", action="store_true", help="list the matching entries instead, newest first")
+    tags.add_argument("-n", "--limit", type=int)
+    tags.add_argument("--format", choices=OUTPUT_FORMATS, default="text")
+    tags.set_defaults(func=cmd_tags, read_only=True)
+
+    edit = subcommands.add_parser("edit", help="change an entry's content and/or date")
+    edit.add_argument("id", type=int)
+    edit.add_argument("content", nargs="?", help="new text; '-' reads stdin; omit with --date to keep the text")
+    edit.add_argument("--date", type=_validate_date, help="move the entry to this day, keeping its time")
+    edit.add_argument("-q", "--quiet", action="store_true", help="don't print the new journal revision")
+    edit.set_defaults(func=cmd_edit)
+
+    delete = subcommands.add_parser("delete", help="delete entries (kept as tombstones until purged)")
+    delete.add_argument("ids", type=int, nargs="+", metavar="id")
+    delete.set_defaults(func=cmd_delete)
+
+    restore = subcommands.add_parser("restore", help="bring back deleted entries")
+    restore.add_argument("ids", type=int, nargs="+", metavar="id")
+    restore.set_defaults(func=cmd_restore)
+
+    changes = subcommands.add_parser("changes", help="NDJSON of entries changed after a journal revision")
+    changes.add_argument("--since", type=int, default=0, help="journal revision already seen (default: 0, all)")
+    changes.add_argument("--page-size", type=int, default=database.DEFAULT_PAGE_SIZE, help=argparse.SUPPRESS)
+    changes.add_argument("-q", "--quiet", action="store_true", help="don't print the latest revision on stderr")
+    changes.set_defaults(func=cmd_changes, read_only=True)
+
+    import_ = subcommands.add_parser("import", help="import JSON/NDJSON entries in one transaction")
+    import_.add_argument("path", help="file to read, or '-' for stdin (NDJSON unless --format json)")
+    import_.add_argument("--format", choices=journal_io.EXPORT_FORMATS, help="default: from the file name")
+    import_.add_argument("--batch-size", type=int, default=database.DEFAULT_BATCH_SIZE)
+    import_.add_argument("--progress", action="store_true", help="show a running count on stderr")
+    import_.add_argument("-q", "--quiet", action="store_true")
+    import_.set_defaults(func=cmd_import)
+
+    export = subcommands.add_parser("export", help="export all entries as JSON/NDJSON")
+    export.add_argument("path", help="file to write (.gz compresses), or '-' for stdout (NDJSON by default)")
+    export.add_argument("--format", choices=journal_io.EXPORT_FORMATS, help="default: from the file name")
+    export.add_argument("--page-size", type=int, default=database.DEFAULT_PAGE_SIZE, help=argparse.SUPPRESS)
+    export.add_argument("--progress", action="store_true", help="show a running count on stderr")
+    export.add_argument("-q", "--quiet", action="store_true")
+    export.set_defaults(func=cmd_export, read_only=True)
+
+    backup_ = subcommands.add_parser("backup", help="back the database up while it is in use")
+    backup_.add_argument("--compact", action="store_true", help="write a compacted snapshot with VACUUM INTO")
+    backup_.add_argument("--dir", help="backup directory (default: see backup.py)")
+    backup_.add_argument("--progress", action="store_true", help="show the pages copied on stderr")
+    backup_.add_argument("-q", "--quiet", action="store_true", help="don't print the backup's path")
+    backup_.set_defaults(func=cmd_backup, read_only=True)
+
+    backups = subcommands.add_parser("backups", help="list backups, newest first")
+    backups.add_argument("--dir", help="backup directory (default: see backup.py)")
+    backups.set_defaults(func=cmd_backups, read_only=True)
+
+    restore_backup = subcommands.add_parser("restore-backup",
+                                            help="replace the journal with a backup (the current one is saved)")
+    restore_backup.add_argument("path", help="backup file to restore")
+    restore_backup.add_argument("--dir", help="where to save the current journal (default: see backup.py)")
+    restore_backup.add_argument("--progress", action="store_true", help="show the pages copied on stderr")
+    restore_backup.add_argument("-q", "--quiet", action="store_true")
+    restore_backup.set_defaults(func=cmd_restore_backup)
+
+    maintenance_ = subcommands.add_parser("maintenance", help="checkpoint the WAL, refresh statistics, "
+                                                               "reclaim free pages")
+    maintenance_.add_argument("--task", dest="tasks", action="append", choices=maintenance.TASKS,
+                              help="run only this task (repeatable; default: the idle tasks)")
+    maintenance_.add_argument("--vacuum", action="store_true",
+                              help="rebuild the database with VACUUM (locks it while running; converts "
+                                   "older journals to incremental auto-vacuum)")
+    maintenance_.add_argument("--status", action="store_true", help="only show the file, WAL and free sizes")
+    maintenance_.add_argument("-q", "--quiet", action="store_true", help="don't show the sizes afterwards")
+    maintenance_.set_defaults(func=cmd_maintenance)
+    return parser
+
+
+def _open_store(args, profile: Optional[db_config.ConnectionProfile]) -> SqliteStore:
+    """Open the journal, read-only for commands that only read it."""
+    if getattr(args, "read_only", False) and os.path.isfile(args.db or database.database_path()):
+        store = SqliteStore(args.db, profile, read_only=True)
+        try:
+            store.create_table()
+            return store
+        except RuntimeError:
+            pass  # The schema needs upgrading first, which writes
+    store = SqliteStore(args.db, profile)
+    store.create_table()
+    return store
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    configure_logging("DEBUG" if args.verbose else None)
+    try:
+        profile = db_config.make_profile(args.profile) if args.profile else None
+        store = _open_store(args, profile)
+        return args.func(args, store)
+    except BrokenPipeError:
+        # The reader (e.g. `head`) went away; stop quietly like other Unix tools
+        sys.stderr.close()
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    except (ValueError, LookupError, OSError, RuntimeError, backup.BackupError, database.sqlite3.Error) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        database.close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,190 @@
+import os
+import re
 import sqlite3
 import threading
+from pathlib import Path
 from contextlib import contextmanager
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Callable, FrozenSet, Iterable, Iterator, Mapping, NamedTuple, Optional, Sequence, Tuple
+from datetime import date, datetime
+import date_format
+import db_config
+import maintenance
+import migrations
+import tagging
+import write_lock
+from instrumentation import get_logger, span, timed
 
-DB_NAME = "data.db"
+# Resolved from db_config (environment, config file, defaults) on first use
+DB_NAME = None
+PROFILE = None
+# Read-only processes open mode=ro connections and never take the writer lease
+READ_ONLY = False
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_BATCH_SIZE = 1000
+_TIME_RE = re.compile(r"\d{2}:\d{2}:\d{2}")
+# Search ranks only the most recent matches, which bounds the cost of common terms
+SEARCH_CANDIDATES = 2000
+MIN_PREFIX_CHARS = 2
+_SEARCH_TOKEN_RE = re.compile(r"\w+")
+_ENTRY_COLUMNS = "id, content, date, created_at, day_number, created_ts, updated_at, revision"
+_INSERT_ENTRY = "INSERT INTO entries (content, date, created_at, day_number, created_ts) VALUES (?, ?, ?, ?, ?);"
 # Thread-local storage for database connections
 _local = threading.local()
+# Process-wide schema description, filled in once by create_table()
+_schema = None
+log = get_logger("database")
+
+class Entry(NamedTuple):
+    """A lightweight read-only journal entry row."""
+    id: int
+    content: str
+    date: str
+    created_at: Optional[str]
+    day_number: int  # see date_format; the integer forms are what reads order by
+    created_ts: int
+    updated_at: Optional[str]  # last edit, None if never edited
+    revision: int  # journal revision of the last insert/edit (see get_changes_since)
+
+class EntryChange(NamedTuple):
+    """An entry as of its latest change; deleted_at is set for deletions (tombstones)."""
+    id: int
+    revision: int
+    content: str
+    date: str
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    deleted_at: Optional[str]
+
+class SearchResult(NamedTuple):
+    """A full-text search hit with a highlighted excerpt of the entry."""
+    id: int
+    date: str
+    snippet: str
+    rank: float
+
+class ChangeEvent(NamedTuple):
+    """Published after a write is committed.
+
+    kind is 'insert', 'import', 'update', 'delete', 'restore' or 'external' (a
+    commit from another connection or process, detected through PRAGMA
+    data_version). days holds the
+    'YYYY-MM-DD' days that were touched; it is empty when they are unknown, as
+    for external changes, which callers should treat as touching every day.
+    """
+    revision: int
+    kind: str
+    entry_ids: Tuple[int, ...] = ()
+    days: FrozenSet[str] = frozenset()
+
+class DayStats(NamedTuple):
+    """Aggregates for one day with at least one entry."""
+    day: str  # 'YYYY-MM-DD'
+    entry_count: int
+    total_chars: int
+    first_at: str  # date of the day's earliest and latest entries
+    last_at: str
+
+class PeriodStats(NamedTuple):
+    """Aggregates for a month ('YYYY-MM') or a year ('YYYY')."""
+    period: str
+    entry_count: int
+    total_chars: int
+    active_days: int
+
+class Streaks(NamedTuple):
+    """Runs of consecutive days with entries.
+
+    current counts back from the reference day (or the day before it, so a
+    streak is not broken until a whole day passes without an entry).
+    """
+    current: int
+    longest: int
+    longest_start: Optional[str]
+    longest_end: Optional[str]
+
+PERIOD_LENGTHS = {'month': 7, 'year': 4}
+
+class TagCount(NamedTuple):
+    """A tag and how many live entries carry it."""
+    name: str
+    entry_count: int
+
+def database_path() -> str:
+    """Path of the journal database, resolved through db_config on first call."""
+    global DB_NAME
+    if DB_NAME is None:
+        DB_NAME = db_config.database_path()
+    return DB_NAME
+
+def connection_profile() -> db_config.ConnectionProfile:
+    """Tuning profile applied to every new connection."""
+    global PROFILE
+    if PROFILE is None:
+        PROFILE = db_config.connection_profile()
+    return PROFILE
+
+def read_only_uri(path: str) -> str:
+    """A URI that opens path read-only (pass uri=True to sqlite3.connect)."""
+    return Path(os.path.abspath(path)).as_uri() + "?mode=ro"
 
 def get_connection() -> sqlite3.Connection:
     """Get a thread-local database connection."""
     if not hasattr(_local, 'connection'):
-        _local.connection = sqlite3.connect(
-            DB_NAME,
-            check_same_thread=False,  # Allow connections from different threads
-            timeout=30.0  # Wait up to 30 seconds for locks
-        )
+        path = database_path()
+        profile = connection_profile()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Each thread gets its own connection, so SQLite's same-thread check stays on
+        if READ_ONLY:
+            connection = sqlite3.connect(read_only_uri(path), uri=True, timeout=profile.busy_timeout_ms / 1000)
+        else:
+            connection = sqlite3.connect(path, timeout=profile.busy_timeout_ms / 1000)
         # Enable foreign keys and set journal mode to WAL for better concurrency
-        _local.connection.execute("PRAGMA foreign_keys = ON;")
-        _local.connection.execute("PRAGMA journal_mode = WAL;")
+        connection.execute("PRAGMA foreign_keys = ON;")
+        if not READ_ONLY:
+            # Lets idle maintenance give free pages back. Only takes effect on a new
+            # database (it must come before WAL mode writes the header) or a VACUUM.
+            # Setting it on an existing file waits for the write lock, so new files only
+            if connection.execute("PRAGMA page_count;").fetchone()[0] == 0:
+                connection.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+            connection.execute("PRAGMA journal_mode = WAL;")
+        for pragma in profile.pragmas():
+            connection.execute(pragma)
+        _local.connection = connection
     return _local.connection
 
+def use_database(path: Optional[str] = None, profile: Optional[db_config.ConnectionProfile] = None,
+                 read_only: Optional[bool] = None) -> None:
+    """Point the module at another database file, connection profile and/or access mode.
+
+    read_only opens every connection with mode=ro: reads work alongside any
+    writer, writes fail with sqlite3.OperationalError, and the schema must
+    already be current. Call before the database is used: connections already
+    open on other threads keep using the previous settings.
+    """
+    global DB_NAME, PROFILE, READ_ONLY, _schema
+    close_connection()
+    if path is not None:
+        DB_NAME = path
+        _schema = None
+    if profile is not None:
+        PROFILE = profile
+    if read_only is not None:
+        READ_ONLY = read_only
+
+@contextmanager
+def _write_transaction() -> Iterator[sqlite3.Connection]:
+    """A BEGIN IMMEDIATE transaction under the writer lease; see write_lock.py.
+
+    Commits when the block succeeds, rolls back when it raises, and raises
+    write_lock.JournalBusy if another writer keeps the journal past the profile's
+    write_timeout_ms.
+    """
+    timeout = connection_profile().write_timeout_ms / 1000
+    with write_lock.write_transaction(get_connection(), database_path(), timeout) as conn:
+        yield conn
+
 @contextmanager
 def get_db():
     """Context manager for database operations."""
@@ -34,137 +198,753 @@ def get_db():
         # Don't close the connection, just commit
         conn.commit()
 
+class ChangeBus:
+    """Monotonic data revision plus subscribers notified of every change."""
+
+    def __init__(self):
+        self._revision = 0
+        self._lock = threading.Lock()
+        self._subscribers = []
+
+    def current_revision(self) -> int:
+        return self._revision
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> Callable[[ChangeEvent], None]:
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, kind: str, entry_ids: Iterable[int] = (), days: Iterable[str] = ()) -> ChangeEvent:
+        """Bump the revision and call every subscriber with the new event."""
+        with self._lock:
+            self._revision += 1
+            event = ChangeEvent(self._revision, kind, tuple(entry_ids), frozenset(days))
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:
+                log.exception("Error in change subscriber %r", callback)
+        return event
+
+# Data-change bus: every committed write bumps the revision and notifies subscribers
+_changes = ChangeBus()
+_publish_change = _changes.publish
+
+def current_revision() -> int:
+    """Return the data revision. It increases with every published change."""
+    return _changes.current_revision()
+
+def subscribe(callback: Callable[[ChangeEvent], None]) -> Callable[[ChangeEvent], None]:
+    """Call callback(event) for every change from now on.
+
+    Callbacks run on the thread that made the write (e.g. the database worker),
+    so they must not touch Tk widgets directly.
+    """
+    return _changes.subscribe(callback)
+
+def unsubscribe(callback: Callable[[ChangeEvent], None]) -> None:
+    _changes.unsubscribe(callback)
+
+def check_external_changes() -> Optional[ChangeEvent]:
+    """Publish an 'external' change if another connection committed since the last check.
+
+    Uses PRAGMA data_version on the calling thread's connection; the first call
+    on a connection only records the baseline.
+    """
+    data_version = get_connection().execute("PRAGMA data_version;").fetchone()[0]
+    last_version = getattr(_local, 'data_version', None)
+    _local.data_version = data_version
+    if last_version is not None and data_version != last_version:
+        return _publish_change('external')
+    return None
+
+@timed("db.create_table")
 def create_table():
-    """Create the entries table if it doesn't exist."""
+    """Create or upgrade the database schema by running any pending migrations."""
+    global _schema
     try:
         with get_db() as conn:
-            # First, check if the table exists
-            cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='entries';")
-            table_exists = cursor.fetchone() is not None
-
-            if not table_exists:
-                # Create new table with all columns
-                conn.execute("""
-                    CREATE TABLE entries (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        content TEXT NOT NULL,
-                        date TEXT NOT NULL,
-                        created_at TEXT
-                    );
-                """)
+            if READ_ONLY:
+                schema = migrations.read_schema(conn)
+                if schema.version != migrations.SCHEMA_VERSION:
+                    raise RuntimeError(f"Database schema version {schema.version} needs upgrading to "
+                                       f"{migrations.SCHEMA_VERSION}; open it once without read-only access")
+                _schema = schema
+            elif migrations.get_user_version(conn) < migrations.SCHEMA_VERSION:
+                # Another process may be migrating a big journal; allow as long as the busy timeout
+                with write_lock.lease_for(database_path()).hold(connection_profile().busy_timeout_ms / 1000):
+                    _schema = migrations.migrate(conn)
             else:
-                # Check if created_at column exists
-                cursor = conn.execute("PRAGMA table_info(entries);")
-                columns = [column[1] for column in cursor.fetchall()]
-                
-                if 'created_at' not in columns:
-                    # Add created_at column without default value
-                    conn.execute("""
-                        ALTER TABLE entries 
-                        ADD COLUMN created_at TEXT;
-                    """)
-                    # Update existing rows with current timestamp
-                    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    conn.execute("UPDATE entries SET created_at = ? WHERE created_at IS NULL;", (current_time,))
-    except sqlite3.Error as e:
-        print(f"Error creating/updating table: {e}")
-        raise
-
-def add_entry(entry_content: str, entry_date: str) -> None:
-    """Add a new entry to the database."""
+                _schema = migrations.migrate(conn)
+    except sqlite3.Error as e:
+        log.error("Error creating/updating table: %s", e)
+        raise
+
+def get_schema() -> migrations.SchemaInfo:
+    """Return the cached schema description, migrating the database on first use."""
+    if _schema is None:
+        create_table()
+    return _schema
+
+def normalize_entry_date(entry_date: str, time_of_day: str) -> str:
+    """Return entry_date as 'YYYY-MM-DD HH:MM:SS', using time_of_day for bare dates.
+
+    Raises ValueError for anything that is not a valid date or date-time.
+    """
+    if len(entry_date) == 10:
+        date.fromisoformat(entry_date)
+        return f"{entry_date} {time_of_day}"
+    if len(entry_date) == 19 and entry_date[10] == " " and _TIME_RE.fullmatch(entry_date, 11):
+        datetime.fromisoformat(entry_date)
+        return entry_date
+    raise ValueError(f"Invalid entry date: {entry_date!r}")
+
+@timed("db.add_entry")
+def add_entry(entry_content: str, entry_date: str) -> int:
+    """Add a new entry to the database and return its id."""
     if not entry_content or not entry_date:
         raise ValueError("Content and date cannot be empty")
     
     try:
-        with get_db() as conn:
+        with _write_transaction() as conn:
             # Ensure we have both date and time components
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            now = datetime.now()
+            current_time = now.strftime("%Y-%m-%d %H:%M:%S")
             
             # If entry_date is just a date, combine it with current time
-            try:
-                # Try to parse as datetime first
-                datetime.strptime(entry_date, "%Y-%m-%d %H:%M:%S")
-                formatted_date = entry_date
-            except ValueError:
-                # If that fails, assume it's just a date and add the current time
-                date_obj = datetime.strptime(entry_date, "%Y-%m-%d")
-                formatted_date = f"{date_obj.strftime('%Y-%m-%d')} {datetime.now().strftime('%H:%M:%S')}"
+            formatted_date = normalize_entry_date(entry_date, current_time[11:])
             
-            print(f"Adding entry with date: {formatted_date}")  # Debug log
-            
-            conn.execute(
-                "INSERT INTO entries (content, date, created_at) VALUES (?, ?, ?);",
-                (entry_content, formatted_date, current_time)
+            log.debug("Adding entry with date %s", formatted_date)
+
+            cursor = conn.execute(_INSERT_ENTRY, (entry_content, formatted_date, current_time,
+                                                  date_format.day_number(formatted_date),
+                                                  date_format.timestamp(current_time)))
+            tagging.write_entry_tags(conn, [(cursor.lastrowid, entry_content)])
+    except sqlite3.Error as e:
+        log.error("Error adding entry: %s", e)
+        raise
+    _publish_change('insert', (cursor.lastrowid,), (formatted_date[:10],))
+    return cursor.lastrowid
+
+def prepare_entry_rows(batch: List[Mapping[str, Any]], first_index: int, current_time: str) -> List[tuple]:
+    """Validate a batch of entry mappings and turn them into INSERT parameter rows.
+
+    Rows are (content, date, created_at, day_number, created_ts).
+    """
+    time_of_day = current_time[11:]
+    created_ts = date_format.timestamp(current_time)
+    normalized = {}  # Imports repeat the same dates a lot; validate each distinct value once
+    rows = []
+    for offset, entry in enumerate(batch):
+        try:
+            content = entry['content']
+            entry_date = entry['date']
+        except (KeyError, TypeError):
+            raise ValueError(f"Entry {first_index + offset} must have 'content' and 'date'") from None
+        if not content or not entry_date:
+            raise ValueError(f"Entry {first_index + offset}: content and date cannot be empty")
+        known = normalized.get(entry_date)
+        if known is None:
+            try:
+                formatted_date = normalize_entry_date(entry_date, time_of_day)
+            except (ValueError, TypeError):
+                raise ValueError(f"Entry {first_index + offset}: invalid date {entry_date!r}") from None
+            known = normalized[entry_date] = (formatted_date, date_format.day_number(formatted_date))
+        rows.append((content, known[0], current_time, known[1], created_ts))
+    return rows
+
+@timed("db.bulk_add_entries")
+def bulk_add_entries(entries: Iterable[Mapping[str, Any]],
+                     batch_size: int = DEFAULT_BATCH_SIZE,
+                     progress: Optional[Callable[[int], None]] = None) -> int:
+    """Insert many entries in a single transaction and return how many were added.
+
+    entries is any iterable of mappings with 'content' and 'date' keys (the
+    export format), consumed batch_size at a time, so generators are streamed
+    rather than materialized. Dates are validated per batch before it is
+    written. If any entry is invalid the whole import is rolled back.
+    progress, if given, is called with the running total after every batch.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    get_schema()
+
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    total = 0
+    days = set()
+
+    def insert(conn, batch):
+        rows = prepare_entry_rows(batch, total, current_time)
+        conn.executemany(_INSERT_ENTRY, rows)
+        # We hold the write lock, so the batch got consecutive ids ending at the last rowid
+        last_id = conn.execute("SELECT last_insert_rowid();").fetchone()[0]
+        tagging.write_entry_tags(conn, [(last_id - len(rows) + 1 + offset, row[0])
+                                        for offset, row in enumerate(rows)])
+        days.update(row[1][:10] for row in rows)
+
+    try:
+        with _write_transaction() as conn:
+            batch = []
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    insert(conn, batch)
+                    total += len(batch)
+                    batch = []
+                    if progress:
+                        progress(total)
+            if batch:
+                insert(conn, batch)
+                total += len(batch)
+                if progress:
+                    progress(total)
+    except sqlite3.Error as e:
+        log.error("Error importing entries: %s", e)
+        raise
+    if total:
+        _publish_change('import', days=days)
+    return total
+
+def _read_entry(conn: sqlite3.Connection, entry_id: int) -> Optional[Entry]:
+    row = conn.execute(f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE id = ? AND deleted_at IS NULL;",
+                       (entry_id,)).fetchone()
+    return Entry._make(row) if row else None
+
+@timed("db.get_entry")
+def get_entry(entry_id: int) -> Optional[Entry]:
+    """Return the live entry with this id, or None (also for deleted entries)."""
+    get_schema()
+    try:
+        with get_db() as conn:
+            return _read_entry(conn, entry_id)
+    except sqlite3.Error as e:
+        log.error("Error getting entry %s: %s", entry_id, e)
+        raise
+
+@timed("db.update_entry")
+def update_entry(entry_id: int, entry_content: Optional[str] = None,
+                 entry_date: Optional[str] = None) -> Entry:
+    """Change an entry's content and/or date and return the updated row.
+
+    A bare 'YYYY-MM-DD' date keeps the entry's time of day. Raises ValueError
+    for empty content or an invalid date and LookupError if no live entry has
+    this id. An edit that changes nothing is not written.
+    """
+    if entry_content is None and entry_date is None:
+        raise ValueError("Nothing to update")
+    if entry_content is not None and not entry_content:
+        raise ValueError("Content cannot be empty")
+    get_schema()
+    try:
+        # Written up front, so no other commit lands between the read and the write
+        with _write_transaction() as conn:
+            entry = _read_entry(conn, entry_id)
+            if entry is None:
+                raise LookupError(f"No entry with id {entry_id}")
+            content = entry.content if entry_content is None else entry_content
+            formatted_date = normalize_entry_date(entry_date, entry.date[11:]) if entry_date else entry.date
+            if content == entry.content and formatted_date == entry.date:
+                return entry
+            # Triggers refresh day_number, the revision, the search index and daily_stats
+            conn.execute("UPDATE entries SET content = ?, date = ?, updated_at = ? WHERE id = ?;",
+                         (content, formatted_date, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), entry_id))
+            if content != entry.content:
+                tagging.write_entry_tags(conn, [(entry_id, content)], replace=True)
+            updated = _read_entry(conn, entry_id)
+    except sqlite3.Error as e:
+        log.error("Error updating entry %s: %s", entry_id, e)
+        raise
+    _publish_change('update', (entry_id,), (entry.date[:10], updated.date[:10]))
+    return updated
+
+def _set_deleted(entry_id: int, deleted: bool) -> str:
+    """Turn a live entry into a tombstone or back; returns the entry's date."""
+    get_schema()
+    try:
+        with _write_transaction() as conn:
+            row = conn.execute(
+                f"SELECT date, content FROM entries WHERE id = ? AND deleted_at IS {'NULL' if deleted else 'NOT NULL'};",
+                (entry_id,)
+            ).fetchone()
+            if row is None:
+                raise LookupError(f"No {'entry' if deleted else 'deleted entry'} with id {entry_id}")
+            deleted_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if deleted else None
+            # A trigger unlinks the tags of a deleted entry; a restore links them again
+            conn.execute("UPDATE entries SET deleted_at = ? WHERE id = ?;", (deleted_at, entry_id))
+            if not deleted:
+                tagging.write_entry_tags(conn, [(entry_id, row[1])])
+    except sqlite3.Error as e:
+        log.error("Error %s entry %s: %s", "deleting" if deleted else "restoring", entry_id, e)
+        raise
+    return row[0]
+
+@timed("db.delete_entry")
+def delete_entry(entry_id: int) -> None:
+    """Soft-delete an entry: it disappears from every read but stays as a tombstone.
+
+    The tombstone shows up in get_changes_since() so other copies can apply
+    the deletion, and restore_entry() can bring it back. Raises LookupError if
+    no live entry has this id.
+    """
+    entry_date = _set_deleted(entry_id, True)
+    _publish_change('delete', (entry_id,), (entry_date[:10],))
+
+@timed("db.restore_entry")
+def restore_entry(entry_id: int) -> Entry:
+    """Bring back a soft-deleted entry and return it. Raises LookupError if there is no such tombstone."""
+    entry_date = _set_deleted(entry_id, False)
+    _publish_change('restore', (entry_id,), (entry_date[:10],))
+    return get_entry(entry_id)
+
+@timed("db.purge_deleted")
+def purge_deleted(deleted_before: Optional[str] = None) -> int:
+    """Permanently remove tombstones deleted before a 'YYYY-MM-DD HH:MM:SS' time (default: all).
+
+    Only purge tombstones every copy has synced past: a purged deletion no
+    longer appears in get_changes_since(). Returns how many were removed.
+    """
+    get_schema()
+    try:
+        with _write_transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM entries WHERE deleted_at IS NOT NULL AND deleted_at < ?;",
+                (deleted_before or "9999-12-31 23:59:59",)
             )
-            print("Entry added successfully")  # Debug log
+            return cursor.rowcount
     except sqlite3.Error as e:
-        print(f"Error adding entry: {e}")
+        log.error("Error purging deleted entries: %s", e)
         raise
 
+def iter_entry_pages(page_size: int = DEFAULT_PAGE_SIZE,
+                     start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> Iterator[List[Entry]]:
+    """Yield entries newest first, one page at a time.
+
+    Pages are fetched with keyset pagination on (date, created_at, id), so each
+    page costs the same regardless of how deep into the journal it is and only
+    one page is held in memory. start_date and end_date are optional inclusive
+    'YYYY-MM-DD' bounds.
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    get_schema()
+
+    bounds = ["deleted_at IS NULL"]
+    params = []
+    if start_date:
+        bounds.append("date >= ?")
+        params.append(f"{start_date[:10]} 00:00:00")
+    if end_date:
+        bounds.append("date <= ?")
+        params.append(f"{end_date[:10]} 23:59:59")
+
+    last_key = None
+    while True:
+        conditions = list(bounds)
+        page_params = list(params)
+        if last_key is not None:
+            conditions.append("(date, created_at, id) < (?, ?, ?)")
+            page_params.extend(last_key)
+        where = f"WHERE {' AND '.join(conditions)}"
+        try:
+            with span("db.iter_entry_pages.page"), get_db() as conn:
+                cursor = conn.execute(
+                    f"SELECT {_ENTRY_COLUMNS} FROM entries {where} "
+                    "ORDER BY date DESC, created_at DESC, id DESC LIMIT ?;",
+                    (*page_params, page_size)
+                )
+                page = [Entry._make(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            log.error("Error getting entries page: %s", e)
+            raise
+
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+        last_key = (last.date, last.created_at, last.id)
+
+def iter_entries(page_size: int = DEFAULT_PAGE_SIZE,
+                 start_date: Optional[str] = None,
+                 end_date: Optional[str] = None) -> Iterator[Entry]:
+    """Yield entries newest first in constant memory. See iter_entry_pages()."""
+    for page in iter_entry_pages(page_size, start_date, end_date):
+        yield from page
+
 def get_entries() -> List[Dict[str, Any]]:
     """Get all entries ordered by date descending."""
+    return [{'id': entry.id, 'content': entry.content, 'date': entry.date} for entry in iter_entries()]
+
+@timed("db.count_entries")
+def count_entries() -> int:
+    """Return the total number of live entries (summed from daily_stats, O(days))."""
+    get_schema()
     try:
         with get_db() as conn:
-            # First check if created_at column exists
-            cursor = conn.execute("PRAGMA table_info(entries);")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'created_at' in columns:
-                # Use created_at in ordering if it exists
-                cursor = conn.execute(
-                    "SELECT content, date FROM entries ORDER BY date DESC, created_at DESC;"
-                )
-            else:
-                # Fallback to date-only ordering
-                cursor = conn.execute(
-                    "SELECT content, date FROM entries ORDER BY date DESC;"
-                )
-            
-            columns = [column[0] for column in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return conn.execute("SELECT COALESCE(SUM(entry_count), 0) FROM daily_stats;").fetchone()[0]
+    except sqlite3.Error as e:
+        log.error("Error counting entries: %s", e)
+        raise
+
+@timed("db.get_entries_page")
+def get_entries_page(offset: int, limit: int) -> List[Entry]:
+    """Get a window of entries in the same order as iter_entries()."""
+    get_schema()
+    try:
+        with get_db() as conn:
+            cursor = conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE deleted_at IS NULL "
+                "ORDER BY date DESC, created_at DESC, id DESC LIMIT ? OFFSET ?;",
+                (limit, offset)
+            )
+            return [Entry._make(row) for row in cursor.fetchall()]
     except sqlite3.Error as e:
-        print(f"Error getting entries: {e}")
+        log.error("Error getting entries page: %s", e)
         raise
 
+@timed("db.get_entries_by_date")
 def get_entries_by_date(date_str):
     """Get all entries for a specific date."""
+    get_schema()
     try:
         with get_db() as conn:
-            # Convert date string to datetime for comparison
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            start_of_day = date_obj.strftime("%Y-%m-%d 00:00:00")
-            end_of_day = date_obj.strftime("%Y-%m-%d 23:59:59")
-            
-            print(f"Querying entries between {start_of_day} and {end_of_day}")  # Debug log
-            
+            day = _day_number_arg(date_str)
             cursor = conn.execute("""
-                SELECT content, date, created_at
+                SELECT id, content, date, created_at
                 FROM entries
-                WHERE date BETWEEN ? AND ?
-                ORDER BY created_at DESC
-            """, (start_of_day, end_of_day))
-            
-            entries = []
-            for row in cursor.fetchall():
-                entry = {
-                    'content': row[0],
-                    'date': row[1],
-                    'created_at': row[2]
-                }
-                entries.append(entry)
-                print(f"Found entry: {entry}")  # Debug log
-            
+                WHERE day_number = ? AND deleted_at IS NULL
+                ORDER BY created_ts DESC, id DESC
+            """, (day,))
+
+            entries = [{'id': row[0], 'content': row[1], 'date': row[2], 'created_at': row[3]}
+                       for row in cursor.fetchall()]
+            log.debug("Found %d entries for %s", len(entries), date_str)
             return entries
     except Exception as e:
-        print(f"Error in get_entries_by_date: {e}")  # Debug log
+        log.error("Error in get_entries_by_date: %s", e)
+        raise
+
+def _day_number_arg(date_str: str) -> int:
+    """day_number of a 'YYYY-MM-DD' argument; ValueError for anything else."""
+    return date.fromisoformat(date_str).toordinal() - date_format.EPOCH_ORDINAL
+
+@timed("db.get_day_changes")
+def get_day_changes(date_str: str, after: Optional[int] = None) -> Tuple[List[int], List[Entry]]:
+    """Return what an incremental view of one day needs to catch up.
+
+    Returns (ids, changed): the ids of all live entries on the day, and the
+    entries added or edited after journal revision after, newest first (all
+    of them when after is None). Deleted entries are the ones missing from
+    ids. Both are read in one transaction from the day index, so a refresh
+    costs about as much as the day's rows, not the journal's.
+    """
+    get_schema()
+    day = _day_number_arg(date_str)
+    try:
+        with get_db() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN;")  # One read snapshot for both queries
+            ids = [row[0] for row in conn.execute(
+                "SELECT id FROM entries WHERE day_number = ? AND deleted_at IS NULL;", (day,)
+            )]
+            cursor = conn.execute(f"""
+                SELECT {_ENTRY_COLUMNS} FROM entries
+                WHERE day_number = ? AND deleted_at IS NULL AND revision > ?
+                ORDER BY created_ts DESC, id DESC
+            """, (day, -1 if after is None else after))
+            return ids, [Entry._make(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        log.error("Error getting changes for %s: %s", date_str, e)
+        raise
+
+def split_search_query(text: str) -> Tuple[List[str], Optional[str]]:
+    """Split free text into whole words and a trailing prefix still being typed.
+
+    The last word is treated as a prefix; if it is shorter than
+    MIN_PREFIX_CHARS it would match most of the index, so it is left out
+    (returned as None) until it grows.
+    """
+    tokens = _SEARCH_TOKEN_RE.findall(text)
+    if not tokens:
+        return [], None
+    *complete, last = tokens
+    return complete, (last if len(last) >= MIN_PREFIX_CHARS else None)
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix.
+
+    Words are quoted so FTS5 syntax in user input is taken literally.
+    """
+    complete, prefix = split_search_query(text)
+    terms = [f'"{token}"' for token in complete]
+    if prefix:
+        terms.append(f'"{prefix}"*')
+    return " ".join(terms)
+
+@timed("db.search_entries")
+def search_entries(query: str, limit: int = 20, offset: int = 0,
+                   highlight: tuple = ("«", "»")) -> List[SearchResult]:
+    """Full-text search over entry content, best matches first.
+
+    Results are ranked with bm25 among the SEARCH_CANDIDATES most recent
+    matching entries, so a very common term costs the same as a rare one.
+    Returns an empty list when the query has no searchable words.
+    """
+    get_schema()
+    match = _fts_query(query)
+    if not match:
+        return []
+    try:
+        with get_db() as conn:
+            cursor = conn.execute("""
+                SELECT e.id, e.date,
+                       snippet(entries_fts, 0, ?2, ?3, '…', 16),
+                       entries_fts.rank
+                FROM entries_fts
+                JOIN entries e ON e.id = entries_fts.rowid
+                WHERE entries_fts MATCH ?1
+                  AND entries_fts.rowid >= COALESCE((
+                      SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?1
+                      ORDER BY rowid DESC LIMIT 1 OFFSET ?4
+                  ), 0)
+                ORDER BY entries_fts.rank
+                LIMIT ?5 OFFSET ?6
+            """, (match, highlight[0], highlight[1], SEARCH_CANDIDATES - 1, limit, offset))
+            return [SearchResult._make(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        log.error("Error searching entries: %s", e)
+        raise
+
+def _day_range_clause(start_day: Optional[str], end_day: Optional[str]) -> Tuple[str, list]:
+    conditions, params = [], []
+    if start_day:
+        conditions.append("day >= ?")
+        params.append(start_day[:10])
+    if end_day:
+        conditions.append("day <= ?")
+        params.append(end_day[:10])
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+@timed("db.get_daily_stats")
+def get_daily_stats(start_day: Optional[str] = None, end_day: Optional[str] = None) -> List[DayStats]:
+    """Per-day aggregates for the days with entries between start_day and end_day (inclusive), oldest first."""
+    get_schema()
+    where, params = _day_range_clause(start_day, end_day)
+    try:
+        with get_db() as conn:
+            cursor = conn.execute(f"""
+                SELECT day, entry_count, total_chars, first_at, last_at
+                FROM daily_stats {where} ORDER BY day
+            """, params)
+            return [DayStats._make(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        log.error("Error reading daily stats: %s", e)
         raise
 
+@timed("db.get_period_stats")
+def get_period_stats(period: str = "month", start_day: Optional[str] = None,
+                     end_day: Optional[str] = None) -> List[PeriodStats]:
+    """Entry counts per month or year (period 'month' or 'year'), oldest first."""
+    if period not in PERIOD_LENGTHS:
+        raise ValueError(f"period must be one of {sorted(PERIOD_LENGTHS)}, not {period!r}")
+    get_schema()
+    where, params = _day_range_clause(start_day, end_day)
+    try:
+        with get_db() as conn:
+            cursor = conn.execute(f"""
+                SELECT substr(day, 1, {PERIOD_LENGTHS[period]}) AS period,
+                       sum(entry_count), sum(total_chars), count(*)
+                FROM daily_stats {where}
+                GROUP BY period ORDER BY period
+            """, params)
+            return [PeriodStats._make(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        log.error("Error reading %s stats: %s", period, e)
+        raise
+
+def compute_streaks(days: Iterable[str], as_of: Optional[str] = None) -> Streaks:
+    """Find the current and longest streaks in ascending 'YYYY-MM-DD' days, in one pass."""
+    reference = date.fromisoformat(as_of[:10]) if as_of else date.today()
+    longest = run = 0
+    longest_start = longest_end = None
+    run_start = previous = None
+    for day in days:
+        current_day = date.fromisoformat(day)
+        if current_day > reference:
+            break
+        if previous is not None and (current_day - previous).days == 1:
+            run += 1
+        else:
+            run, run_start = 1, current_day
+        if run > longest:
+            longest, longest_start, longest_end = run, run_start, current_day
+        previous = current_day
+    current = run if previous is not None and (reference - previous).days <= 1 else 0
+    return Streaks(current, longest,
+                   longest_start.isoformat() if longest_start else None,
+                   longest_end.isoformat() if longest_end else None)
+
+@timed("db.get_streaks")
+def get_streaks(as_of: Optional[str] = None) -> Streaks:
+    """Current and longest runs of consecutive days with entries, as of a day (default today)."""
+    get_schema()
+    try:
+        with get_db() as conn:
+            days = [row[0] for row in conn.execute("SELECT day FROM daily_stats ORDER BY day;")]
+    except sqlite3.Error as e:
+        log.error("Error computing streaks: %s", e)
+        raise
+    return compute_streaks(days, as_of)
+
+def _tag_filter(conn: sqlite3.Connection, tags: Iterable[str]) -> Optional[Tuple[str, List[int]]]:
+    """WHERE conditions on entry_tags AS driver matching entries with every tag, or None if none can.
+
+    The rarest tag drives the scan over its primary key range; each other tag
+    costs one primary key probe per candidate.
+    """
+    names = list(dict.fromkeys(name for name in map(tagging.normalize_tag, tags) if name))
+    if not names:
+        raise ValueError("At least one tag is required")
+    found = conn.execute(f"SELECT id, entry_count FROM tags WHERE name IN ({','.join('?' * len(names))});",
+                         names).fetchall()
+    if len(found) < len(names) or any(count == 0 for _tag_id, count in found):
+        return None
+    tag_ids = [tag_id for tag_id, _count in sorted(found, key=lambda row: row[1])]
+    probe = " AND EXISTS (SELECT 1 FROM entry_tags WHERE tag_id = ? AND entry_id = driver.entry_id)"
+    return "driver.tag_id = ?" + probe * (len(tag_ids) - 1), tag_ids
+
+@timed("db.get_tag_counts")
+def get_tag_counts(within: Sequence[str] = (), limit: Optional[int] = None) -> List[TagCount]:
+    """Tags with live entries, most used first.
+
+    With within, counts only entries carrying every tag in within (those tags
+    included, each with the size of the intersection), which is what a tag
+    filter needs to show how far each further tag would narrow it.
+    """
+    get_schema()
+    try:
+        with get_db() as conn:
+            if not within:
+                cursor = conn.execute(
+                    "SELECT name, entry_count FROM tags WHERE entry_count > 0 "
+                    "ORDER BY entry_count DESC, id DESC LIMIT ?;",
+                    (-1 if limit is None else limit,)
+                )
+                return [TagCount._make(row) for row in cursor.fetchall()]
+            tag_filter = _tag_filter(conn, within)
+            if tag_filter is None:
+                return []
+            conditions, params = tag_filter
+            # Group on the ids first and look the few resulting names up afterwards
+            cursor = conn.execute(f"""
+                SELECT tags.name, counts.entry_count FROM (
+                    SELECT other.tag_id, count(*) AS entry_count
+                    FROM entry_tags AS driver JOIN entry_tags AS other ON other.entry_id = driver.entry_id
+                    WHERE {conditions} GROUP BY other.tag_id
+                ) AS counts JOIN tags ON tags.id = counts.tag_id
+                ORDER BY counts.entry_count DESC, tags.id DESC LIMIT ?;
+            """, (*params, -1 if limit is None else limit))
+            return [TagCount._make(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        log.error("Error counting tags: %s", e)
+        raise
+
+@timed("db.get_entries_with_tags")
+def get_entries_with_tags(tags: Sequence[str], limit: int = 20, offset: int = 0) -> List[Entry]:
+    """Live entries carrying every one of tags ('#' optional, any case), most recently added first."""
+    get_schema()
+    try:
+        with get_db() as conn:
+            tag_filter = _tag_filter(conn, tags)
+            if tag_filter is None:
+                return []
+            conditions, params = tag_filter
+            cursor = conn.execute(f"""
+                SELECT {_ENTRY_COLUMNS} FROM entry_tags AS driver JOIN entries ON entries.id = driver.entry_id
+                WHERE {conditions}
+                ORDER BY driver.entry_id DESC LIMIT ? OFFSET ?;
+            """, (*params, limit, offset))
+            return [Entry._make(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        log.error("Error getting entries tagged %s: %s", tags, e)
+        raise
+
+@timed("db.get_journal_revision")
+def get_journal_revision() -> int:
+    """The journal revision: bumped in the database by every insert, edit, delete and restore.
+
+    Unlike current_revision(), which counts changes seen by this process, it
+    is stored with the data, so it can be handed to get_changes_since() later
+    or from another process.
+    """
+    get_schema()
+    try:
+        with get_db() as conn:
+            return conn.execute("SELECT revision FROM sync_state WHERE id = 1;").fetchone()[0]
+    except sqlite3.Error as e:
+        log.error("Error reading the journal revision: %s", e)
+        raise
+
+@timed("db.get_changes_since")
+def get_changes_since(revision: int, limit: int = DEFAULT_PAGE_SIZE) -> List[EntryChange]:
+    """Entries added, edited, deleted or restored after a journal revision, oldest change first.
+
+    Each entry appears once, as of its latest change. Pass the last row's
+    revision back in to get the next batch; an empty list means caught up.
+    """
+    get_schema()
+    try:
+        with get_db() as conn:
+            cursor = conn.execute("""
+                SELECT id, revision, content, date, created_at, updated_at, deleted_at
+                FROM entries WHERE revision > ? ORDER BY revision LIMIT ?;
+            """, (revision, limit))
+            return [EntryChange._make(row) for row in cursor.fetchall()]
+    except sqlite3.Error as e:
+        log.error("Error reading changes since revision %s: %s", revision, e)
+        raise
+
+def iter_changes_since(revision: int, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[EntryChange]:
+    """Yield every change after a journal revision in constant memory. See get_changes_since()."""
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    while True:
+        page = get_changes_since(revision, page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        revision = page[-1].revision
+
+def run_maintenance(tasks: Sequence[str] = maintenance.IDLE_TASKS) -> List[maintenance.MaintenanceResult]:
+    """Run maintenance tasks on this thread's connection; see maintenance.py."""
+    get_schema()
+    conn = get_connection()
+    if conn.in_transaction:
+        conn.commit()
+    # ANALYZE and vacuuming write; waiting here is fine, the user is idle
+    with write_lock.lease_for(database_path()).hold(connection_profile().write_timeout_ms / 1000):
+        return maintenance.run_tasks(conn, tasks)
+
+def get_database_status() -> maintenance.DatabaseStatus:
+    """File, WAL and free-page sizes of the journal."""
+    return maintenance.database_status(get_connection())
+
 def close_connection():
     """Close the database connection for the current thread."""
     if hasattr(_local, 'connection'):
         try:
             _local.connection.close()
         except sqlite3.Error as e:
-            print(f"Error closing connection: {e}")
+            log.error("Error closing connection: %s", e)
         finally:
-            del _local.connection
\ No newline at end of file
+            del _local.connection
+            # data_version is per connection; the next one starts a new baseline
+            _local.__dict__.pop('data_version', None)
@@ -0,0 +1,52 @@
+"""
+Integer forms of entry dates and cached display formatting.
+
+Entries store their dates as 'YYYY-MM-DD HH:MM:SS' text and, since schema
+version 5, as integers: day_number (days since 1970-01-01) and created_ts
+(seconds since 1970-01-01 00:00:00). Both integers count the journal's local
+wall-clock time as if it were UTC, so they order exactly like the strings and
+convert back without any time zone rules.
+
+The parsers here slice fixed positions instead of calling strptime, and the
+display formatters are memoized per day or minute, so rendering N entries
+formats each distinct day once rather than parsing N strings.
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+SECONDS_PER_DAY = 86400
+
+
+def day_number(text: str) -> int:
+    """Days since 1970-01-01 of a 'YYYY-MM-DD...' string."""
+    return date(int(text[0:4]), int(text[5:7]), int(text[8:10])).toordinal() - EPOCH_ORDINAL
+
+
+def timestamp(text: str) -> int:
+    """Seconds since 1970-01-01 00:00:00 of a 'YYYY-MM-DD HH:MM:SS' string (a bare date is midnight)."""
+    seconds = day_number(text) * SECONDS_PER_DAY
+    if len(text) >= 19:
+        seconds += int(text[11:13]) * 3600 + int(text[14:16]) * 60 + int(text[17:19])
+    return seconds
+
+
+@lru_cache(maxsize=16384)  # ~45 years of days, a few MB at most
+def format_day(number: int) -> str:
+    """Display form of a day_number, e.g. 'March 05, 2024'."""
+    return date.fromordinal(number + EPOCH_ORDINAL).strftime("%B %d, %Y")
+
+
+@lru_cache(maxsize=24 * 60)
+def _format_minute(minute_of_day: int) -> str:
+    hour, minute = divmod(minute_of_day, 60)
+    return f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+def format_time(ts: Optional[int]) -> str:
+    """Display form of the time of day of a created_ts, e.g. '09:30 PM' ('' when unknown)."""
+    if ts is None:
+        return ""
+    return _format_minute(ts % SECONDS_PER_DAY // 60)
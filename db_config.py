@@ -0,0 +1,168 @@
+"""
+Database location and connection tuning.
+
+A connection profile bundles the per-connection SQLite settings that trade
+durability for latency. Three presets ship with the app:
+
+- "safe":     synchronous=FULL, small cache, no mmap. Every commit is on disk
+              before it returns, even across a power cut.
+- "balanced": synchronous=NORMAL (in WAL mode the database cannot be
+              corrupted, but the last commits may be lost on power failure),
+              a 16 MB cache and 64 MB of mmap. The default.
+- "fast":     synchronous=OFF, a large cache and mmap, and less frequent WAL
+              checkpoints. For throwaway or easily rebuilt journals.
+
+busy_timeout_ms is how long a read or a schema upgrade waits for another
+connection's lock. write_timeout_ms is how long a write waits for its turn
+(the writer lease and BEGIN IMMEDIATE, see write_lock.py) before failing
+with "The journal is busy"; "safe" waits longest, "fast" shortest.
+
+Settings are read from, in increasing priority: the built-in defaults, the
+JSON config file, and environment variables::
+
+    # $XDG_CONFIG_HOME/code_journal/config.json (or $CODE_JOURNAL_CONFIG)
+    {"database": "~/journal.db", "profile": "fast", "pragmas": {"cache_size": -131072, "write_timeout_ms": 10000}}
+
+    CODE_JOURNAL_DB=/path/to/data.db
+    CODE_JOURNAL_PROFILE=safe
+
+The database lives in $XDG_DATA_HOME/code_journal/data.db by default
+(%LOCALAPPDATA% on Windows). A data.db in the working directory, where older
+versions kept it, is still used if it exists.
+
+benchmarks/bench_profiles.py measures the presets on the current machine.
+"""
+
+import json
+import os
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional
+
+APP_DIR_NAME = "code_journal"
+DB_FILE_NAME = "data.db"
+LEGACY_DB_PATH = DB_FILE_NAME  # Relative to the working directory
+DEFAULT_PROFILE = "balanced"
+
+ENV_DB_PATH = "CODE_JOURNAL_DB"
+ENV_PROFILE = "CODE_JOURNAL_PROFILE"
+ENV_CONFIG_PATH = "CODE_JOURNAL_CONFIG"
+
+_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+_TEMP_STORE_MODES = ("DEFAULT", "FILE", "MEMORY")
+
+
+class ConnectionProfile(NamedTuple):
+    """Per-connection SQLite settings. cache_size follows SQLite: negative is KiB."""
+    name: str
+    synchronous: str
+    cache_size: int
+    mmap_size: int
+    temp_store: str
+    busy_timeout_ms: int
+    wal_autocheckpoint: int
+    write_timeout_ms: int  # Not a pragma: the writer lease deadline (write_lock.py)
+
+    def pragmas(self) -> List[str]:
+        """The PRAGMA statements that apply this profile to a connection."""
+        return [
+            f"PRAGMA synchronous = {self.synchronous};",
+            f"PRAGMA cache_size = {int(self.cache_size)};",
+            f"PRAGMA mmap_size = {int(self.mmap_size)};",
+            f"PRAGMA temp_store = {self.temp_store};",
+            f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)};",
+            f"PRAGMA wal_autocheckpoint = {int(self.wal_autocheckpoint)};",
+        ]
+
+
+PROFILES: Dict[str, ConnectionProfile] = {
+    "safe": ConnectionProfile("safe", synchronous="FULL", cache_size=-2000, mmap_size=0,
+                              temp_store="DEFAULT", busy_timeout_ms=30000, wal_autocheckpoint=1000,
+                              write_timeout_ms=10000),
+    "balanced": ConnectionProfile("balanced", synchronous="NORMAL", cache_size=-16384,
+                                  mmap_size=64 * 1024 * 1024, temp_store="MEMORY",
+                                  busy_timeout_ms=30000, wal_autocheckpoint=1000, write_timeout_ms=5000),
+    "fast": ConnectionProfile("fast", synchronous="OFF", cache_size=-65536,
+                              mmap_size=256 * 1024 * 1024, temp_store="MEMORY",
+                              busy_timeout_ms=30000, wal_autocheckpoint=4000, write_timeout_ms=2000),
+}
+
+
+def _user_dir(xdg_variable: str, fallback: str, windows_variable: str) -> str:
+    base = os.environ.get(xdg_variable)
+    if not base and sys.platform == "win32":
+        base = os.environ.get(windows_variable)
+    if not base:
+        base = os.path.expanduser(fallback)
+    return os.path.join(base, APP_DIR_NAME)
+
+
+def config_dir() -> str:
+    return _user_dir("XDG_CONFIG_HOME", "~/.config", "APPDATA")
+
+
+def data_dir() -> str:
+    return _user_dir("XDG_DATA_HOME", "~/.local/share", "LOCALAPPDATA")
+
+
+def config_path() -> str:
+    return os.environ.get(ENV_CONFIG_PATH) or os.path.join(config_dir(), "config.json")
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Read the JSON config file; a missing file is an empty config."""
+    path = path or config_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid config file {path}: {e}") from None
+    if not isinstance(config, dict):
+        raise ValueError(f"Invalid config file {path}: expected a JSON object")
+    return config
+
+
+def database_path(config: Optional[Dict[str, Any]] = None) -> str:
+    """Where the journal lives: env var, config file, legacy ./data.db, then the data dir."""
+    if config is None:
+        config = load_config()
+    path = os.environ.get(ENV_DB_PATH) or config.get("database")
+    if path:
+        return os.path.expanduser(path)
+    if os.path.exists(LEGACY_DB_PATH):
+        return LEGACY_DB_PATH
+    return os.path.join(data_dir(), DB_FILE_NAME)
+
+
+def make_profile(name: str = DEFAULT_PROFILE, **overrides) -> ConnectionProfile:
+    """A preset, optionally with some settings overridden. Values are validated."""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown connection profile {name!r}; expected one of {', '.join(PROFILES)}")
+    unknown = set(overrides) - set(ConnectionProfile._fields[1:])
+    if unknown:
+        raise ValueError(f"Unknown connection settings: {', '.join(sorted(unknown))}")
+    profile = PROFILES[name]._replace(**overrides)
+    synchronous = str(profile.synchronous).upper()
+    temp_store = str(profile.temp_store).upper()
+    if synchronous not in _SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid synchronous mode: {profile.synchronous!r}")
+    if temp_store not in _TEMP_STORE_MODES:
+        raise ValueError(f"Invalid temp_store mode: {profile.temp_store!r}")
+    try:
+        numbers = {field: int(getattr(profile, field))
+                   for field in ("cache_size", "mmap_size", "busy_timeout_ms", "wal_autocheckpoint",
+                                 "write_timeout_ms")}
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid connection setting: {e}") from None
+    if numbers["write_timeout_ms"] <= 0:
+        raise ValueError(f"Invalid write_timeout_ms: {profile.write_timeout_ms!r}")
+    return profile._replace(synchronous=synchronous, temp_store=temp_store, **numbers)
+
+
+def connection_profile(config: Optional[Dict[str, Any]] = None) -> ConnectionProfile:
+    """The profile selected by the environment or config file, with config overrides applied."""
+    if config is None:
+        config = load_config()
+    name = os.environ.get(ENV_PROFILE) or config.get("profile") or DEFAULT_PROFILE
+    return make_profile(name, **config.get("pragmas", {}))
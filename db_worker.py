@@ -0,0 +1,115 @@
+"""
+Background database worker for the Tk application.
+
+All interactive database calls go through one dedicated thread that owns its
+store connection, so queries never run on the Tk event loop. ``submit()``
+returns a ``concurrent.futures.Future``; ``call()`` additionally delivers the
+result back on the Tk thread by polling with ``after()`` while calls are
+pending (Tk itself must only be touched from the thread running mainloop).
+"""
+
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+import database
+from instrumentation import get_logger, recorder
+
+log = get_logger("db_worker")
+
+
+class DatabaseWorker:
+    """Runs database functions one at a time on a dedicated thread."""
+
+    def __init__(self, tk_widget, store=None, poll_interval_ms: int = 15):
+        self._widget = tk_widget
+        self._store = store
+        self.poll_interval_ms = poll_interval_ms
+        self._requests = queue.Queue()
+        self._completed = queue.Queue()
+        self._pending_callbacks = 0  # Only touched on the Tk thread
+        self._poll_id = None
+        self._thread = threading.Thread(target=self._run, name="database-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Queue func(*args, **kwargs) on the worker thread and return its future."""
+        future = Future()
+        self._requests.put((future, func, args, kwargs, time.time()))
+        return future
+
+    def call(self, func: Callable, *args,
+             on_success: Optional[Callable[[Any], None]] = None,
+             on_error: Optional[Callable[[BaseException], None]] = None,
+             **kwargs) -> Future:
+        """Like submit(), but run on_success(result) or on_error(exception) on the Tk thread.
+
+        Must be called from the Tk thread. Cancelling the returned future before
+        it starts skips both callbacks.
+        """
+        future = self.submit(func, *args, **kwargs)
+        self._pending_callbacks += 1
+        future.add_done_callback(lambda done: self._completed.put((done, on_success, on_error)))
+        if self._poll_id is None:
+            self._poll_id = self._widget.after(self.poll_interval_ms, self._poll)
+        return future
+
+    def shutdown(self, timeout: Optional[float] = 5.0) -> None:
+        """Finish queued calls, close the worker's connection and stop the thread."""
+        self._requests.put(None)
+        self._thread.join(timeout)
+        if self._poll_id is not None:
+            try:
+                self._widget.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+
+    def _run(self):
+        while True:
+            item = self._requests.get()
+            if item is None:
+                break
+            future, func, args, kwargs, queued_at = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            # Time spent waiting behind earlier calls
+            recorder.record("worker.queue_wait", queued_at, (time.time() - queued_at) * 1000)
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        if self._store is not None:
+            self._store.close_connection()
+        else:
+            database.close_connection()
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                future, on_success, on_error = self._completed.get_nowait()
+            except queue.Empty:
+                break
+            self._pending_callbacks -= 1
+            if future.cancelled():
+                continue
+            try:
+                error = future.exception()
+                if error is None:
+                    if on_success:
+                        on_success(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    log.error("Unhandled database error", exc_info=error)
+            except Exception:
+                # Keep delivering the remaining results; let Tk report this one
+                self._widget.report_callback_exception(*sys.exc_info())
+        if self._pending_callbacks > 0:
+            self._poll_id = self._widget.after(self.poll_interval_ms, self._poll)
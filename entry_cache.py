@@ -0,0 +1,182 @@
+"""
+Read-through LRU cache in front of a journal store.
+
+Caches whole day buckets (all entries of one day) and windows of the
+full-history list (offset/limit pages plus the total count), bounded by an
+estimate of their memory size. It subscribes to the store's change bus and
+invalidates precisely: a write to a day drops that day's bucket, the count,
+and only the history windows whose rows could have shifted.
+
+The get_* methods read through to the store and are meant to run on the
+database worker; the peek_* methods only consult memory and are safe to call
+from the Tk thread to answer a hit without a worker round trip.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import database
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+_ROW_OVERHEAD = 200  # Rough per-row cost of the tuple and its small strings
+
+
+def _estimate_size(rows) -> int:
+    return sum(_ROW_OVERHEAD + sys.getsizeof(row.content) for row in rows)
+
+
+def _day_changes(rows, after):
+    ids = [row.id for row in rows]
+    if after is None:
+        return ids, list(rows)
+    return ids, [row for row in rows if row.revision > after]
+
+
+class EntryCache:
+    """Bounded LRU of day buckets and history windows with change-based invalidation."""
+
+    def __init__(self, store=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.store = store if store is not None else database
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (value, size), least recently used first
+        self._bytes = 0
+        self._count = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.store.subscribe(self._on_change)
+
+    def close(self):
+        """Stop listening for changes and drop everything."""
+        self.store.unsubscribe(self._on_change)
+        self.clear()
+
+    # --- Lookups ---
+
+    def peek_day(self, date_str: str) -> Optional[List[database.Entry]]:
+        return self._lookup(('day', date_str))
+
+    def peek_page(self, offset: int, limit: int) -> Optional[List[database.Entry]]:
+        return self._lookup(('page', offset, limit))
+
+    def peek_count(self) -> Optional[int]:
+        with self._lock:
+            if self._count is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return self._count
+
+    def get_day(self, date_str: str) -> List[database.Entry]:
+        """All entries of a day, newest first."""
+        rows = self.peek_day(date_str)
+        if rows is None:
+            revision = self.store.current_revision()
+            rows = self.store.get_day_changes(date_str)[1]
+            self._store(('day', date_str), rows, revision)
+        return rows
+
+    def get_day_changes(self, date_str: str, after: Optional[int] = None) -> Tuple[List[int], List[database.Entry]]:
+        """Same contract as the store's get_day_changes(), served from the day bucket."""
+        return _day_changes(self.get_day(date_str), after)
+
+    def peek_day_changes(self, date_str: str,
+                         after: Optional[int] = None) -> Optional[Tuple[List[int], List[database.Entry]]]:
+        rows = self.peek_day(date_str)
+        return None if rows is None else _day_changes(rows, after)
+
+    def get_entries_page(self, offset: int, limit: int) -> List[database.Entry]:
+        """A window of the full history, in iter_entries() order."""
+        rows = self.peek_page(offset, limit)
+        if rows is None:
+            revision = self.store.current_revision()
+            rows = self.store.get_entries_page(offset, limit)
+            self._store(('page', offset, limit), rows, revision)
+        return rows
+
+    def count_entries(self) -> int:
+        count = self.peek_count()
+        if count is None:
+            revision = self.store.current_revision()
+            count = self.store.count_entries()
+            with self._lock:
+                if revision == self.store.current_revision():
+                    self._count = count
+        return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'items': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+            self._count = None
+
+    # --- Internals ---
+
+    def _lookup(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def _store(self, key, rows, revision):
+        size = _estimate_size(rows)
+        with self._lock:
+            # A write committed while we were reading; the rows may already be stale
+            if revision != self.store.current_revision() or size > self.max_bytes:
+                return
+            self._discard(key)
+            self._items[key] = (rows, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._items))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def _discard(self, key):
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def _on_change(self, event: database.ChangeEvent):
+        with self._lock:
+            self._count = None
+            if not event.days:
+                # Unknown extent (e.g. another process wrote): drop everything
+                self.invalidations += len(self._items)
+                self._items.clear()
+                self._bytes = 0
+                return
+            newest_day = max(event.days)
+            for key, (rows, _size) in list(self._items.items()):
+                if key[0] == 'day':
+                    stale = key[1] in event.days
+                else:
+                    # History is newest first: a row on day D shifts every window
+                    # whose oldest row is on or before D, and short (final) windows
+                    _, _offset, limit = key
+                    stale = len(rows) < limit or rows[-1].date[:10] <= newest_day
+                if stale:
+                    self._discard(key)
+                    self.invalidations += 1
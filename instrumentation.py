@@ -0,0 +1,180 @@
+"""
+Logging and timing instrumentation.
+
+Every subsystem logs through its own logger under "code_journal" (e.g.
+get_logger("database") -> "code_journal.database"), always with %-style
+arguments so messages are only formatted when the level is enabled. Nothing
+is printed unless configure_logging() is called; the app does that at
+startup with the level from $CODE_JOURNAL_LOG_LEVEL (default WARNING).
+
+Durations of database calls and view renders are recorded as spans into a
+fixed-size ring buffer, either with the @timed decorator or the span()
+context manager::
+
+    @timed("db.add_entry")
+    def add_entry(...): ...
+
+    with span("view.today.render"):
+        ...
+
+stats() summarizes the buffer per operation (count, p50, p95, max). The
+app's debug overlay (Ctrl+Shift+D) shows it live; dump_spans() writes it to
+JSON, and ``python instrumentation.py spans.json`` prints such a dump.
+"""
+
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+LOGGER_NAME = "code_journal"
+ENV_LOG_LEVEL = "CODE_JOURNAL_LOG_LEVEL"
+ENV_SPANS_DUMP = "CODE_JOURNAL_SPANS_DUMP"
+DEFAULT_RING_SIZE = 4096
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Logger for one subsystem, e.g. 'database', 'ui.today'."""
+    return logging.getLogger(f"{LOGGER_NAME}.{subsystem}")
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """Send the app's log records to stderr at level (default: $CODE_JOURNAL_LOG_LEVEL or WARNING)."""
+    level = (level or os.environ.get(ENV_LOG_LEVEL) or "WARNING").upper()
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    if not any(isinstance(handler, logging.StreamHandler) for handler in logger.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+
+
+class Span(NamedTuple):
+    name: str
+    started: float  # time.time() when the span began
+    duration_ms: float
+    thread: str
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[max(int(round(len(sorted_values) * fraction)) - 1, 0)]
+
+
+class SpanRecorder:
+    """Thread-safe ring buffer of the most recent spans."""
+
+    def __init__(self, size: int = DEFAULT_RING_SIZE):
+        self._spans = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, started: float, duration_ms: float) -> None:
+        span = Span(name, started, duration_ms, threading.current_thread().name)
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-operation count, p50, p95 and max (in ms) over the buffered spans."""
+        durations: Dict[str, List[float]] = {}
+        for item in self.spans():
+            durations.setdefault(item.name, []).append(item.duration_ms)
+        result = {}
+        for name, values in sorted(durations.items()):
+            values.sort()
+            result[name] = {
+                'count': len(values),
+                'p50_ms': _percentile(values, 0.50),
+                'p95_ms': _percentile(values, 0.95),
+                'max_ms': values[-1],
+            }
+        return result
+
+
+recorder = SpanRecorder()
+_span_log = get_logger("spans")
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Record how long the with-block takes under name."""
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        recorder.record(name, started, duration_ms)
+        _span_log.debug("%s took %.2f ms", name, duration_ms)
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator recording each call as a span (named after the function by default)."""
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def format_stats(stats: Dict[str, Dict[str, float]]) -> str:
+    """Render stats() as a fixed-width table."""
+    if not stats:
+        return "No spans recorded yet."
+    width = max(len(name) for name in stats)
+    lines = [f"{'operation':<{width}} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+    for name, row in stats.items():
+        lines.append(f"{name:<{width}} {row['count']:>7} {row['p50_ms']:>9.2f} "
+                     f"{row['p95_ms']:>9.2f} {row['max_ms']:>9.2f}")
+    return "\n".join(lines)
+
+
+def dump_spans(path: Optional[str] = None) -> Optional[str]:
+    """Write the current stats and raw spans as JSON to path (default: $CODE_JOURNAL_SPANS_DUMP).
+
+    Returns the path written, or None when no path is configured.
+    """
+    path = path or os.environ.get(ENV_SPANS_DUMP)
+    if not path:
+        return None
+    data: Dict[str, Any] = {
+        'stats': recorder.stats(),
+        'spans': [item._asdict() for item in recorder.spans()],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    return path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Print p50/p95 per operation from a span dump.")
+    parser.add_argument("dump", help="JSON file written by dump_spans() (see $CODE_JOURNAL_SPANS_DUMP)")
+    args = parser.parse_args(argv)
+    with open(args.dump, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    print(format_stats(data.get('stats', {})))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Streaming import and export of journal data.
+
+Exports are written page by page from the store's iter_entry_pages(), so memory use
+does not grow with the journal. Two formats are supported:
+
+- "json":   a JSON array of {"content", "date"} objects (the historical format)
+- "ndjson": one JSON object per line
+
+A ".gz" suffix (or compress=True) gzips the output. NDJSON imports are parsed
+line by line and streamed into the store's bulk_add_entries(). write_entries()
+and read_entries() do the same on already open text streams such as
+stdout/stdin. All of them take an optional store (see storage.JournalStore)
+and default to the database module.
+"""
+
+import gzip
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO
+
+import database
+
+EXPORT_FORMATS = ("json", "ndjson")
+
+
+class JobCancelled(Exception):
+    """Raised when an import, export or backup is cancelled through its cancel event."""
+
+
+def detect_format(path: str) -> str:
+    """Guess the format from the file name: '.ndjson'/'.jsonl' (optionally .gz) or JSON."""
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return "ndjson" if name.endswith((".ndjson", ".jsonl")) else "json"
+
+
+def _is_gzip(path: str, compress: Optional[bool]) -> bool:
+    return path.lower().endswith(".gz") if compress is None else compress
+
+
+def _open_text(path: str, mode: str, compress: bool):
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="\n")
+    return open(path, mode, encoding="utf-8", newline="\n")
+
+
+def _check_cancel(cancel: Optional[threading.Event]) -> None:
+    if cancel is not None and cancel.is_set():
+        raise JobCancelled()
+
+
+def write_entries(f: TextIO,
+                  fmt: str = "ndjson",
+                  progress: Optional[Callable[[int], None]] = None,
+                  cancel: Optional[threading.Event] = None,
+                  page_size: int = database.DEFAULT_PAGE_SIZE,
+                  store=None) -> int:
+    """Stream every entry to an open text file (e.g. sys.stdout) and return the count."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    store = store if store is not None else database
+    count = 0
+    if fmt == "json":
+        f.write("[")
+    for page in store.iter_entry_pages(page_size):
+        _check_cancel(cancel)
+        for entry in page:
+            record = json.dumps({'content': entry.content, 'date': entry.date})
+            if fmt == "json":
+                f.write(f"{',' if count else ''}\n    {record}")
+            else:
+                f.write(record + "\n")
+            count += 1
+        if progress:
+            progress(count)
+    if fmt == "json":
+        f.write("\n]\n" if count else "]\n")
+    return count
+
+
+def export_entries(path: str,
+                   fmt: Optional[str] = None,
+                   compress: Optional[bool] = None,
+                   progress: Optional[Callable[[int], None]] = None,
+                   cancel: Optional[threading.Event] = None,
+                   page_size: int = database.DEFAULT_PAGE_SIZE,
+                   store=None) -> int:
+    """Write every entry to path and return how many were written.
+
+    The file is written to a temporary '.part' sibling and moved into place at
+    the end, so a cancelled or failed export never leaves a truncated file.
+    progress is called with the running count after each page.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+
+    temp_path = path + ".part"
+    try:
+        with _open_text(temp_path, "w", _is_gzip(path, compress)) as f:
+            count = write_entries(f, fmt, progress, cancel, page_size, store)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
+
+
+def read_ndjson_entries(f: TextIO,
+                        cancel: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+    """Yield entry objects from an open NDJSON text file one line at a time. Blank lines are skipped."""
+    for line_number, line in enumerate(f, start=1):
+        if line_number % 1000 == 0:
+            _check_cancel(cancel)
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e.msg})") from None
+
+
+def iter_ndjson_entries(path: str,
+                        compress: Optional[bool] = None,
+                        cancel: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+    """Yield entry objects from an NDJSON file one line at a time. Blank lines are skipped."""
+    with _open_text(path, "r", _is_gzip(path, compress)) as f:
+        yield from read_ndjson_entries(f, cancel)
+
+
+def read_entries(f: TextIO,
+                 fmt: str = "ndjson",
+                 progress: Optional[Callable[[int], None]] = None,
+                 cancel: Optional[threading.Event] = None,
+                 batch_size: int = database.DEFAULT_BATCH_SIZE,
+                 store=None) -> int:
+    """Import entries from an open text file (e.g. sys.stdin) in one transaction; return the count."""
+    if fmt == "ndjson":
+        entries = read_ndjson_entries(f, cancel)
+    elif fmt == "json":
+        entries = json.load(f)
+        if not isinstance(entries, list):
+            raise ValueError("Expected a JSON array of entries")
+    else:
+        raise ValueError(f"Unknown import format: {fmt!r}")
+
+    def report(count):
+        _check_cancel(cancel)
+        if progress:
+            progress(count)
+
+    store = store if store is not None else database
+    return store.bulk_add_entries(entries, batch_size=batch_size, progress=report)
+
+
+def import_entries(path: str,
+                   fmt: Optional[str] = None,
+                   compress: Optional[bool] = None,
+                   progress: Optional[Callable[[int], None]] = None,
+                   cancel: Optional[threading.Event] = None,
+                   batch_size: int = database.DEFAULT_BATCH_SIZE,
+                   store=None) -> int:
+    """Import entries from a JSON or NDJSON file in one transaction and return the count.
+
+    NDJSON is streamed; a JSON array has to be parsed as a whole before its
+    entries are inserted. Cancelling rolls the import back.
+    """
+    fmt = fmt or detect_format(path)
+    with _open_text(path, "r", _is_gzip(path, compress)) as f:
+        return read_entries(f, fmt, progress, cancel, batch_size, store)
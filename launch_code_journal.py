@@ -36,8 +36,10 @@ def main():
     try:
         # Launch the main application
         from app_gui import App
+        from instrumentation import configure_logging
         import customtkinter as ctk
-        
+
+        configure_logging()
         ctk.set_appearance_mode("Light")
         app = App()
         app.mainloop()
@@ -0,0 +1,301 @@
+"""
+Idle-time database maintenance.
+
+SQLite in WAL mode needs a little housekeeping that nothing else in the app
+does. Each task runs on one connection, takes a bounded amount of time and
+returns a MaintenanceResult with its duration and the bytes it gave back:
+
+- "checkpoint":         wal_checkpoint(PASSIVE) copies committed WAL frames
+                        into the database without waiting for readers or
+                        writers.
+- "truncate_wal":       wal_checkpoint(TRUNCATE) once the -wal file has grown
+                        past WAL_TRUNCATE_BYTES (a long reader or a big import
+                        keeps it from being reused), shrinking it to zero. It
+                        waits at most TRUNCATE_BUSY_MS for other connections.
+- "optimize":           PRAGMA optimize, which runs ANALYZE where the planner's
+                        statistics are missing or stale; analysis_limit keeps
+                        it fast on big tables.
+- "incremental_vacuum": returns up to VACUUM_STEP_PAGES free pages to the file
+                        system. Journals created since auto_vacuum=INCREMENTAL
+                        became the default support it; "vacuum" (a full
+                        VACUUM, never run while idle) converts older ones.
+
+MaintenanceScheduler decides when: it ticks from the Tk after() loop and,
+once the user has been idle for IDLE_SECONDS, runs the tasks whose interval
+has passed one at a time on the database worker, so a keypress never waits
+for more than one of them. Every run is recorded as a "maintenance.<task>"
+span and added to the scheduler's metrics (Ctrl+Shift+D shows both).
+"""
+
+import os
+import sqlite3
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from instrumentation import get_logger, span
+
+WAL_TRUNCATE_BYTES = 16 * 1024 * 1024
+TRUNCATE_BUSY_MS = 100
+ANALYSIS_LIMIT = 1000  # Rows sampled per index by ANALYZE
+VACUUM_STEP_PAGES = 2048  # 8 MiB at the default page size
+VACUUM_MIN_FREE_BYTES = 1024 * 1024
+
+IDLE_SECONDS = 30.0
+TICK_MS = 5000
+# Minimum time between runs of each idle task, in seconds. In run order:
+# the checkpoints come last so they also flush what the others wrote
+INTERVALS = {
+    "incremental_vacuum": 30 * 60,
+    "optimize": 6 * 60 * 60,
+    "checkpoint": 5 * 60,
+    "truncate_wal": 5 * 60,
+}
+IDLE_TASKS = tuple(INTERVALS)
+log = get_logger("maintenance")
+
+
+class MaintenanceResult(NamedTuple):
+    """What one maintenance task did."""
+    task: str
+    duration_ms: float
+    reclaimed_bytes: int  # WAL bytes truncated or free pages returned to the file system
+    detail: str
+    pending: bool = False  # more of the same work is left for the next run
+
+
+class DatabaseStatus(NamedTuple):
+    """Sizes that tell whether maintenance is needed."""
+    file_bytes: int
+    wal_bytes: int
+    free_bytes: int  # free pages inside the database file
+    auto_vacuum: str  # 'none', 'full' or 'incremental'
+
+
+def _database_file(conn: sqlite3.Connection) -> str:
+    for _seq, name, path in conn.execute("PRAGMA database_list;"):
+        if name == "main":
+            return path
+    return ""
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path) if path else 0
+    except OSError:
+        return 0
+
+
+def _page_size(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA page_size;").fetchone()[0]
+
+
+def _free_pages(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA freelist_count;").fetchone()[0]
+
+
+def database_status(conn: sqlite3.Connection) -> DatabaseStatus:
+    path = _database_file(conn)
+    auto_vacuum = conn.execute("PRAGMA auto_vacuum;").fetchone()[0]
+    return DatabaseStatus(file_bytes=_file_size(path),
+                          wal_bytes=_file_size(path + "-wal") if path else 0,
+                          free_bytes=_free_pages(conn) * _page_size(conn),
+                          auto_vacuum=("none", "full", "incremental")[auto_vacuum])
+
+
+def checkpoint(conn: sqlite3.Connection, mode: str = "PASSIVE") -> MaintenanceResult:
+    """Checkpoint the WAL; TRUNCATE also shrinks the -wal file when no reader is in the way."""
+    wal_path = _database_file(conn) + "-wal"
+    wal_before = _file_size(wal_path)
+    busy_timeout = conn.execute("PRAGMA busy_timeout;").fetchone()[0]
+    start = time.perf_counter()
+    if mode != "PASSIVE":
+        # The blocking modes wait on the busy handler; don't hold the worker for the full timeout
+        conn.execute(f"PRAGMA busy_timeout = {TRUNCATE_BUSY_MS};")
+    try:
+        busy, wal_frames, copied_frames = conn.execute(f"PRAGMA wal_checkpoint({mode});").fetchone()
+    finally:
+        if mode != "PASSIVE":
+            conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)};")
+    duration_ms = (time.perf_counter() - start) * 1000
+    reclaimed = max(wal_before - _file_size(wal_path), 0)
+    detail = f"{copied_frames} of {wal_frames} WAL frames copied"
+    if busy:
+        detail += ", blocked by another connection"
+    return MaintenanceResult("truncate_wal" if mode == "TRUNCATE" else "checkpoint", duration_ms, reclaimed, detail)
+
+
+def optimize(conn: sqlite3.Connection, analysis_limit: int = ANALYSIS_LIMIT) -> MaintenanceResult:
+    """Refresh the query planner's statistics where they are missing or out of date."""
+    start = time.perf_counter()
+    conn.execute(f"PRAGMA analysis_limit = {int(analysis_limit)};")
+    # 0x02 is the default analysis; 0x01 lists the ANALYZE statements instead of running them
+    analyzed = [row[0] for row in conn.execute("PRAGMA optimize(0x03);")]
+    conn.execute("PRAGMA optimize(0x02);")
+    duration_ms = (time.perf_counter() - start) * 1000
+    return MaintenanceResult("optimize", duration_ms, 0,
+                             f"analyzed {len(analyzed)} tables" if analyzed else "statistics up to date")
+
+
+def incremental_vacuum(conn: sqlite3.Connection, max_pages: int = VACUUM_STEP_PAGES) -> MaintenanceResult:
+    """Return up to max_pages free pages to the file system (auto_vacuum=INCREMENTAL only)."""
+    start = time.perf_counter()
+    page_size = _page_size(conn)
+    free_before = _free_pages(conn)
+    # sqlite3's execute() steps a statement only once, which frees a single page here;
+    # executescript() runs the pragma to completion
+    conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+    free_after = _free_pages(conn)
+    duration_ms = (time.perf_counter() - start) * 1000
+    freed = free_before - free_after
+    return MaintenanceResult("incremental_vacuum", duration_ms, freed * page_size,
+                             f"freed {freed} pages, {free_after} left", pending=free_after > 0 and freed > 0)
+
+
+def vacuum(conn: sqlite3.Connection) -> MaintenanceResult:
+    """Rebuild the whole database with VACUUM, switching it to incremental auto-vacuum.
+
+    Holds the write lock for as long as it takes to copy the database, so it
+    is only run on request (see code_journal.py maintenance --vacuum).
+    """
+    path = _database_file(conn)
+    size_before = _file_size(path)
+    start = time.perf_counter()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+    conn.execute("VACUUM;")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    duration_ms = (time.perf_counter() - start) * 1000
+    size_after = _file_size(path)
+    return MaintenanceResult("vacuum", duration_ms, max(size_before - size_after, 0),
+                             f"database is {size_after / (1024 * 1024):.1f} MB")
+
+
+def _is_needed(conn: sqlite3.Connection, task: str) -> bool:
+    if task == "truncate_wal":
+        return _file_size(_database_file(conn) + "-wal") > WAL_TRUNCATE_BYTES
+    if task == "checkpoint":
+        return _file_size(_database_file(conn) + "-wal") > 0
+    if task == "incremental_vacuum":
+        status = database_status(conn)
+        return status.auto_vacuum == "incremental" and status.free_bytes >= VACUUM_MIN_FREE_BYTES
+    return True
+
+
+_TASKS: Dict[str, Callable[[sqlite3.Connection], MaintenanceResult]] = {
+    "incremental_vacuum": incremental_vacuum,
+    "optimize": optimize,
+    "checkpoint": checkpoint,
+    "truncate_wal": lambda conn: checkpoint(conn, "TRUNCATE"),
+    "vacuum": vacuum,
+}
+TASKS = tuple(_TASKS)
+
+
+def run_tasks(conn: sqlite3.Connection, tasks: Sequence[str] = IDLE_TASKS) -> List[MaintenanceResult]:
+    """Run the given tasks that have something to do, in order; return what each did.
+
+    conn must not be inside a transaction.
+    """
+    unknown = [task for task in tasks if task not in _TASKS]
+    if unknown:
+        raise ValueError(f"Unknown maintenance tasks: {', '.join(unknown)}; expected {', '.join(TASKS)}")
+    results = []
+    for task in tasks:
+        if not _is_needed(conn, task):
+            continue
+        with span(f"maintenance.{task}"):
+            result = _TASKS[task](conn)
+        log.info("%s: %s in %.1f ms, %d bytes reclaimed", task, result.detail, result.duration_ms,
+                 result.reclaimed_bytes)
+        results.append(result)
+    return results
+
+
+class MaintenanceScheduler:
+    """Runs the idle tasks on the database worker while the user is not using the app.
+
+    Call note_activity() on user input (the app binds it to key and mouse
+    events); start() begins ticking on the Tk loop of tk_widget. The tasks
+    go through store.run_maintenance, so a store without a database file
+    simply reports nothing.
+    """
+
+    def __init__(self, tk_widget, db_worker, store, idle_seconds: float = IDLE_SECONDS,
+                 tick_ms: int = TICK_MS, intervals: Optional[Dict[str, float]] = None):
+        self._widget = tk_widget
+        self._db_worker = db_worker
+        self._store = store
+        self.idle_seconds = idle_seconds
+        self.tick_ms = tick_ms
+        self.intervals = dict(INTERVALS if intervals is None else intervals)
+        self._last_activity = time.monotonic()
+        self._last_run: Dict[str, float] = {}  # task -> monotonic time it was last started
+        self._queue: List[str] = []  # due tasks still to run in this idle pass
+        self._running = False
+        self._after_id = None
+        self.metrics: Dict[str, Dict[str, float]] = {}
+
+    def start(self) -> None:
+        if self._after_id is None:
+            self._after_id = self._widget.after(self.tick_ms, self._tick)
+
+    def stop(self) -> None:
+        if self._after_id is not None:
+            self._widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def note_activity(self, event=None) -> None:
+        self._last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        return time.monotonic() - self._last_activity >= self.idle_seconds
+
+    def due_tasks(self, now: Optional[float] = None) -> List[str]:
+        """The idle tasks whose interval has passed since they last ran."""
+        now = time.monotonic() if now is None else now
+        return [task for task, interval in self.intervals.items()
+                if now - self._last_run.get(task, float("-inf")) >= interval]
+
+    def _tick(self) -> None:
+        self._after_id = self._widget.after(self.tick_ms, self._tick)
+        if not self._running and self.is_idle():
+            self._queue = self.due_tasks()
+            self._run_next()
+
+    def _run_next(self) -> None:
+        if not self._queue or not self.is_idle():
+            self._queue = []
+            self._running = False
+            return
+        task = self._queue.pop(0)
+        self._running = True
+        self._last_run[task] = time.monotonic()
+        self._db_worker.call(self._store.run_maintenance, (task,),
+                             on_success=self._on_done, on_error=self._on_error)
+
+    def _on_done(self, results: List[MaintenanceResult]) -> None:
+        for result in results:
+            self.record(result)
+            if result.pending:
+                self._last_run.pop(result.task, None)  # Carry on at the next tick
+        self._run_next()
+
+    def _on_error(self, error: BaseException) -> None:
+        log.warning("Maintenance failed: %s", error)
+        self._run_next()
+
+    def record(self, result: MaintenanceResult) -> None:
+        """Add a task run to the metrics."""
+        metrics = self.metrics.setdefault(result.task, {'runs': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                                        'reclaimed_bytes': 0})
+        metrics['runs'] += 1
+        metrics['total_ms'] += result.duration_ms
+        metrics['max_ms'] = max(metrics['max_ms'], result.duration_ms)
+        metrics['reclaimed_bytes'] += result.reclaimed_bytes
+
+    def stats(self) -> str:
+        """One line per task that ran: runs, time spent and bytes reclaimed."""
+        return "\n".join(
+            f"{task}: {metrics['runs']} runs, {metrics['total_ms']:.1f} ms total, "
+            f"max {metrics['max_ms']:.1f} ms, {metrics['reclaimed_bytes'] // 1024} KiB reclaimed"
+            for task, metrics in sorted(self.metrics.items())
+        )
@@ -0,0 +1,457 @@
+"""
+Schema migrations for the Code Journal database.
+
+The schema version is stored in ``PRAGMA user_version``. Each migration step
+upgrades the database by exactly one version and must be idempotent, so a
+database that was partially upgraded by older releases (which patched the
+schema ad hoc in ``create_table()``) is brought up to date safely.
+All pending steps run inside a single transaction.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Callable, FrozenSet, List, NamedTuple, Tuple
+
+import tagging
+
+
+class SchemaInfo(NamedTuple):
+    """Description of the migrated schema, cached once per process."""
+    version: int
+    entry_columns: FrozenSet[str]
+
+    def has_column(self, name: str) -> bool:
+        return name in self.entry_columns
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> FrozenSet[str]:
+    return frozenset(row[1] for row in conn.execute(f"PRAGMA table_info({table});"))
+
+
+def _migrate_v1_entries_table(conn: sqlite3.Connection) -> None:
+    """Create the entries table, or add created_at to tables from early releases."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content TEXT NOT NULL,
+            date TEXT NOT NULL,
+            created_at TEXT
+        );
+    """)
+    if 'created_at' not in _table_columns(conn, 'entries'):
+        conn.execute("ALTER TABLE entries ADD COLUMN created_at TEXT;")
+    # Rows from before created_at existed get the migration time
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute("UPDATE entries SET created_at = ? WHERE created_at IS NULL;", (current_time,))
+
+
+def _migrate_v2_entry_indexes(conn: sqlite3.Connection) -> None:
+    """Index the two hot read orders.
+
+    idx_entries_date_created serves the full-history order (date DESC,
+    created_at DESC, id DESC) and its keyset seeks; the rowid is implicitly the
+    last key column. idx_entries_day_created is an expression index on the day
+    part of date, so a single day's entries come back already ordered by
+    created_at without a temp B-tree sort.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_date_created ON entries(date, created_at);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_day_created ON entries(substr(date, 1, 10), created_at);")
+
+
+def _migrate_v3_full_text_search(conn: sqlite3.Connection) -> None:
+    """Add an external-content FTS5 index over entries.content, kept in sync by triggers.
+
+    '_' is a token character so identifiers like snake_case stay whole, and
+    2- and 3-character prefix indexes keep as-you-type prefix queries cheap.
+    """
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            content,
+            content='entries',
+            content_rowid='id',
+            tokenize="unicode61 tokenchars '_'",
+            prefix='2 3'
+        );
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS entries_fts_after_insert AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS entries_fts_after_delete AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts(entries_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS entries_fts_after_update AFTER UPDATE OF content ON entries BEGIN
+            INSERT INTO entries_fts(entries_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO entries_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+    """)
+    # Index rows that existed before this migration
+    conn.execute("INSERT INTO entries_fts(entries_fts) VALUES ('rebuild');")
+
+
+def _migrate_v4_daily_stats(conn: sqlite3.Connection) -> None:
+    """Add a per-day aggregate table (entry count, characters, first/last entry time).
+
+    Triggers keep it in step with entries inside the writing transaction, so
+    calendar and statistics reads cost O(days) instead of scanning entries.
+    Removing a day's last entry removes its row; first_at/last_at are
+    recomputed from the day index when an entry leaves a day.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day TEXT PRIMARY KEY,
+            entry_count INTEGER NOT NULL,
+            total_chars INTEGER NOT NULL,
+            first_at TEXT NOT NULL,
+            last_at TEXT NOT NULL
+        ) WITHOUT ROWID;
+    """)
+    add_to_day = """
+        INSERT INTO daily_stats (day, entry_count, total_chars, first_at, last_at)
+        VALUES (substr(new.date, 1, 10), 1, length(new.content), new.date, new.date)
+        ON CONFLICT(day) DO UPDATE SET
+            entry_count = entry_count + 1,
+            total_chars = total_chars + excluded.total_chars,
+            first_at = min(first_at, excluded.first_at),
+            last_at = max(last_at, excluded.last_at);
+    """
+    remove_from_day = """
+        UPDATE daily_stats SET
+            entry_count = entry_count - 1,
+            total_chars = total_chars - length(old.content),
+            first_at = COALESCE((SELECT min(date) FROM entries
+                                 WHERE substr(date, 1, 10) = substr(old.date, 1, 10)), first_at),
+            last_at = COALESCE((SELECT max(date) FROM entries
+                                WHERE substr(date, 1, 10) = substr(old.date, 1, 10)), last_at)
+        WHERE day = substr(old.date, 1, 10);
+        DELETE FROM daily_stats WHERE day = substr(old.date, 1, 10) AND entry_count <= 0;
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS daily_stats_after_insert AFTER INSERT ON entries BEGIN
+            {add_to_day}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS daily_stats_after_delete AFTER DELETE ON entries BEGIN
+            {remove_from_day}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS daily_stats_after_update AFTER UPDATE OF content, date ON entries BEGIN
+            {remove_from_day}
+            {add_to_day}
+        END;
+    """)
+    # Aggregate rows that existed before this migration
+    conn.execute("DELETE FROM daily_stats;")
+    conn.execute("""
+        INSERT INTO daily_stats (day, entry_count, total_chars, first_at, last_at)
+        SELECT substr(date, 1, 10), count(*), sum(length(content)), min(date), max(date)
+        FROM entries GROUP BY substr(date, 1, 10);
+    """)
+
+
+def _migrate_v5_integer_dates(conn: sqlite3.Connection) -> None:
+    """Add integer day_number and created_ts columns and index a day by them.
+
+    day_number counts days since 1970-01-01 and created_ts seconds since
+    1970-01-01 00:00:00, both of the stored local wall-clock text taken as
+    UTC (see date_format). The application fills them on insert; the triggers
+    cover rows written by anything else and later edits of date/created_at.
+    idx_entries_day_ts replaces the substr() expression index, and the
+    daily_stats triggers are recreated to look days up through it.
+    """
+    columns = _table_columns(conn, 'entries')
+    if 'day_number' not in columns:
+        conn.execute("ALTER TABLE entries ADD COLUMN day_number INTEGER;")
+    if 'created_ts' not in columns:
+        conn.execute("ALTER TABLE entries ADD COLUMN created_ts INTEGER;")
+    fill = """
+        UPDATE entries SET
+            day_number = CAST(strftime('%s', substr(date, 1, 10)) AS INTEGER) / 86400,
+            created_ts = CAST(strftime('%s', COALESCE(created_at, date)) AS INTEGER)
+    """
+    conn.execute(f"{fill};")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS entries_fill_integer_dates AFTER INSERT ON entries
+        WHEN new.day_number IS NULL OR new.created_ts IS NULL BEGIN
+            {fill} WHERE id = new.id;
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS entries_update_integer_dates AFTER UPDATE OF date, created_at ON entries BEGIN
+            {fill} WHERE id = new.id;
+        END;
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_day_ts ON entries(day_number, created_ts);")
+    conn.execute("DROP INDEX IF EXISTS idx_entries_day_created;")
+
+    # The changed row is excluded by id: trigger order is unspecified, so its
+    # day_number may not have been refreshed yet. A day losing its only entry
+    # is dropped first, so first_at/last_at never fall back to stale values.
+    remove_from_day = """
+        DELETE FROM daily_stats WHERE day = substr(old.date, 1, 10) AND entry_count <= 1;
+        UPDATE daily_stats SET
+            entry_count = entry_count - 1,
+            total_chars = total_chars - length(old.content),
+            first_at = COALESCE((SELECT min(date) FROM entries
+                                 WHERE day_number = old.day_number AND id <> old.id), first_at),
+            last_at = COALESCE((SELECT max(date) FROM entries
+                                WHERE day_number = old.day_number AND id <> old.id), last_at)
+        WHERE day = substr(old.date, 1, 10);
+    """
+    add_to_day = """
+        INSERT INTO daily_stats (day, entry_count, total_chars, first_at, last_at)
+        VALUES (substr(new.date, 1, 10), 1, length(new.content), new.date, new.date)
+        ON CONFLICT(day) DO UPDATE SET
+            entry_count = entry_count + 1,
+            total_chars = total_chars + excluded.total_chars,
+            first_at = min(first_at, excluded.first_at),
+            last_at = max(last_at, excluded.last_at);
+    """
+    conn.execute("DROP TRIGGER IF EXISTS daily_stats_after_delete;")
+    conn.execute("DROP TRIGGER IF EXISTS daily_stats_after_update;")
+    conn.execute(f"""
+        CREATE TRIGGER daily_stats_after_delete AFTER DELETE ON entries BEGIN
+            {remove_from_day}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER daily_stats_after_update AFTER UPDATE OF content, date ON entries BEGIN
+            {remove_from_day}
+            {add_to_day}
+        END;
+    """)
+
+
+def _migrate_v6_soft_delete_and_revisions(conn: sqlite3.Connection) -> None:
+    """Add soft-delete tombstones, edit times and a change revision to entries.
+
+    deleted_at marks a tombstone (NULL for live rows); tombstones leave the
+    full-text index and daily_stats but stay in entries so other copies can
+    learn about the deletion. sync_state holds a counter that every insert,
+    edit, delete and restore bumps; the row's revision is set to the new value,
+    so "changes since N" is a range scan of idx_entries_revision. The hot read
+    indexes are rebuilt as partial indexes over live rows only.
+    """
+    columns = _table_columns(conn, 'entries')
+    if 'updated_at' not in columns:
+        conn.execute("ALTER TABLE entries ADD COLUMN updated_at TEXT;")
+    if 'deleted_at' not in columns:
+        conn.execute("ALTER TABLE entries ADD COLUMN deleted_at TEXT;")
+    if 'revision' not in columns:
+        conn.execute("ALTER TABLE entries ADD COLUMN revision INTEGER NOT NULL DEFAULT 0;")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            revision INTEGER NOT NULL
+        );
+    """)
+    conn.execute("UPDATE entries SET revision = id WHERE revision = 0;")
+    conn.execute("INSERT OR IGNORE INTO sync_state (id, revision) SELECT 1, COALESCE(MAX(revision), 0) FROM entries;")
+    bump_revision = """
+        UPDATE sync_state SET revision = revision + 1 WHERE id = 1;
+        UPDATE entries SET revision = (SELECT revision FROM sync_state WHERE id = 1) WHERE id = new.id;
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS entries_revision_after_insert AFTER INSERT ON entries BEGIN
+            {bump_revision}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS entries_revision_after_update
+        AFTER UPDATE OF content, date, deleted_at ON entries BEGIN
+            {bump_revision}
+        END;
+    """)
+
+    # Live rows only, for the history, day and count reads
+    conn.execute("DROP INDEX IF EXISTS idx_entries_date_created;")
+    conn.execute("DROP INDEX IF EXISTS idx_entries_day_ts;")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entries_live_date_created
+        ON entries(date, created_at) WHERE deleted_at IS NULL;
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entries_live_day_ts
+        ON entries(day_number, created_ts) WHERE deleted_at IS NULL;
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_revision ON entries(revision);")
+
+    # The full-text index holds live rows only
+    for trigger in ("entries_fts_after_insert", "entries_fts_after_delete", "entries_fts_after_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+    conn.execute("""
+        CREATE TRIGGER entries_fts_after_insert AFTER INSERT ON entries WHEN new.deleted_at IS NULL BEGIN
+            INSERT INTO entries_fts(rowid, content) VALUES (new.id, new.content);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER entries_fts_after_delete AFTER DELETE ON entries WHEN old.deleted_at IS NULL BEGIN
+            INSERT INTO entries_fts(entries_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER entries_fts_after_update AFTER UPDATE OF content, deleted_at ON entries BEGIN
+            INSERT INTO entries_fts(entries_fts, rowid, content)
+                SELECT 'delete', old.id, old.content WHERE old.deleted_at IS NULL;
+            INSERT INTO entries_fts(rowid, content)
+                SELECT new.id, new.content WHERE new.deleted_at IS NULL;
+        END;
+    """)
+
+    # daily_stats counts live rows only; a soft delete or restore moves a row out of or into it
+    remove_from_day = """
+        DELETE FROM daily_stats
+        WHERE day = substr(old.date, 1, 10) AND entry_count <= 1 AND old.deleted_at IS NULL;
+        UPDATE daily_stats SET
+            entry_count = entry_count - 1,
+            total_chars = total_chars - length(old.content),
+            first_at = COALESCE((SELECT min(date) FROM entries WHERE day_number = old.day_number
+                                 AND deleted_at IS NULL AND id <> old.id), first_at),
+            last_at = COALESCE((SELECT max(date) FROM entries WHERE day_number = old.day_number
+                                AND deleted_at IS NULL AND id <> old.id), last_at)
+        WHERE day = substr(old.date, 1, 10) AND old.deleted_at IS NULL;
+    """
+    add_to_day = """
+        INSERT INTO daily_stats (day, entry_count, total_chars, first_at, last_at)
+        SELECT substr(new.date, 1, 10), 1, length(new.content), new.date, new.date
+        WHERE new.deleted_at IS NULL
+        ON CONFLICT(day) DO UPDATE SET
+            entry_count = entry_count + 1,
+            total_chars = total_chars + excluded.total_chars,
+            first_at = min(first_at, excluded.first_at),
+            last_at = max(last_at, excluded.last_at);
+    """
+    for trigger in ("daily_stats_after_insert", "daily_stats_after_delete", "daily_stats_after_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger};")
+    conn.execute(f"""
+        CREATE TRIGGER daily_stats_after_insert AFTER INSERT ON entries BEGIN
+            {add_to_day}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER daily_stats_after_delete AFTER DELETE ON entries BEGIN
+            {remove_from_day}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER daily_stats_after_update AFTER UPDATE OF content, date, deleted_at ON entries BEGIN
+            {remove_from_day}
+            {add_to_day}
+        END;
+    """)
+
+
+def _migrate_v7_tags(conn: sqlite3.Connection) -> None:
+    """Add the tags and entry_tags tables and tag existing entries from their #hashtags.
+
+    entry_tags is keyed (tag_id, entry_id), so one tag's entries are a range of
+    the primary key, and indexed (entry_id, tag_id) for an entry's tags.
+    Triggers keep tags.entry_count current and unlink entries when they are
+    soft-deleted or purged; restores and edits relink them from Python, since
+    extracting tags needs the tagging module's rules.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            entry_count INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entry_tags (
+            tag_id INTEGER NOT NULL,
+            entry_id INTEGER NOT NULL,
+            PRIMARY KEY (tag_id, entry_id)
+        ) WITHOUT ROWID;
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entry_tags_entry ON entry_tags(entry_id, tag_id);")
+    # Most used first; the rowid after entry_count breaks ties without a sort
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tags_live_count ON tags(entry_count) WHERE entry_count > 0;")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS entry_tags_after_insert AFTER INSERT ON entry_tags BEGIN
+            UPDATE tags SET entry_count = entry_count + 1 WHERE id = new.tag_id;
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS entry_tags_after_delete AFTER DELETE ON entry_tags BEGIN
+            UPDATE tags SET entry_count = entry_count - 1 WHERE id = old.tag_id;
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS entries_untag_after_soft_delete
+        AFTER UPDATE OF deleted_at ON entries WHEN new.deleted_at IS NOT NULL BEGIN
+            DELETE FROM entry_tags WHERE entry_id = new.id;
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS entries_untag_after_delete AFTER DELETE ON entries BEGIN
+            DELETE FROM entry_tags WHERE entry_id = old.id;
+        END;
+    """)
+
+    if conn.execute("SELECT EXISTS (SELECT 1 FROM entry_tags);").fetchone()[0]:
+        return  # Already backfilled
+    cursor = conn.execute("SELECT id, content FROM entries WHERE deleted_at IS NULL AND instr(content, '#') > 0;")
+    while True:
+        rows = cursor.fetchmany(1000)
+        if not rows:
+            break
+        tagging.write_entry_tags(conn, rows)
+
+
+# Ordered (version, step) pairs. Append new steps; never edit or reorder shipped ones.
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (1, _migrate_v1_entries_table),
+    (2, _migrate_v2_entry_indexes),
+    (3, _migrate_v3_full_text_search),
+    (4, _migrate_v4_daily_stats),
+    (5, _migrate_v5_integer_dates),
+    (6, _migrate_v6_soft_delete_and_revisions),
+    (7, _migrate_v7_tags),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_user_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def read_schema(conn: sqlite3.Connection) -> SchemaInfo:
+    """Describe the schema as it currently exists in the database."""
+    return SchemaInfo(version=get_user_version(conn),
+                      entry_columns=_table_columns(conn, 'entries'))
+
+
+def migrate(conn: sqlite3.Connection) -> SchemaInfo:
+    """Apply all pending migrations in one transaction and return the schema description."""
+    version = get_user_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} is newer than this application supports ({SCHEMA_VERSION})"
+        )
+
+    if version < SCHEMA_VERSION:
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            # Re-read under the write lock in case another process migrated meanwhile
+            version = get_user_version(conn)
+            for target_version, step in MIGRATIONS:
+                if target_version > version:
+                    step(conn)
+                    conn.execute(f"PRAGMA user_version = {int(target_version)};")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    return read_schema(conn)
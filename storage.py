@@ -0,0 +1,600 @@
+"""
+Storage backends for the journal.
+
+``JournalStore`` is the interface the application, the views, the cache and
+the import/export code program against. The ``database`` module satisfies it
+as is; ``SqliteStore`` wraps it in an object that can be pointed at a
+particular file. ``MemoryStore`` keeps everything in Python dicts and lists,
+for running the UI logic, tests and benchmarks at memory speed without
+touching disk.
+"""
+
+import bisect
+import re
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional,
+                    Protocol, Sequence, Set, Tuple, runtime_checkable)
+
+import database
+import date_format
+import db_config
+import maintenance
+import tagging
+from database import (ChangeBus, ChangeEvent, DayStats, Entry, EntryChange, PeriodStats, SearchResult, Streaks,
+                      TagCount)
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@runtime_checkable
+class JournalStore(Protocol):
+    """Operations every journal backend provides. See the database module for semantics."""
+
+    def create_table(self) -> None: ...
+    def add_entry(self, entry_content: str, entry_date: str) -> int: ...
+    def bulk_add_entries(self, entries: Iterable[Mapping[str, Any]],
+                         batch_size: int = database.DEFAULT_BATCH_SIZE,
+                         progress: Optional[Callable[[int], None]] = None) -> int: ...
+    def update_entry(self, entry_id: int, entry_content: Optional[str] = None,
+                     entry_date: Optional[str] = None) -> Entry: ...
+    def delete_entry(self, entry_id: int) -> None: ...
+    def restore_entry(self, entry_id: int) -> Entry: ...
+    def purge_deleted(self, deleted_before: Optional[str] = None) -> int: ...
+    def get_entry(self, entry_id: int) -> Optional[Entry]: ...
+    def iter_entry_pages(self, page_size: int = database.DEFAULT_PAGE_SIZE,
+                         start_date: Optional[str] = None,
+                         end_date: Optional[str] = None) -> Iterator[List[Entry]]: ...
+    def iter_entries(self, page_size: int = database.DEFAULT_PAGE_SIZE,
+                     start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> Iterator[Entry]: ...
+    def get_entries(self) -> List[Dict[str, Any]]: ...
+    def get_entries_page(self, offset: int, limit: int) -> List[Entry]: ...
+    def count_entries(self) -> int: ...
+    def get_entries_by_date(self, date_str: str) -> List[Dict[str, Any]]: ...
+    def get_day_changes(self, date_str: str, after: Optional[int] = None) -> Tuple[List[int], List[Entry]]: ...
+    def search_entries(self, query: str, limit: int = 20, offset: int = 0,
+                       highlight: tuple = ("«", "»")) -> List[SearchResult]: ...
+    def get_daily_stats(self, start_day: Optional[str] = None,
+                        end_day: Optional[str] = None) -> List[DayStats]: ...
+    def get_period_stats(self, period: str = "month", start_day: Optional[str] = None,
+                         end_day: Optional[str] = None) -> List[PeriodStats]: ...
+    def get_streaks(self, as_of: Optional[str] = None) -> Streaks: ...
+    def get_tag_counts(self, within: Sequence[str] = (), limit: Optional[int] = None) -> List[TagCount]: ...
+    def get_entries_with_tags(self, tags: Sequence[str], limit: int = 20, offset: int = 0) -> List[Entry]: ...
+    def get_journal_revision(self) -> int: ...
+    def get_changes_since(self, revision: int, limit: int = database.DEFAULT_PAGE_SIZE) -> List[EntryChange]: ...
+    def iter_changes_since(self, revision: int,
+                           page_size: int = database.DEFAULT_PAGE_SIZE) -> Iterator[EntryChange]: ...
+    def current_revision(self) -> int: ...
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> Callable[[ChangeEvent], None]: ...
+    def unsubscribe(self, callback: Callable[[ChangeEvent], None]) -> None: ...
+    def check_external_changes(self) -> Optional[ChangeEvent]: ...
+    def run_maintenance(self, tasks: Sequence[str] = maintenance.IDLE_TASKS) -> List[maintenance.MaintenanceResult]: ...
+    def get_database_status(self) -> maintenance.DatabaseStatus: ...
+    def close_connection(self) -> None: ...
+
+
+class SqliteStore:
+    """The SQLite backend. The database module keeps one database per process,
+    so creating a store with a path, profile or read_only flag points that module at them."""
+
+    def __init__(self, path: Optional[str] = None, profile: Optional[db_config.ConnectionProfile] = None,
+                 read_only: bool = False):
+        if path == database.DB_NAME:
+            path = None
+        if path is not None or profile is not None or read_only != database.READ_ONLY:
+            database.use_database(path, profile, read_only)
+
+    @property
+    def path(self) -> str:
+        return database.database_path()
+
+    @property
+    def profile(self) -> db_config.ConnectionProfile:
+        return database.connection_profile()
+
+    def create_table(self):
+        database.create_table()
+
+    def add_entry(self, entry_content, entry_date):
+        return database.add_entry(entry_content, entry_date)
+
+    def bulk_add_entries(self, entries, batch_size=database.DEFAULT_BATCH_SIZE, progress=None):
+        return database.bulk_add_entries(entries, batch_size, progress)
+
+    def update_entry(self, entry_id, entry_content=None, entry_date=None):
+        return database.update_entry(entry_id, entry_content, entry_date)
+
+    def delete_entry(self, entry_id):
+        database.delete_entry(entry_id)
+
+    def restore_entry(self, entry_id):
+        return database.restore_entry(entry_id)
+
+    def purge_deleted(self, deleted_before=None):
+        return database.purge_deleted(deleted_before)
+
+    def get_entry(self, entry_id):
+        return database.get_entry(entry_id)
+
+    def iter_entry_pages(self, page_size=database.DEFAULT_PAGE_SIZE, start_date=None, end_date=None):
+        return database.iter_entry_pages(page_size, start_date, end_date)
+
+    def iter_entries(self, page_size=database.DEFAULT_PAGE_SIZE, start_date=None, end_date=None):
+        return database.iter_entries(page_size, start_date, end_date)
+
+    def get_entries(self):
+        return database.get_entries()
+
+    def get_entries_page(self, offset, limit):
+        return database.get_entries_page(offset, limit)
+
+    def count_entries(self):
+        return database.count_entries()
+
+    def get_entries_by_date(self, date_str):
+        return database.get_entries_by_date(date_str)
+
+    def get_day_changes(self, date_str, after=None):
+        return database.get_day_changes(date_str, after)
+
+    def search_entries(self, query, limit=20, offset=0, highlight=("«", "»")):
+        return database.search_entries(query, limit, offset, highlight)
+
+    def get_daily_stats(self, start_day=None, end_day=None):
+        return database.get_daily_stats(start_day, end_day)
+
+    def get_period_stats(self, period="month", start_day=None, end_day=None):
+        return database.get_period_stats(period, start_day, end_day)
+
+    def get_streaks(self, as_of=None):
+        return database.get_streaks(as_of)
+
+    def get_tag_counts(self, within=(), limit=None):
+        return database.get_tag_counts(within, limit)
+
+    def get_entries_with_tags(self, tags, limit=20, offset=0):
+        return database.get_entries_with_tags(tags, limit, offset)
+
+    def get_journal_revision(self):
+        return database.get_journal_revision()
+
+    def get_changes_since(self, revision, limit=database.DEFAULT_PAGE_SIZE):
+        return database.get_changes_since(revision, limit)
+
+    def iter_changes_since(self, revision, page_size=database.DEFAULT_PAGE_SIZE):
+        return database.iter_changes_since(revision, page_size)
+
+    def current_revision(self):
+        return database.current_revision()
+
+    def subscribe(self, callback):
+        return database.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        database.unsubscribe(callback)
+
+    def check_external_changes(self):
+        return database.check_external_changes()
+
+    def run_maintenance(self, tasks=maintenance.IDLE_TASKS):
+        return database.run_maintenance(tasks)
+
+    def get_database_status(self):
+        return database.get_database_status()
+
+    def close_connection(self):
+        database.close_connection()
+
+
+class MemoryStore:
+    """In-memory backend with the same behaviour as SqliteStore, minus persistence.
+
+    Entries live in a dict keyed by id, with a sorted list of
+    (date, created_at, id) keys for the history order, a per-day id index and
+    per-day aggregates updated on every write.
+    Search uses an inverted index of lowercased words (with a sorted word list
+    for prefix lookups) and ranks matches by their number of hits.
+    Deleted entries move to a tombstone dict; an ordered id -> revision map,
+    with each changed id moved to the end, answers get_changes_since().
+    Tags map to the set of live ids carrying them.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: Dict[int, Entry] = {}
+        self._keys: List[Tuple[str, str, int]] = []  # ascending; history reads it backwards
+        self._days: Dict[str, List[int]] = {}
+        self._day_stats: Dict[str, DayStats] = {}
+        self._postings: Dict[str, Set[int]] = {}  # word -> ids of entries containing it
+        self._words: List[str] = []  # sorted keys of _postings
+        self._word_counts: Dict[int, Counter] = {}
+        self._tagged: Dict[str, Set[int]] = {}  # tag -> live ids carrying it
+        self._entry_tags: Dict[int, List[str]] = {}
+        self._tag_order: Dict[str, int] = {}  # first-seen order, like tags.id
+        self._deleted: Dict[int, Tuple[Entry, str]] = {}  # id -> (entry, deleted_at)
+        self._changed: "OrderedDict[int, int]" = OrderedDict()  # id -> revision, oldest change first
+        self._revision = 0
+        self._next_id = 1
+        self._changes = ChangeBus()
+
+    # --- Writes ---
+
+    def create_table(self):
+        pass
+
+    def _bump(self, entry_id):
+        self._revision += 1
+        self._changed[entry_id] = self._revision
+        self._changed.move_to_end(entry_id)
+        return self._revision
+
+    def _insert(self, content, formatted_date, created_at, day_number, created_ts):
+        entry_id = self._next_id
+        self._next_id += 1
+        entry = Entry(entry_id, content, formatted_date, created_at, day_number, created_ts,
+                      None, self._bump(entry_id))
+        self._index(entry)
+        return entry
+
+    def _index(self, entry):
+        self._entries[entry.id] = entry
+        bisect.insort(self._keys, (entry.date, entry.created_at, entry.id))
+        self._days.setdefault(entry.date[:10], []).append(entry.id)
+        stats = self._day_stats.get(entry.date[:10])
+        if stats is None:
+            self._day_stats[entry.date[:10]] = DayStats(entry.date[:10], 1, len(entry.content),
+                                                        entry.date, entry.date)
+        else:
+            self._day_stats[stats.day] = stats._replace(
+                entry_count=stats.entry_count + 1, total_chars=stats.total_chars + len(entry.content),
+                first_at=min(stats.first_at, entry.date), last_at=max(stats.last_at, entry.date))
+        counts = Counter(word.lower() for word in _WORD_RE.findall(entry.content))
+        self._word_counts[entry.id] = counts
+        for word in counts:
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = set()
+                bisect.insort(self._words, word)
+            postings.add(entry.id)
+        tags = tagging.extract_tags(entry.content)
+        if tags:
+            self._entry_tags[entry.id] = tags
+            for tag in tags:
+                self._tag_order.setdefault(tag, len(self._tag_order))
+                self._tagged.setdefault(tag, set()).add(entry.id)
+
+    def _unindex(self, entry):
+        """Undo _index(entry), leaving the entry out of every read."""
+        del self._entries[entry.id]
+        del self._keys[bisect.bisect_left(self._keys, (entry.date, entry.created_at, entry.id))]
+        day = entry.date[:10]
+        ids = self._days[day]
+        ids.remove(entry.id)
+        if ids:
+            day_entries = [self._entries[entry_id] for entry_id in ids]
+            self._day_stats[day] = DayStats(day, len(ids), sum(len(other.content) for other in day_entries),
+                                            min(other.date for other in day_entries),
+                                            max(other.date for other in day_entries))
+        else:
+            del self._days[day]
+            del self._day_stats[day]
+        for word in self._word_counts.pop(entry.id):
+            postings = self._postings[word]
+            postings.discard(entry.id)
+            if not postings:
+                del self._postings[word]
+                del self._words[bisect.bisect_left(self._words, word)]
+        for tag in self._entry_tags.pop(entry.id, ()):
+            ids = self._tagged[tag]
+            ids.discard(entry.id)
+            if not ids:
+                del self._tagged[tag]
+
+    def add_entry(self, entry_content, entry_date):
+        if not entry_content or not entry_date:
+            raise ValueError("Content and date cannot be empty")
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        formatted_date = database.normalize_entry_date(entry_date, current_time[11:])
+        with self._lock:
+            entry = self._insert(entry_content, formatted_date, current_time,
+                                 date_format.day_number(formatted_date), date_format.timestamp(current_time))
+        self._changes.publish('insert', (entry.id,), (entry.date[:10],))
+        return entry.id
+
+    def bulk_add_entries(self, entries, batch_size=database.DEFAULT_BATCH_SIZE, progress=None):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        batch = []
+        # Validate everything first so a bad entry (or a cancel raised from
+        # progress) leaves the store untouched, like the SQLite transaction
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                rows.extend(database.prepare_entry_rows(batch, len(rows), current_time))
+                batch = []
+                if progress:
+                    progress(len(rows))
+        if batch:
+            rows.extend(database.prepare_entry_rows(batch, len(rows), current_time))
+            if progress:
+                progress(len(rows))
+        with self._lock:
+            for row in rows:
+                self._insert(*row)
+        if rows:
+            self._changes.publish('import', days={row[1][:10] for row in rows})
+        return len(rows)
+
+    def update_entry(self, entry_id, entry_content=None, entry_date=None):
+        if entry_content is None and entry_date is None:
+            raise ValueError("Nothing to update")
+        if entry_content is not None and not entry_content:
+            raise ValueError("Content cannot be empty")
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                raise LookupError(f"No entry with id {entry_id}")
+            content = entry.content if entry_content is None else entry_content
+            formatted_date = (database.normalize_entry_date(entry_date, entry.date[11:])
+                              if entry_date else entry.date)
+            if content == entry.content and formatted_date == entry.date:
+                return entry
+            self._unindex(entry)
+            updated = entry._replace(content=content, date=formatted_date,
+                                     day_number=date_format.day_number(formatted_date),
+                                     updated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                     revision=self._bump(entry_id))
+            self._index(updated)
+        self._changes.publish('update', (entry_id,), (entry.date[:10], updated.date[:10]))
+        return updated
+
+    def delete_entry(self, entry_id):
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                raise LookupError(f"No entry with id {entry_id}")
+            self._unindex(entry)
+            self._deleted[entry_id] = (entry._replace(revision=self._bump(entry_id)),
+                                       datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self._changes.publish('delete', (entry_id,), (entry.date[:10],))
+
+    def restore_entry(self, entry_id):
+        with self._lock:
+            if entry_id not in self._deleted:
+                raise LookupError(f"No deleted entry with id {entry_id}")
+            entry, _deleted_at = self._deleted.pop(entry_id)
+            entry = entry._replace(revision=self._bump(entry_id))
+            self._index(entry)
+        self._changes.publish('restore', (entry_id,), (entry.date[:10],))
+        return entry
+
+    def purge_deleted(self, deleted_before=None):
+        deleted_before = deleted_before or "9999-12-31 23:59:59"
+        with self._lock:
+            purged = [entry_id for entry_id, (_entry, deleted_at) in self._deleted.items()
+                      if deleted_at < deleted_before]
+            for entry_id in purged:
+                del self._deleted[entry_id]
+                del self._changed[entry_id]
+        return len(purged)
+
+    # --- Reads ---
+
+    def iter_entry_pages(self, page_size=database.DEFAULT_PAGE_SIZE, start_date=None, end_date=None):
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        low = f"{start_date[:10]} 00:00:00" if start_date else None
+        high = f"{end_date[:10]} 23:59:59" if end_date else None
+        last_key = None
+        while True:
+            with self._lock:
+                if last_key is not None:
+                    end = bisect.bisect_left(self._keys, last_key)
+                elif high is not None:
+                    end = bisect.bisect_right(self._keys, (high, "￿", 0))
+                else:
+                    end = len(self._keys)
+                keys = self._keys[max(end - page_size, 0):end][::-1]
+                if low is not None:
+                    keys = [key for key in keys if key[0] >= low]
+                page = [self._entries[key[2]] for key in keys]
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            last_key = keys[-1]
+
+    def iter_entries(self, page_size=database.DEFAULT_PAGE_SIZE, start_date=None, end_date=None):
+        for page in self.iter_entry_pages(page_size, start_date, end_date):
+            yield from page
+
+    def get_entries(self):
+        return [{'id': entry.id, 'content': entry.content, 'date': entry.date} for entry in self.iter_entries()]
+
+    def get_entry(self, entry_id):
+        with self._lock:
+            return self._entries.get(entry_id)
+
+    def get_entries_page(self, offset, limit):
+        with self._lock:
+            end = max(len(self._keys) - offset, 0)
+            keys = self._keys[max(end - limit, 0):end][::-1]
+            return [self._entries[key[2]] for key in keys]
+
+    def count_entries(self):
+        return len(self._entries)
+
+    def _day_entries(self, date_str):
+        day = datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m-%d")
+        with self._lock:
+            entries = [self._entries[entry_id] for entry_id in self._days.get(day, ())]
+        entries.sort(key=lambda entry: (entry.created_ts, entry.id), reverse=True)
+        return entries
+
+    def get_entries_by_date(self, date_str):
+        return [{'id': entry.id, 'content': entry.content, 'date': entry.date, 'created_at': entry.created_at}
+                for entry in self._day_entries(date_str)]
+
+    def get_day_changes(self, date_str, after=None):
+        entries = self._day_entries(date_str)
+        ids = [entry.id for entry in entries]
+        if after is not None:
+            entries = [entry for entry in entries if entry.revision > after]
+        return ids, entries
+
+    def search_entries(self, query, limit=20, offset=0, highlight=("«", "»")):
+        complete, prefix = database.split_search_query(query)
+        complete = [word.lower() for word in complete]
+        prefix = prefix.lower() if prefix else None
+        if not complete and not prefix:
+            return []
+
+        with self._lock:
+            prefix_words = []
+            if prefix is not None:
+                position = bisect.bisect_left(self._words, prefix)
+                while position < len(self._words) and self._words[position].startswith(prefix):
+                    prefix_words.append(self._words[position])
+                    position += 1
+                if not prefix_words:
+                    return []
+            matched = None
+            for word in complete:
+                postings = self._postings.get(word, set())
+                matched = postings if matched is None else matched & postings
+            if prefix is not None:
+                with_prefix = set().union(*(self._postings[word] for word in prefix_words))
+                matched = with_prefix if matched is None else matched & with_prefix
+            # Rank only the most recent candidates, like the SQLite backend
+            candidates = sorted(matched, reverse=True)[:database.SEARCH_CANDIDATES]
+            ranked = []
+            for entry_id in candidates:
+                counts = self._word_counts[entry_id]
+                hits = sum(counts[word] for word in complete) + sum(counts[word] for word in prefix_words)
+                ranked.append((-hits, -entry_id, self._entries[entry_id]))
+        ranked.sort(key=lambda item: item[:2])
+
+        def mark(match):
+            word = match.group(0)
+            lowered = word.lower()
+            if lowered in complete or (prefix is not None and lowered.startswith(prefix)):
+                return f"{highlight[0]}{word}{highlight[1]}"
+            return word
+
+        return [SearchResult(entry.id, entry.date, _WORD_RE.sub(mark, entry.content), float(rank))
+                for rank, _, entry in ranked[offset:offset + limit]]
+
+    # --- Statistics ---
+
+    def get_daily_stats(self, start_day=None, end_day=None):
+        with self._lock:
+            days = sorted(self._day_stats)
+            low = bisect.bisect_left(days, start_day[:10]) if start_day else 0
+            high = bisect.bisect_right(days, end_day[:10]) if end_day else len(days)
+            return [self._day_stats[day] for day in days[low:high]]
+
+    def get_period_stats(self, period="month", start_day=None, end_day=None):
+        if period not in database.PERIOD_LENGTHS:
+            raise ValueError(f"period must be one of {sorted(database.PERIOD_LENGTHS)}, not {period!r}")
+        length = database.PERIOD_LENGTHS[period]
+        totals: Dict[str, List[int]] = {}
+        for stats in self.get_daily_stats(start_day, end_day):
+            total = totals.setdefault(stats.day[:length], [0, 0, 0])
+            total[0] += stats.entry_count
+            total[1] += stats.total_chars
+            total[2] += 1
+        return [PeriodStats(key, *total) for key, total in totals.items()]
+
+    def get_streaks(self, as_of=None):
+        with self._lock:
+            days = sorted(self._day_stats)
+        return database.compute_streaks(days, as_of)
+
+    # --- Tags ---
+
+    def _tag_match(self, tags):
+        names = list(dict.fromkeys(name for name in map(tagging.normalize_tag, tags) if name))
+        if not names:
+            raise ValueError("At least one tag is required")
+        if any(name not in self._tagged for name in names):
+            return set()
+        tagged = sorted((self._tagged[name] for name in names), key=len)
+        return tagged[0].intersection(*tagged[1:])
+
+    def _ranked_tags(self, counts, limit):
+        ranked = sorted(counts, key=lambda item: (-item[1], -self._tag_order[item[0]]))
+        return [TagCount(*item) for item in (ranked if limit is None else ranked[:limit])]
+
+    def get_tag_counts(self, within=(), limit=None):
+        with self._lock:
+            if not within:
+                return self._ranked_tags([(tag, len(ids)) for tag, ids in self._tagged.items()], limit)
+            counts = Counter(tag for entry_id in self._tag_match(within) for tag in self._entry_tags[entry_id])
+            return self._ranked_tags(counts.items(), limit)
+
+    def get_entries_with_tags(self, tags, limit=20, offset=0):
+        with self._lock:
+            matched = sorted(self._tag_match(tags), reverse=True)
+            return [self._entries[entry_id] for entry_id in matched[offset:offset + limit]]
+
+    # --- Change feed ---
+
+    def get_journal_revision(self):
+        return self._revision
+
+    def get_changes_since(self, revision, limit=database.DEFAULT_PAGE_SIZE):
+        with self._lock:
+            # Walk back from the newest change, so the cost is the number of changes after revision
+            newer = []
+            for entry_id, entry_revision in reversed(self._changed.items()):
+                if entry_revision <= revision:
+                    break
+                newer.append((entry_id, entry_revision))
+            changes = []
+            for entry_id, entry_revision in reversed(newer[-limit:]):
+                if entry_id in self._deleted:
+                    entry, deleted_at = self._deleted[entry_id]
+                else:
+                    entry, deleted_at = self._entries[entry_id], None
+                changes.append(EntryChange(entry_id, entry_revision, entry.content, entry.date,
+                                           entry.created_at, entry.updated_at, deleted_at))
+            return changes
+
+    def iter_changes_since(self, revision, page_size=database.DEFAULT_PAGE_SIZE):
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        while True:
+            page = self.get_changes_since(revision, page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            revision = page[-1].revision
+
+    # --- Change notification ---
+
+    def current_revision(self):
+        return self._changes.current_revision()
+
+    def subscribe(self, callback):
+        return self._changes.subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self._changes.unsubscribe(callback)
+
+    def check_external_changes(self):
+        return None  # Nothing outside this process can write to it
+
+    def run_maintenance(self, tasks=maintenance.IDLE_TASKS):
+        return []  # No files, so nothing to checkpoint or reclaim
+
+    def get_database_status(self):
+        return maintenance.DatabaseStatus(file_bytes=0, wal_bytes=0, free_bytes=0, auto_vacuum="none")
+
+    def close_connection(self):
+        pass
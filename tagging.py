@@ -0,0 +1,63 @@
+"""
+Hashtag extraction and the tag tables.
+
+Entries are tagged by writing #hashtags in their content: ``#python``,
+``#rust-lang``, ``#c++``, ``#100daysofcode``. Tags are case-insensitive and
+stored lowercased. A '#' inside a word, URL or entity ('C#', 'page#top',
+'&#38;') and pure numbers ('#42', usually an issue) are not tags.
+
+The tags table holds one row per distinct name with a live entry_count that
+triggers on entry_tags maintain; entry_tags links only live entries, so tag
+reads never have to look at tombstones. The write helper here is shared by
+the schema migration (backfill) and the database module (inserts, edits).
+"""
+
+import re
+import sqlite3
+from typing import List, Sequence, Tuple
+
+MAX_TAG_LENGTH = 64
+_TAG_RE = re.compile(r"(?<![\w#&/])#(\w[\w+-]*)")
+# Stay well below SQLite's host parameter limit when looking tag names up
+_NAME_CHUNK = 500
+
+
+def normalize_tag(text: str) -> str:
+    """'#Python' or 'python' -> 'python'."""
+    return text.strip().lstrip("#").lower()
+
+
+def extract_tags(content: str) -> List[str]:
+    """The distinct tags of an entry's text, in order of first appearance."""
+    if "#" not in content:
+        return []
+    tags = []
+    for match in _TAG_RE.finditer(content):
+        tag = match.group(1).rstrip("-").lower()
+        if tag and not tag.isdigit() and len(tag) <= MAX_TAG_LENGTH and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def write_entry_tags(conn: sqlite3.Connection, rows: Sequence[Tuple[int, str]], replace: bool = False) -> None:
+    """Link entries to the tags in their content; rows are (entry_id, content).
+
+    With replace, the entries' existing links are dropped first (for edits
+    and restores). Runs inside the caller's transaction.
+    """
+    if replace:
+        conn.executemany("DELETE FROM entry_tags WHERE entry_id = ?;", ((entry_id,) for entry_id, _ in rows))
+    pairs = [(entry_id, tag) for entry_id, content in rows for tag in extract_tags(content)]
+    if not pairs:
+        return
+    names = list(dict.fromkeys(tag for _, tag in pairs))  # New tags get ids in order of first use
+    conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?);", ((name,) for name in names))
+    tag_ids = {}
+    for start in range(0, len(names), _NAME_CHUNK):
+        chunk = names[start:start + _NAME_CHUNK]
+        tag_ids.update(conn.execute(
+            f"SELECT name, id FROM tags WHERE name IN ({','.join('?' * len(chunk))});", chunk
+        ))
+    conn.executemany("INSERT OR IGNORE INTO entry_tags (tag_id, entry_id) VALUES (?, ?);",
+                     ((tag_ids[tag], entry_id) for entry_id, tag in pairs))
+
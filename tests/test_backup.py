@@ -0,0 +1,114 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backup  # noqa: E402
+import database  # noqa: E402
+import migrations  # noqa: E402
+from journal_io import JobCancelled  # noqa: E402
+
+
+def _contents():
+    return sorted(entry.content for entry in database.iter_entries())
+
+
+def _tag_counts():
+    return {tag.name: tag.entry_count for tag in database.get_tag_counts()}
+
+
+class RestoreTest(unittest.TestCase):
+    """BackupManager.restore() swaps a backup into the live journal, or leaves it untouched."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.path = os.path.join(self.tmp, "journal.db")
+        for name in ("DB_NAME", "_schema"):
+            patcher = mock.patch.object(database, name, getattr(database, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(database.close_connection)
+        database.use_database(self.path)
+        database.create_table()
+        database.add_entry("Backed up #python entry", "2024-01-01")
+        database.add_entry("Also backed up #python #sqlite", "2024-01-02")
+        # Small steps, so the copies take several backup API steps
+        self.manager = backup.BackupManager(self.path, os.path.join(self.tmp, "backups"), pages_per_step=2)
+        self.backup = self.manager.backup()
+        database.add_entry("Written after the backup #rust", "2024-01-03")
+        database.delete_entry(1)
+
+    def test_restore_replaces_rows_for_open_connections(self):
+        # An open connection from before the restore must see the restored rows
+        conn = database.get_connection()
+        self.assertEqual(_contents(), ["Also backed up #python #sqlite", "Written after the backup #rust"])
+        saved = self.manager.restore(self.backup.path)
+        self.assertIs(database.get_connection(), conn)
+        self.assertEqual(_contents(), ["Also backed up #python #sqlite", "Backed up #python entry"])
+        self.assertEqual(saved.kind, "pre-restore")
+        self.assertFalse(os.path.exists(self.path + ".restore"))
+
+        # The pre-restore copy undoes the restore
+        self.manager.restore(saved.path)
+        self.assertEqual(_contents(), ["Also backed up #python #sqlite", "Written after the backup #rust"])
+
+    def test_search_and_tags_follow_restored_rows(self):
+        self.manager.restore(self.backup.path)
+        self.assertEqual(database.search_entries("written"), [])
+        self.assertEqual(len(database.search_entries("backed")), 2)
+        self.assertEqual(_tag_counts(), {"python": 2, "sqlite": 1})
+        self.assertEqual(database.get_connection().execute("PRAGMA integrity_check;").fetchone()[0], "ok")
+
+    def test_cancelled_restore_leaves_journal_unchanged(self):
+        before = _contents()
+        backups_before = self.manager.list_backups()
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(JobCancelled):
+            self.manager.restore(self.backup.path, cancel=cancel)
+        self.assertEqual(_contents(), before)
+        self.assertEqual(_tag_counts(), {"python": 1, "sqlite": 1, "rust": 1})
+        self.assertEqual(self.manager.list_backups(), backups_before)
+        self.assertFalse(os.path.exists(self.path + ".restore"))
+
+    def _assert_refused(self, path):
+        before = _contents()
+        with self.assertRaises(backup.BackupError):
+            self.manager.restore(path)
+        self.assertEqual(_contents(), before)
+        self.assertEqual([info.kind for info in self.manager.list_backups()], ["backup"])
+
+    def test_damaged_file_is_refused(self):
+        damaged = os.path.join(self.tmp, "damaged.db")
+        shutil.copyfile(self.backup.path, damaged)
+        with open(damaged, "r+b") as f:
+            page_size = int.from_bytes(f.read(18)[16:18], "big")
+            f.seek(page_size)  # Leave the header page readable, scribble over the rest
+            f.write(b"\xa5" * (os.path.getsize(damaged) - page_size))
+        self._assert_refused(damaged)
+
+    def test_non_database_file_is_refused(self):
+        garbage = os.path.join(self.tmp, "garbage.db")
+        with open(garbage, "wb") as f:
+            f.write(b"not a journal" * 1000)
+        self._assert_refused(garbage)
+
+    def test_newer_schema_is_refused(self):
+        newer = os.path.join(self.tmp, "newer.db")
+        shutil.copyfile(self.backup.path, newer)
+        conn = sqlite3.connect(newer)
+        conn.execute(f"PRAGMA user_version = {migrations.SCHEMA_VERSION + 1};")
+        conn.close()
+        self._assert_refused(newer)
+
+
+if __name__ == "__main__":
+    unittest.main()
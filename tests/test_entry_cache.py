@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from entry_cache import EntryCache  # noqa: E402
+
+
+class EntryCacheDefaultStoreTest(unittest.TestCase):
+    """EntryCache() with no arguments uses the database module as its store."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        # Put the module globals back afterwards; use_database(None) would keep the temp path
+        for name in ("DB_NAME", "_schema"):
+            patcher = mock.patch.object(database, name, getattr(database, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(database.close_connection)
+        database.use_database(os.path.join(tmp.name, "cache.db"))
+        database.create_table()
+
+    def test_default_store(self):
+        cache = EntryCache()
+        try:
+            self.assertIs(cache.store, database)
+            self.assertEqual(cache.get_day("2024-01-01"), [])
+            # The cache listens on the database module's change bus
+            database.add_entry("First entry", "2024-01-01")
+            self.assertIsNone(cache.peek_day("2024-01-01"))
+            self.assertEqual([entry.content for entry in cache.get_day("2024-01-01")], ["First entry"])
+        finally:
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
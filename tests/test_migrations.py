@@ -0,0 +1,178 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+import date_format  # noqa: E402
+import migrations  # noqa: E402
+import tagging  # noqa: E402
+
+# Rows as early releases wrote them: no created_at, times optional
+LEGACY_ROWS = [
+    ("Started the journal #python", "2024-01-01 09:00:00"),
+    ("Keyset pagination in #SQLite and #python", "2024-01-01 17:30:00"),
+    ("A day with no tags", "2024-01-02"),
+    ("C# is not a tag, #42 neither, #rust-lang is", "2024-01-03 08:15:00"),
+    ("Back to #sqlite", "2024-02-29 23:59:59"),
+]
+
+
+def _create_legacy_journal(path):
+    """A journal as the first release created it: no created_at column and user_version 0."""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content TEXT NOT NULL,
+            date TEXT NOT NULL
+        );
+    """)
+    conn.executemany("INSERT INTO entries (content, date) VALUES (?, ?);", LEGACY_ROWS)
+    conn.commit()
+    return conn
+
+
+def _expected_daily_stats(conn):
+    return conn.execute("""
+        SELECT substr(date, 1, 10), count(*), sum(length(content)), min(date), max(date)
+        FROM entries WHERE deleted_at IS NULL GROUP BY substr(date, 1, 10) ORDER BY 1;
+    """).fetchall()
+
+
+def _expected_tag_counts(conn):
+    counts = Counter()
+    for (content,) in conn.execute("SELECT content FROM entries WHERE deleted_at IS NULL;"):
+        counts.update(tagging.extract_tags(content))
+    return dict(counts)
+
+
+def _tag_counts(conn):
+    return dict(conn.execute("SELECT name, entry_count FROM tags WHERE entry_count > 0;").fetchall())
+
+
+def _schema_sql(conn):
+    return conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name;").fetchall()
+
+
+class MigrateLegacyJournalTest(unittest.TestCase):
+    """migrate() brings a first-release journal to the current schema with derived data filled in."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "data.db")
+        self.conn = _create_legacy_journal(self.path)
+        self.addCleanup(self.conn.close)
+        self.schema = migrations.migrate(self.conn)
+
+    def test_reaches_current_version(self):
+        self.assertEqual(migrations.get_user_version(self.conn), migrations.SCHEMA_VERSION)
+        self.assertEqual(self.schema.version, migrations.SCHEMA_VERSION)
+        for column in ("created_at", "day_number", "created_ts", "updated_at", "deleted_at", "revision"):
+            self.assertTrue(self.schema.has_column(column), column)
+
+    def test_backfills_integer_dates(self):
+        rows = self.conn.execute("SELECT date, created_at, day_number, created_ts FROM entries;").fetchall()
+        self.assertEqual(len(rows), len(LEGACY_ROWS))
+        for entry_date, created_at, day_number, created_ts in rows:
+            self.assertIsNotNone(created_at)
+            self.assertEqual(day_number, date_format.day_number(entry_date))
+            self.assertEqual(created_ts, date_format.timestamp(created_at))
+
+    def test_backfills_revisions(self):
+        rows = self.conn.execute("SELECT id, revision FROM entries ORDER BY id;").fetchall()
+        self.assertEqual([revision for _, revision in rows], [entry_id for entry_id, _ in rows])
+        self.assertEqual(self.conn.execute("SELECT revision FROM sync_state;").fetchone()[0], len(LEGACY_ROWS))
+
+    def test_daily_stats_match_entries(self):
+        stats = self.conn.execute("SELECT * FROM daily_stats ORDER BY day;").fetchall()
+        self.assertEqual(stats, _expected_daily_stats(self.conn))
+        self.assertEqual([row[0] for row in stats], ["2024-01-01", "2024-01-02", "2024-01-03", "2024-02-29"])
+
+    def test_tags_are_backfilled(self):
+        self.assertEqual(_tag_counts(self.conn), {"python": 2, "sqlite": 2, "rust-lang": 1})
+        self.assertEqual(_tag_counts(self.conn), _expected_tag_counts(self.conn))
+
+    def test_full_text_index_is_built(self):
+        ids = [row[0] for row in self.conn.execute(
+            "SELECT rowid FROM entries_fts WHERE entries_fts MATCH 'keyset';")]
+        self.assertEqual(ids, [2])
+
+    def test_hot_indexes_are_partial(self):
+        indexes = {name: sql for name, sql in self.conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'entries';")}
+        for name in ("idx_entries_live_date_created", "idx_entries_live_day_ts"):
+            self.assertIn("WHERE deleted_at IS NULL", indexes[name])
+        for dropped in ("idx_entries_date_created", "idx_entries_day_created", "idx_entries_day_ts"):
+            self.assertNotIn(dropped, indexes)
+
+    def test_second_migrate_is_a_no_op(self):
+        schema_before = _schema_sql(self.conn)
+        rows_before = self.conn.execute("SELECT * FROM entries ORDER BY id;").fetchall()
+        changes_before = self.conn.total_changes
+        self.assertEqual(migrations.migrate(self.conn), self.schema)
+        self.assertEqual(self.conn.total_changes, changes_before)
+        self.assertEqual(_schema_sql(self.conn), schema_before)
+        self.assertEqual(self.conn.execute("SELECT * FROM entries ORDER BY id;").fetchall(), rows_before)
+
+    def test_newer_schema_is_refused(self):
+        self.conn.execute(f"PRAGMA user_version = {migrations.SCHEMA_VERSION + 1};")
+        with self.assertRaises(RuntimeError):
+            migrations.migrate(self.conn)
+
+
+class MigratedJournalWritesTest(unittest.TestCase):
+    """After the upgrade, the triggers keep daily_stats and tag counts in step with random writes."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "data.db")
+        _create_legacy_journal(path).close()
+        for name in ("DB_NAME", "_schema"):
+            patcher = mock.patch.object(database, name, getattr(database, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(database.close_connection)
+        database.use_database(path)
+        database.create_table()
+
+    def test_random_writes_keep_aggregates_consistent(self):
+        rng = random.Random(1234)
+        words = ["#python", "#sqlite", "#rust-lang", "#Go", "plain", "words", "C#", "#42"]
+        days = [f"2024-03-{day:02d}" for day in range(1, 8)]
+        for _ in range(300):
+            live = [row[0] for row in database.get_connection().execute(
+                "SELECT id FROM entries WHERE deleted_at IS NULL;")]
+            deleted = [row[0] for row in database.get_connection().execute(
+                "SELECT id FROM entries WHERE deleted_at IS NOT NULL;")]
+            content = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+            action = rng.random()
+            if action < 0.4 or not live:
+                database.add_entry(content, rng.choice(days))
+            elif action < 0.6:
+                database.update_entry(rng.choice(live), content, rng.choice(days + [None]))
+            elif action < 0.75:
+                database.delete_entry(rng.choice(live))
+            elif action < 0.9 and deleted:
+                database.restore_entry(rng.choice(deleted))
+            else:
+                database.purge_deleted()
+
+        conn = database.get_connection()
+        self.assertEqual(conn.execute("SELECT * FROM daily_stats ORDER BY day;").fetchall(),
+                         _expected_daily_stats(conn))
+        self.assertEqual(_tag_counts(conn), _expected_tag_counts(conn))
+        self.assertEqual(conn.execute("SELECT count(*) FROM tags WHERE entry_count < 0;").fetchone()[0], 0)
+        self.assertEqual(conn.execute("PRAGMA integrity_check;").fetchone()[0], "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Query plans of the hot read paths.
+
+Runs the database module's read functions against a scratch journal, captures
+every SELECT they issue and runs EXPLAIN QUERY PLAN on it. A plan that reads
+the entries table without an index or sorts through a temp B-tree fails.
+benchmarks/check_query_plans.py prints the same plans.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+
+CHECKS = {
+    "get_entries (first page)": lambda: next(database.iter_entry_pages(page_size=50)),
+    "get_entries (keyset pages)": lambda: list(database.iter_entry_pages(page_size=2)),
+    "get_entries (date bounds)": lambda: list(database.iter_entry_pages(50, "2024-01-01", "2024-01-31")),
+    "get_entries_page": lambda: database.get_entries_page(10, 50),
+    "get_entries_by_date": lambda: database.get_entries_by_date(datetime.now().strftime("%Y-%m-%d")),
+    "get_day_changes": lambda: database.get_day_changes("2024-01-05"),
+    "get_day_changes (after revision)": lambda: database.get_day_changes("2024-01-05", 10),
+    "count_entries": database.count_entries,
+    "get_changes_since": lambda: list(database.iter_changes_since(5, page_size=4)),
+    "get_tag_counts": database.get_tag_counts,
+    "get_entries_with_tags": lambda: database.get_entries_with_tags(["journal", "#Tag1"], limit=20, offset=20),
+    "get_daily_stats (year)": lambda: database.get_daily_stats("2024-01-01", "2024-12-31"),
+    "get_streaks": lambda: database.get_streaks("2024-02-01"),
+}
+
+
+def build_plan_database():
+    """Fill the current database with 2000 entries, some tombstones and fresh statistics."""
+    database.create_table()
+    database.bulk_add_entries({'content': f"entry {i} #journal #tag{i % 7}",
+                               'date': f"2024-01-{i % 28 + 1:02d} {i % 24:02d}:00:00"}
+                              for i in range(2000))
+    conn = database.get_connection()
+    # Some tombstones, so the statistics see the partial indexes skip rows
+    conn.execute("UPDATE entries SET deleted_at = '2024-02-02 12:00:00' WHERE id % 50 = 0;")
+    conn.commit()
+    conn.execute("ANALYZE;")
+    return conn
+
+
+def capture_selects(conn, func):
+    statements = []
+
+    def trace(sql):
+        if sql.lstrip().upper().startswith("SELECT"):
+            statements.append(sql)
+
+    conn.set_trace_callback(trace)
+    try:
+        func()
+    finally:
+        conn.set_trace_callback(None)
+    return statements
+
+
+def plan_problems(conn, sql):
+    """The EXPLAIN QUERY PLAN details of sql, and those that scan entries or sort in a temp B-tree."""
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    problems = []
+    for detail in plan:
+        if detail.startswith("SCAN entries") and "USING" not in detail:
+            problems.append(detail)
+        if "TEMP B-TREE" in detail:
+            problems.append(detail)
+    return plan, problems
+
+
+def distinct_plans(conn, func):
+    """(plan, problems) for each distinct plan among the SELECTs func issues."""
+    seen = set()
+    for sql in capture_selects(conn, func):
+        plan, problems = plan_problems(conn, sql)
+        if tuple(plan) not in seen:
+            seen.add(tuple(plan))
+            yield plan, problems
+
+
+class QueryPlanTest(unittest.TestCase):
+    """The hot read paths are served by indexes, without full scans or temp B-tree sorts."""
+
+    @classmethod
+    def setUpClass(cls):
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        for name in ("DB_NAME", "_schema"):
+            patcher = mock.patch.object(database, name, getattr(database, name))
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+        cls.addClassCleanup(database.close_connection)
+        database.use_database(os.path.join(tmp.name, "plans.db"))
+        cls.conn = build_plan_database()
+
+    def test_hot_queries_use_indexes(self):
+        for name, func in CHECKS.items():
+            with self.subTest(name):
+                plans = list(distinct_plans(self.conn, func))
+                self.assertTrue(plans, f"{name} issued no SELECT")
+                for plan, problems in plans:
+                    self.assertEqual(problems, [], f"{name}: {' | '.join(plan)}")
+
+    def test_full_scan_is_reported(self):
+        _plan, problems = plan_problems(self.conn, "SELECT * FROM entries WHERE content LIKE '%x%' ORDER BY content;")
+        self.assertTrue(any(detail.startswith("SCAN entries") for detail in problems))
+        self.assertTrue(any("TEMP B-TREE" in detail for detail in problems))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,5 +8,11 @@ Each view is implemented as a separate class inheriting from BaseView.
 from .base_view import BaseView
 from .settings_view import SettingsView
 from .library_view import LibraryView
+from .virtual_list import VirtualEntryList
+from .debug_overlay import DebugOverlay
+from .year_heatmap import YearHeatmap
+from .render_scheduler import RenderScheduler
+from .entry_editor import EntryEditor
+from .tag_sidebar import TagSidebar
 
-__all__ = ['BaseView', 'SettingsView', 'LibraryView'] 
\ No newline at end of file
+__all__ = ['BaseView', 'SettingsView', 'LibraryView', 'VirtualEntryList', 'DebugOverlay', 'YearHeatmap', 'RenderScheduler', 'EntryEditor', 'TagSidebar'] 
\ No newline at end of file
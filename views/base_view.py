@@ -3,11 +3,11 @@ import customtkinter as ctk
 class BaseView(ctk.CTkFrame):
     """Base class for all views in the application"""
     
-    def __init__(self, parent_tk, app_instance, database, **kwargs):
+    def __init__(self, parent_tk, app_instance, store, **kwargs):
         super().__init__(parent_tk, fg_color="transparent", **kwargs)
         
         self.app_instance = app_instance
-        self.database = database
+        self.store = store
         
         # Configure grid for the BaseView frame itself to expand within its parent_tk
         self.grid_columnconfigure(0, weight=1)
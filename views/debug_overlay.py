@@ -0,0 +1,56 @@
+import customtkinter as ctk
+import instrumentation
+import write_lock
+
+REFRESH_MS = 1000
+
+
+class DebugOverlay(ctk.CTkToplevel):
+    """Small always-on-top window with live p50/p95 timings per operation, cache, write contention and maintenance stats"""
+
+    def __init__(self, app_instance, **kwargs):
+        super().__init__(app_instance, **kwargs)
+        self.app_instance = app_instance
+        self.title("Performance")
+        self.geometry("560x360")
+        self.attributes("-topmost", True)
+
+        self.textbox = ctk.CTkTextbox(self, font=("Consolas", 12), wrap="none")
+        self.textbox.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        button_row = ctk.CTkFrame(self, fg_color="transparent")
+        button_row.pack(fill="x", padx=10, pady=(0, 10))
+        ctk.CTkButton(button_row, text="Reset", width=80,
+                      command=self._reset).pack(side="right")
+
+        self._after_id = None
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self._refresh()
+
+    def _reset(self):
+        instrumentation.recorder.clear()
+        write_lock.reset_stats()
+
+    def _refresh(self):
+        text = instrumentation.format_stats(instrumentation.recorder.stats())
+        cache = getattr(self.app_instance, "entry_cache", None)
+        if cache is not None:
+            stats = cache.stats()
+            text += (f"\n\ncache: {stats['items']} items, {stats['bytes'] // 1024} KiB, "
+                     f"hit rate {stats['hit_rate']:.0%}, {stats['evictions']} evictions, "
+                     f"{stats['invalidations']} invalidations")
+        text += "\n\nwrites: " + write_lock.format_stats()
+        maintenance = getattr(self.app_instance, "maintenance", None)
+        if maintenance is not None and maintenance.metrics:
+            text += "\n\nmaintenance:\n" + maintenance.stats()
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", text)
+        self.textbox.configure(state="disabled")
+        self._after_id = self.after(REFRESH_MS, self._refresh)
+
+    def close(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        self.destroy()
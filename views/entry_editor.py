@@ -0,0 +1,74 @@
+from datetime import datetime
+from tkinter import messagebox
+import customtkinter as ctk
+
+
+class EntryEditor(ctk.CTkToplevel):
+    """Modal window for editing one entry's content and date.
+
+    Saving runs store.update_entry on the database worker; on_saved(entry) is
+    called on the Tk thread with the updated row before the window closes.
+    """
+
+    def __init__(self, app_instance, entry, on_saved=None, **kwargs):
+        super().__init__(app_instance, **kwargs)
+        self.app_instance = app_instance
+        self.entry = entry
+        self.on_saved = on_saved
+        self.title("Edit Entry")
+        self.geometry("560x380")
+        self.transient(app_instance)
+
+        self.textbox = ctk.CTkTextbox(self, wrap="word", font=("Inter", 13),
+                                      border_width=1, border_color="#E5E7EB", corner_radius=8)
+        self.textbox.pack(fill="both", expand=True, padx=15, pady=(15, 10))
+        self.textbox.insert("1.0", entry.content)
+
+        button_row = ctk.CTkFrame(self, fg_color="transparent")
+        button_row.pack(fill="x", padx=15, pady=(0, 15))
+        ctk.CTkLabel(button_row, text="Date:", font=("Inter", 13, "bold"),
+                     text_color="#4B5563").pack(side="left", padx=(0, 10))
+        self.date_entry = ctk.CTkEntry(button_row, width=130, font=("Inter", 13),
+                                       border_width=1, border_color="#E5E7EB", corner_radius=8)
+        self.date_entry.insert(0, entry.date[:10])
+        self.date_entry.pack(side="left")
+
+        self.save_button = ctk.CTkButton(button_row, text="Save", width=90, command=self._save,
+                                         font=("Inter", 13), fg_color="#3B82F6", hover_color="#2563EB")
+        self.save_button.pack(side="right")
+        ctk.CTkButton(button_row, text="Cancel", width=90, command=self.destroy, font=("Inter", 13),
+                      fg_color="transparent", text_color="#4B5563", hover_color="#F3F4F6",
+                      border_width=1, border_color="#E5E7EB").pack(side="right", padx=(0, 10))
+
+        self.after(50, self._grab)  # The window must be viewable before it can grab
+
+    def _grab(self):
+        self.grab_set()
+        self.textbox.focus_set()
+
+    def _save(self):
+        content = self.textbox.get("1.0", "end-1c").strip()
+        date_str = self.date_entry.get().strip()
+        if not content:
+            messagebox.showwarning("Input Error", "Entry content cannot be empty.", parent=self)
+            return
+        try:
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showwarning("Input Error", "Invalid date format. Please use YYYY-MM-DD.", parent=self)
+            return
+
+        self.save_button.configure(state="disabled")
+        # Keep the time of day unless the day itself changed
+        new_date = None if date_str == self.entry.date[:10] else date_str
+        self.app_instance.db_worker.call(self.app_instance.store.update_entry, self.entry.id, content, new_date,
+                                         on_success=self._on_saved, on_error=self._on_error)
+
+    def _on_saved(self, entry):
+        if self.on_saved:
+            self.on_saved(entry)
+        self.destroy()
+
+    def _on_error(self, e):
+        self.save_button.configure(state="normal")
+        messagebox.showerror("Database Error", f"Failed to save entry: {e}", parent=self)
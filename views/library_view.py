@@ -1,26 +1,245 @@
 import customtkinter as ctk
+from database import SearchResult
 from .base_view import BaseView
+from .year_heatmap import YearHeatmap
+from .tag_sidebar import TagSidebar
+from instrumentation import timed
+
+SEARCH_DEBOUNCE_MS = 250
+SEARCH_PAGE_SIZE = 20
+TAG_LIMIT = 60
+SNIPPET_CHARS = 300
+
+def _excerpt(content):
+    content = " ".join(content.split())
+    return content if len(content) <= SNIPPET_CHARS else content[:SNIPPET_CHARS].rstrip() + "…"
+
 
 class LibraryView(BaseView):
-    """Library view for the application"""
-    
+    """Library view for the application: a year heatmap, full-text search and a tag filter over the journal"""
+
     def _create_widgets(self):
         """Create all widgets for the library view"""
+        self._search_after_id = None
+        self._search_query = ""
+        self._search_page = 0
+        self._search_seq = 0
+        self._stats_seq = 0
+        self._selected_tags = ()
+        self._tags_seq = 0
+        self.grid_columnconfigure(1, weight=0)
+
         # Header
         header_frame = ctk.CTkFrame(self, fg_color="transparent")
-        header_frame.grid(row=0, column=0, sticky="ew", padx=30, pady=(30,20))
-        
-        title = ctk.CTkLabel(header_frame, text="Library", 
+        header_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=30, pady=(30,20))
+        header_frame.grid_columnconfigure(1, weight=1)
+
+        title = ctk.CTkLabel(header_frame, text="Library",
                            font=("Inter", 22, "bold"), text_color="#1F2937")
-        title.pack(side="left", anchor="w")
+        title.grid(row=0, column=0, sticky="w", padx=(0,20))
+
+        self.search_entry = ctk.CTkEntry(header_frame, placeholder_text="Search your journal...",
+                                         font=("Inter", 13), height=36,
+                                         border_width=1, border_color="#E5E7EB", corner_radius=8)
+        self.search_entry.grid(row=0, column=1, sticky="ew")
+        self.search_entry.bind("<KeyRelease>", self._on_search_key)
+        self.search_entry.bind("<Return>", lambda event: self._run_search())
+
+        self.heatmap = YearHeatmap(header_frame, on_year_change=lambda year: self._load_stats(),
+                                   on_day_click=self._show_day)
+        self.heatmap.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(15,0))
+
+        # Results
+        self.results_frame = ctk.CTkScrollableFrame(self, fg_color="transparent",
+                                                    border_width=0, corner_radius=0)
+        self.results_frame.grid(row=1, column=0, padx=(30,15), pady=(0,10), sticky="nsew")
+        self.results_frame.grid_columnconfigure(0, weight=1)
+
+        self.tag_sidebar = TagSidebar(self, on_change=self._on_tags_change)
+        self.tag_sidebar.grid(row=1, column=1, rowspan=2, padx=(0,30), pady=(0,30), sticky="ns")
+
+        # Pager
+        pager_frame = ctk.CTkFrame(self, fg_color="transparent")
+        pager_frame.grid(row=2, column=0, sticky="ew", padx=(30,15), pady=(0,30))
+        pager_frame.grid_columnconfigure(1, weight=1)
+
+        self.prev_button = ctk.CTkButton(pager_frame, text="‹ Previous", width=100,
+                                         command=lambda: self._change_page(-1), font=("Inter", 13),
+                                         fg_color="#3B82F6", hover_color="#2563EB")
+        self.prev_button.grid(row=0, column=0, sticky="w")
+        self.status_label = ctk.CTkLabel(pager_frame, text="", font=("Inter", 13), text_color="#6B7280")
+        self.status_label.grid(row=0, column=1)
+        self.next_button = ctk.CTkButton(pager_frame, text="Next ›", width=100,
+                                         command=lambda: self._change_page(1), font=("Inter", 13),
+                                         fg_color="#3B82F6", hover_color="#2563EB")
+        self.next_button.grid(row=0, column=2, sticky="e")
+
+        self._show_message("Type to search your journal entries.")
+        self._update_pager(has_next=False)
+
+    def _on_search_key(self, event=None):
+        """Restart the debounce timer on every keystroke"""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DEBOUNCE_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_after_id = None
+        query = self.search_entry.get().strip()
+        if query != self._search_query:
+            self._search_query = query
+            self._search_page = 0
+            if query and self._selected_tags:
+                self._clear_tags()
+            self._load_results()
+
+    def _on_tags_change(self, selected):
+        """Filter by the selected tags in place of the search"""
+        self._selected_tags = selected
+        self._search_query = ""
+        self.search_entry.delete(0, "end")
+        self._search_page = 0
+        self._load_tags()
+        self._load_results()
+
+    def _clear_tags(self):
+        self._selected_tags = ()
+        self.tag_sidebar.clear()
+        self._load_tags()
+
+    def _load_tags(self):
+        """Fetch the tag counts, within the current selection if there is one"""
+        self._tags_seq += 1
+        tags_seq = self._tags_seq
+        selected = self._selected_tags
+
+        def on_success(tag_counts):
+            if tags_seq == self._tags_seq:
+                self.tag_sidebar.show(tag_counts, selected)
+
+        self.app_instance.db_worker.call(self.store.get_tag_counts, selected, TAG_LIMIT, on_success=on_success)
+
+    def _load_stats(self):
+        """Fetch the heatmap year's per-day aggregates and the streaks (O(days), not O(entries))"""
+        self._stats_seq += 1
+        stats_seq = self._stats_seq
+        year = self.heatmap.year
 
-        # Content
-        content_label = ctk.CTkLabel(self, 
-                                     text="Library View - Modular Content Under Construction",
-                                     font=("Inter", 13), 
-                                     text_color="#6B7280")
-        content_label.grid(row=1, column=0, padx=30, pady=20, sticky="nsew")
+        def fetch():
+            return (self.store.get_daily_stats(f"{year}-01-01", f"{year}-12-31"),
+                    self.store.get_streaks())
+
+        def on_success(result):
+            if stats_seq == self._stats_seq and year == self.heatmap.year:
+                self.heatmap.show(*result)
+
+        self.app_instance.db_worker.call(fetch, on_success=on_success)
+
+    def _show_day(self, day):
+        """Show every entry of a day clicked on the heatmap in place of search results"""
+        self._search_seq += 1  # Drop any search still in flight
+        search_seq = self._search_seq
+        self._search_query = ""
+        self.search_entry.delete(0, "end")
+        if self._selected_tags:
+            self._clear_tags()
+
+        def on_success(result):
+            if search_seq == self._search_seq:
+                _ids, entries = result
+                self._show_results([SearchResult(entry.id, entry.date, _excerpt(entry.content), 0.0)
+                                    for entry in entries])
+                self._update_pager(has_next=False)
+                self.status_label.configure(text=f"Entries on {day}")
+
+        self.app_instance.db_worker.call(self.store.get_day_changes, day, on_success=on_success)
+
+    def _change_page(self, step):
+        self._search_page = max(self._search_page + step, 0)
+        self._load_results()
+
+    def _load_results(self):
+        """Query one page of results (plus one row to know whether a next page exists)"""
+        if not self._search_query and not self._selected_tags:
+            self._show_message("Type to search your journal entries.")
+            self._update_pager(has_next=False)
+            return
+
+        # Only the latest request may update the view; older answers are dropped
+        self._search_seq += 1
+        search_seq = self._search_seq
+        self.status_label.configure(text="Searching...")
+
+        def on_success(results):
+            if search_seq == self._search_seq:
+                self._on_results(results)
+
+        def on_error(e):
+            if search_seq == self._search_seq:
+                self._show_message(f"Search failed: {e}", text_color="red")
+                self._update_pager(has_next=False)
+
+        if self._selected_tags:
+            tags, offset = self._selected_tags, self._search_page * SEARCH_PAGE_SIZE
+
+            def fetch():
+                entries = self.store.get_entries_with_tags(tags, limit=SEARCH_PAGE_SIZE + 1, offset=offset)
+                return [SearchResult(entry.id, entry.date, _excerpt(entry.content), 0.0) for entry in entries]
+
+            self.app_instance.db_worker.call(fetch, on_success=on_success, on_error=on_error)
+            return
+        self.app_instance.db_worker.call(self.store.search_entries, self._search_query,
+                                         limit=SEARCH_PAGE_SIZE + 1,
+                                         offset=self._search_page * SEARCH_PAGE_SIZE,
+                                         on_success=on_success, on_error=on_error)
+
+    def _on_results(self, results):
+        has_next = len(results) > SEARCH_PAGE_SIZE
+        results = results[:SEARCH_PAGE_SIZE]
+        if not results:
+            self._show_message("No matching entries." if self._search_page == 0 else "No more results.")
+        else:
+            self._show_results(results)
+        self._update_pager(has_next=has_next)
+
+    def _clear_results(self):
+        self.app_instance.render_scheduler.cancel("library")
+        for widget in self.results_frame.winfo_children():
+            widget.destroy()
+
+    def _show_message(self, text, text_color="#6B7280"):
+        self._clear_results()
+        ctk.CTkLabel(self.results_frame, text=text, font=("Inter", 13),
+                     text_color=text_color).pack(padx=10, pady=20)
+
+    @timed("view.library.render")
+    def _show_results(self, results):
+        """Build the result cards: the first screenful now, the rest in time slices"""
+        self._clear_results()
+        wraplength = max(self.results_frame.winfo_width() - 60, 300)
+
+        def build(result):
+            card = ctk.CTkFrame(self.results_frame, fg_color="#FFFFFF",
+                                border_width=1, border_color="#E0E0E0", corner_radius=10)
+            card.pack(fill="x", padx=0, pady=(0,10))
+            ctk.CTkLabel(card, text=result.date, font=("Inter", 12, "bold"),
+                         text_color="#4B5563", anchor="w").pack(fill="x", padx=15, pady=(10,5))
+            ctk.CTkLabel(card, text=result.snippet, font=("Inter", 13), text_color="#1F2937",
+                         wraplength=wraplength, justify="left", anchor="w").pack(fill="x", padx=15, pady=(0,10))
+
+        self.app_instance.render_scheduler.submit("library", results, build)
+        self.results_frame._parent_canvas.yview_moveto(0)
+
+    def _update_pager(self, has_next):
+        self.prev_button.configure(state="normal" if self._search_page > 0 else "disabled")
+        self.next_button.configure(state="normal" if has_next else "disabled")
+        self.status_label.configure(
+            text=f"Page {self._search_page + 1}" if self._search_query or self._selected_tags else "")
 
     def refresh(self):
-        """Refresh the library view (if needed in the future)"""
-        pass 
\ No newline at end of file
+        """Reload the heatmap, the tags and the current results if the journal changed since they last ran"""
+        self.app_instance.refresh_if_stale("library_stats", self._load_stats)
+        self.app_instance.refresh_if_stale("library_tags", self._load_tags)
+        if self._search_query or self._selected_tags:
+            self.app_instance.refresh_if_stale("library", self._load_results)
+
@@ -0,0 +1,133 @@
+import time
+from typing import Callable, Dict, Iterable, Optional
+from instrumentation import get_logger, recorder
+
+FRAME_BUDGET_MS = 8.0
+FIRST_SCREEN_ITEMS = 8
+
+log = get_logger("ui.render")
+
+
+class RenderJob:
+    """Builds widgets for a sequence of items, a time slice at a time.
+
+    Each slice runs build(item) until the frame budget is spent, then yields
+    to Tk with after_idle so input and redraws are handled before the next
+    slice. Idle callbacks queued while idle callbacks run wait for the next
+    idle pass, after the redraws the slice itself caused.
+    """
+
+    def __init__(self, widget, name: str, items: Iterable, build: Callable,
+                 budget_ms: float = FRAME_BUDGET_MS, on_done: Optional[Callable[[], None]] = None,
+                 on_cancel: Optional[Callable[[], None]] = None):
+        self.widget = widget
+        self.name = name
+        self.budget_ms = budget_ms
+        self.on_done = on_done
+        self.on_cancel = on_cancel
+        self.built = 0
+        self._items = iter(items)
+        self._build = build
+        self._after_id = None
+        self._active = True
+        self._started = time.time()
+        self._start = time.perf_counter()
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def start(self, first_count: int = FIRST_SCREEN_ITEMS):
+        """Build the first first_count items now (the first screenful), the rest in slices."""
+        if self._run(count=first_count):
+            self._after_id = self.widget.after_idle(self._slice)
+        return self
+
+    def finish(self):
+        """Build everything that is left synchronously."""
+        if self._active:
+            self._cancel_pending()
+            self._run()
+
+    def cancel(self):
+        """Stop without building the remaining items."""
+        if self._active:
+            self._cancel_pending()
+            self._active = False
+            log.debug("%s cancelled after %d items", self.name, self.built)
+            if self.on_cancel:
+                self.on_cancel()
+
+    def _cancel_pending(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _slice(self):
+        self._after_id = None
+        if not self._active:
+            return
+        started = time.time()
+        slice_start = time.perf_counter()
+        more = self._run(deadline=slice_start + self.budget_ms / 1000)
+        recorder.record(f"{self.name}.slice", started, (time.perf_counter() - slice_start) * 1000)
+        if more:
+            self._after_id = self.widget.after_idle(self._slice)
+
+    def _run(self, count: Optional[int] = None, deadline: Optional[float] = None) -> bool:
+        """Build items until count is reached or the deadline passes; False once all are built."""
+        if count == 0:
+            return True
+        built = 0
+        for item in self._items:
+            self._build(item)
+            self.built += 1
+            built += 1
+            if (count is not None and built >= count) or (deadline is not None and time.perf_counter() >= deadline):
+                return True
+        self._active = False
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        recorder.record(self.name, self._started, duration_ms)
+        log.debug("%s built %d items in %.1f ms", self.name, self.built, duration_ms)
+        if self.on_done:
+            self.on_done()
+        return False
+
+
+class RenderScheduler:
+    """Runs at most one RenderJob per key (usually a view name) on a Tk widget.
+
+    Submitting a new job for a key cancels the previous one, and a view that
+    is navigated away from cancels its job through cancel(key).
+    """
+
+    def __init__(self, widget, budget_ms: float = FRAME_BUDGET_MS):
+        self.widget = widget
+        self.budget_ms = budget_ms
+        self._jobs: Dict[str, RenderJob] = {}
+
+    def submit(self, key: str, items: Iterable, build: Callable, first_count: int = FIRST_SCREEN_ITEMS,
+               on_done: Optional[Callable[[], None]] = None,
+               on_cancel: Optional[Callable[[], None]] = None) -> RenderJob:
+        """Start rendering items with build(item); see RenderJob."""
+        self.cancel(key)
+        job = RenderJob(self.widget, f"render.{key}", items, build, self.budget_ms, on_done, on_cancel)
+        self._jobs[key] = job
+        return job.start(first_count)
+
+    def job(self, key: str) -> Optional[RenderJob]:
+        """The key's job if it is still running."""
+        job = self._jobs.get(key)
+        return job if job is not None and job.active else None
+
+    def finish(self, key: str):
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job.finish()
+
+    def cancel(self, key: Optional[str] = None):
+        """Cancel the key's job, or every job when key is None."""
+        for job_key in ([key] if key is not None else list(self._jobs)):
+            job = self._jobs.pop(job_key, None)
+            if job is not None:
+                job.cancel()
@@ -1,9 +1,26 @@
 import tkinter as tk
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-import json
+import os
+import threading
+import backup
+import journal_io
+from instrumentation import get_logger
 from .base_view import BaseView
 
+log = get_logger("ui.settings")
+
+DATA_FILE_TYPES = [
+    ("JSON files", "*.json"),
+    ("NDJSON files", "*.ndjson *.jsonl"),
+    ("Gzipped files", "*.json.gz *.ndjson.gz *.jsonl.gz"),
+    ("All files", "*.*"),
+]
+BACKUP_FILE_TYPES = [
+    ("Journal backups", "*.db"),
+    ("All files", "*.*"),
+]
+
 class SettingsView(BaseView):
     """Settings view for the application"""
     
@@ -33,6 +50,9 @@ class SettingsView(BaseView):
         
         # --- Data Management ---
         self._create_data_management_section(settings_scroll)
+
+        # --- Backups ---
+        self._create_backup_section(settings_scroll)
         
         # --- About Section ---
         self._create_about_section(settings_scroll)
@@ -129,6 +149,84 @@ class SettingsView(BaseView):
         )
         import_button.pack(side="left")
 
+        # Progress for long-running data jobs (hidden until one starts)
+        self.data_progress_frame = ctk.CTkFrame(data_frame, fg_color="transparent")
+        self.data_progress_bar = ctk.CTkProgressBar(self.data_progress_frame, progress_color="#3B82F6")
+        self.data_progress_bar.pack(fill="x", pady=(10,5))
+        self.data_progress_label = ctk.CTkLabel(self.data_progress_frame, text="",
+                                                font=("Inter", 13), text_color="#6B7280")
+        self.data_progress_label.pack(side="left")
+        self.data_cancel_button = ctk.CTkButton(self.data_progress_frame, text="Cancel",
+                                                command=self._cancel_data_job, font=("Inter", 13),
+                                                fg_color="transparent", text_color="#6B7280",
+                                                border_width=1, border_color="#E5E7EB", hover_color="#F0F2F5",
+                                                width=80)
+        self.data_cancel_button.pack(side="right")
+        self._data_job_cancel = None
+        self.data_buttons = [export_button, import_button]
+
+    def _create_backup_section(self, parent):
+        backup_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        backup_frame.pack(fill="x", pady=20)
+
+        ctk.CTkLabel(backup_frame, text="Backups",
+                    font=("Inter", 18, "bold"), text_color="#1F2937").pack(anchor="w", pady=(0,10))
+
+        self.backup_status_label = ctk.CTkLabel(backup_frame, text="", font=("Inter", 13),
+                                                text_color="#6B7280", justify="left")
+        self.backup_status_label.pack(anchor="w", pady=(0,10))
+
+        backup_buttons_frame = ctk.CTkFrame(backup_frame, fg_color="transparent")
+        backup_buttons_frame.pack(fill="x")
+
+        backup_button = ctk.CTkButton(
+            backup_buttons_frame,
+            text="Back Up Now",
+            command=self._backup_now,
+            font=("Inter", 13),
+            fg_color="#3B82F6",
+            hover_color="#2563EB"
+        )
+        backup_button.pack(side="left", padx=(0,10))
+
+        snapshot_button = ctk.CTkButton(
+            backup_buttons_frame,
+            text="Compact Snapshot",
+            command=self._compact_snapshot,
+            font=("Inter", 13),
+            fg_color="#3B82F6",
+            hover_color="#2563EB"
+        )
+        snapshot_button.pack(side="left", padx=(0,10))
+
+        restore_button = ctk.CTkButton(
+            backup_buttons_frame,
+            text="Restore Backup...",
+            command=self._restore_backup,
+            font=("Inter", 13),
+            fg_color="transparent",
+            text_color="#4B5563",
+            border_width=1,
+            border_color="#E5E7EB",
+            hover_color="#F3F4F6"
+        )
+        restore_button.pack(side="left")
+
+        # Backups only make sense for a journal that lives in a file
+        self.backup_manager = None
+        db_path = getattr(self.store, "path", None)
+        if db_path:
+            try:
+                self.backup_manager = backup.BackupManager.from_config(db_path)
+            except ValueError as e:
+                log.warning("Backups disabled: %s", e)
+        if self.backup_manager is None:
+            for button in (backup_button, snapshot_button, restore_button):
+                button.configure(state="disabled")
+        else:
+            self.data_buttons.extend([backup_button, snapshot_button, restore_button])
+        self._update_backup_status()
+
     def _create_about_section(self, parent):
         about_frame = ctk.CTkFrame(parent, fg_color="transparent")
         about_frame.pack(fill="x", pady=20)
@@ -153,43 +251,200 @@ class SettingsView(BaseView):
     def _toggle_notifications(self):
         """Toggle notification settings"""
         enabled = self.notifications_enabled_var.get()
-        print(f"Notifications {'enabled' if enabled else 'disabled'}")
+        log.info("Notifications %s", "enabled" if enabled else "disabled")
         
     def _export_journal_data(self):
-        """Export journal data to a JSON file"""
+        """Export journal data to a JSON or NDJSON file, optionally gzipped"""
         try:
             filename = filedialog.asksaveasfilename(
                 defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                filetypes=DATA_FILE_TYPES,
                 title="Export Journal Data"
             )
             if filename:
-                entries = self.database.get_entries()
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(entries, f, indent=4)
-                messagebox.showinfo("Success", "Journal data exported successfully!")
+                # Count on the database worker, then stream the export on its own thread
+                self.app_instance.db_worker.call(
+                    self.store.count_entries,
+                    on_success=lambda total: self._run_data_job(
+                        lambda report, cancel: journal_io.export_entries(filename, progress=report, cancel=cancel,
+                                                                         store=self.store),
+                        total=total,
+                        label="Exported",
+                        on_success=lambda count: messagebox.showinfo(
+                            "Success", f"Exported {count} entries successfully!"),
+                        error_title="Export Error"
+                    ),
+                    on_error=lambda e: messagebox.showerror("Export Error", f"Failed to export data: {e}")
+                )
         except Exception as e:
             messagebox.showerror("Export Error", f"Failed to export data: {e}")
             
     def _import_journal_data(self):
-        """Import journal data from a JSON file"""
+        """Import journal data from a JSON or NDJSON file"""
         try:
             filename = filedialog.askopenfilename(
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                filetypes=DATA_FILE_TYPES,
                 title="Import Journal Data"
             )
             if filename:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    entries = json.load(f)
-                
                 if messagebox.askyesno("Confirm Import", 
                                      "This will add the imported entries to your journal. Continue?"):
-                    for entry in entries:
-                        self.database.add_entry(entry['content'], entry['date'])
-                    messagebox.showinfo("Success", "Journal data imported successfully!")
+                    self._run_data_job(
+                        lambda report, cancel: journal_io.import_entries(filename, progress=report, cancel=cancel,
+                                                                         store=self.store),
+                        total=None,
+                        label="Imported",
+                        on_success=lambda count: messagebox.showinfo(
+                            "Success", f"Imported {count} entries successfully!"),
+                        error_title="Import Error"
+                    )
         except Exception as e:
             messagebox.showerror("Import Error", f"Failed to import data: {e}")
 
+    def _update_backup_status(self):
+        """Show where backups go and when the last one was taken"""
+        if self.backup_manager is None:
+            self.backup_status_label.configure(text="Backups are not available for this journal.")
+            return
+        latest = self.backup_manager.latest()
+        if latest is None:
+            text = "No backups yet."
+        else:
+            text = (f"Last backup: {latest.created:%Y-%m-%d %H:%M} "
+                    f"({latest.size_bytes / (1024 * 1024):.1f} MB)")
+        self.backup_status_label.configure(text=f"{text}\nBackups are kept in {self.backup_manager.directory}")
+
+    def _backup_finished(self, message):
+        self._update_backup_status()
+        messagebox.showinfo("Backup Complete", message)
+
+    def _backup_now(self):
+        """Copy the journal into a new backup, page by page on a worker thread"""
+        self._run_data_job(
+            lambda report, cancel: self.backup_manager.backup(progress=report, cancel=cancel),
+            total=None,
+            label="Backed up",
+            unit="pages",
+            on_success=lambda info: self._backup_finished(
+                f"Saved a backup to {info.path}"),
+            error_title="Backup Error"
+        )
+
+    def _compact_snapshot(self):
+        """Write a defragmented copy of the journal with VACUUM INTO"""
+        self._run_data_job(
+            lambda report, cancel: self.backup_manager.snapshot(cancel=cancel),
+            total=None,
+            label="Writing snapshot",
+            unit=None,
+            on_success=lambda info: self._backup_finished(
+                f"Saved a compact snapshot ({info.size_bytes / (1024 * 1024):.1f} MB) to {info.path}"),
+            error_title="Snapshot Error"
+        )
+
+    def _restore_backup(self):
+        """Replace the journal with a verified backup"""
+        filename = filedialog.askopenfilename(
+            filetypes=BACKUP_FILE_TYPES,
+            initialdir=self.backup_manager.directory if os.path.isdir(self.backup_manager.directory) else None,
+            title="Restore Journal Backup"
+        )
+        if not filename:
+            return
+        if not messagebox.askyesno("Confirm Restore",
+                                   f"This replaces every entry in your journal with the contents of "
+                                   f"{os.path.basename(filename)}. The current journal is saved as a "
+                                   f"backup first. Continue?"):
+            return
+        self._run_data_job(
+            lambda report, cancel: self.backup_manager.restore(filename, progress=report, cancel=cancel),
+            total=None,
+            label="Restoring",
+            unit="pages",
+            on_success=self._on_restored,
+            error_title="Restore Error"
+        )
+
+    def _on_restored(self, saved):
+        self.app_instance.reload_journal()
+        self._backup_finished(f"The journal was restored. Your previous journal was saved to {saved.path}")
+
+    def _run_data_job(self, job, total, label, on_success, error_title, unit="entries"):
+        """Run job(report, cancel) on a worker thread and show its progress.
+
+        job receives a report(count) callback and a threading.Event that is set
+        when the user cancels, and returns its result. Progress is polled from
+        the Tk loop, so the window keeps responding while it runs. total may be
+        None when the number of items isn't known up front; a job that learns
+        it later passes it as report(count, total). unit names the items
+        counted, or is None for a job that reports no progress.
+        """
+        state = {'count': 0, 'total': total, 'result': None, 'error': None, 'done': False}
+        cancel = threading.Event()
+        self._data_job_cancel = cancel
+
+        def report(count, new_total=None):
+            state['count'] = count
+            if new_total:
+                state['total'] = new_total
+
+        def worker():
+            try:
+                state['result'] = job(report, cancel)
+            except Exception as e:
+                state['error'] = e
+            finally:
+                # The worker thread opened its own connection; don't leak it
+                self.store.close_connection()
+                state['done'] = True
+
+        def poll():
+            if unit is None:
+                self.data_progress_label.configure(text=f"{label}...")
+            elif state['total']:
+                if self.data_progress_bar.cget("mode") != "determinate":
+                    self.data_progress_bar.stop()
+                    self.data_progress_bar.configure(mode="determinate")
+                self.data_progress_bar.set(min(state['count'] / state['total'], 1.0))
+                self.data_progress_label.configure(
+                    text=f"{label} {state['count']} of {state['total']} {unit}...")
+            else:
+                self.data_progress_label.configure(text=f"{label} {state['count']} {unit}...")
+            if not state['done']:
+                self.after(100, poll)
+                return
+            if self.data_progress_bar.cget("mode") != "determinate":
+                self.data_progress_bar.stop()
+            self.data_progress_frame.pack_forget()
+            self._data_job_cancel = None
+            for button in self.data_buttons:
+                button.configure(state="normal")
+            if isinstance(state['error'], journal_io.JobCancelled):
+                messagebox.showinfo("Cancelled", "The operation was cancelled. No changes were made.")
+            elif state['error'] is not None:
+                messagebox.showerror(error_title, f"Failed: {state['error']}")
+            else:
+                on_success(state['result'])
+
+        for button in self.data_buttons:
+            button.configure(state="disabled")
+        if total:
+            self.data_progress_bar.configure(mode="determinate")
+            self.data_progress_bar.set(0)
+        else:
+            self.data_progress_bar.configure(mode="indeterminate")
+            self.data_progress_bar.start()
+        self.data_cancel_button.configure(state="normal")
+        self.data_progress_frame.pack(fill="x")
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+
+    def _cancel_data_job(self):
+        """Ask the running data job to stop at its next checkpoint"""
+        if self._data_job_cancel is not None:
+            self._data_job_cancel.set()
+            self.data_cancel_button.configure(state="disabled")
+
     def refresh(self):
         """Update the view's state"""
         self.theme_var.set(ctk.get_appearance_mode())
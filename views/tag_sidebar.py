@@ -0,0 +1,89 @@
+import customtkinter as ctk
+
+SELECTED_COLOR = "#3B82F6"
+SELECTED_HOVER = "#2563EB"
+
+
+class TagSidebar(ctk.CTkFrame):
+    """List of tags with entry counts that toggle a multi-tag filter.
+
+    show(tag_counts, selected) lists TagCounts (the counts within the current
+    selection, so each tag shows how many entries would remain); clicking a
+    tag adds it to or removes it from the selection and calls
+    on_change(selected) with the new tuple of tag names. The tag buttons are
+    pooled and reconfigured, so a refresh does not rebuild any widgets.
+    """
+
+    def __init__(self, master, on_change=None, **kwargs):
+        kwargs.setdefault("fg_color", "#FFFFFF")
+        kwargs.setdefault("border_width", 1)
+        kwargs.setdefault("border_color", "#E0E0E0")
+        kwargs.setdefault("corner_radius", 10)
+        kwargs.setdefault("width", 200)
+        super().__init__(master, **kwargs)
+        self.on_change = on_change
+        self.selected = ()
+        self._buttons = []
+        self._names = []  # tag shown on each visible button
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=10, pady=(10, 5))
+        ctk.CTkLabel(header, text="Tags", font=("Inter", 13, "bold"), text_color="#1F2937").pack(side="left")
+        self.clear_button = ctk.CTkButton(header, text="Clear", width=50, height=24, font=("Inter", 12),
+                                          fg_color="transparent", text_color="#4B5563", hover_color="#F3F4F6",
+                                          command=lambda: self._set_selected(()))
+        self.clear_button.pack(side="right")
+
+        self.list_frame = ctk.CTkScrollableFrame(self, fg_color="transparent", width=180,
+                                                 border_width=0, corner_radius=0)
+        self.list_frame.pack(fill="both", expand=True, padx=5, pady=(0, 10))
+        self.message_label = ctk.CTkLabel(self.list_frame, text="Add #tags to entries to filter by them.",
+                                          font=("Inter", 12), text_color="#6B7280", wraplength=160,
+                                          justify="left")
+
+    def show(self, tag_counts, selected=None):
+        """List tag_counts (selected tags first) and mark the selection."""
+        if selected is not None:
+            self.selected = tuple(selected)
+        counts = {tag.name: tag.entry_count for tag in tag_counts}
+        # Selected tags stay listed even when they fell out of the counts
+        names = list(self.selected) + [tag.name for tag in tag_counts if tag.name not in self.selected]
+        while len(self._buttons) < len(names):
+            index = len(self._buttons)
+            button = ctk.CTkButton(self.list_frame, height=26, anchor="w", font=("Inter", 12),
+                                   corner_radius=6, command=lambda index=index: self._toggle(index))
+            self._buttons.append(button)
+        for index, button in enumerate(self._buttons):
+            if index < len(names):
+                name = names[index]
+                chosen = name in self.selected
+                button.configure(text=f"#{name}  {counts.get(name, 0):,}",
+                                 fg_color=SELECTED_COLOR if chosen else "transparent",
+                                 hover_color=SELECTED_HOVER if chosen else "#F3F4F6",
+                                 text_color="#FFFFFF" if chosen else "#374151")
+                button.pack(fill="x", pady=1)
+            else:
+                button.pack_forget()
+        self._names = names
+        if names:
+            self.message_label.pack_forget()
+        else:
+            self.message_label.pack(fill="x", padx=5, pady=10)
+        self.clear_button.configure(state="normal" if self.selected else "disabled")
+
+    def clear(self):
+        """Drop the selection without calling on_change."""
+        self.selected = ()
+        self.clear_button.configure(state="disabled")
+
+    def _toggle(self, index):
+        name = self._names[index]
+        if name in self.selected:
+            self._set_selected(tuple(tag for tag in self.selected if tag != name))
+        else:
+            self._set_selected(self.selected + (name,))
+
+    def _set_selected(self, selected):
+        self.selected = selected
+        if self.on_change:
+            self.on_change(selected)
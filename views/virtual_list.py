@@ -0,0 +1,216 @@
+import math
+import tkinter as tk
+import customtkinter as ctk
+from instrumentation import timed
+
+
+class VirtualEntryList(ctk.CTkFrame):
+    """Scrollable list that only keeps enough card widgets to fill the viewport.
+
+    Rows are requested on demand in fixed-size blocks through
+    ``fetch_rows(offset, limit, callback)`` and the total through
+    ``count_rows(callback)``. Both may answer immediately or later (e.g. from a
+    database worker); a callback receiving None means the request failed.
+    Cards are created by ``create_card(parent)`` and filled with
+    ``fill_card(card, row, wraplength)`` whenever they are recycled for a
+    different row; ``row`` is None while its block is still loading.
+    """
+
+    def __init__(self, master, fetch_rows, count_rows, create_card, fill_card,
+                 empty_text="No entries yet.", row_height=120, block_size=100, max_blocks=8,
+                 font=None, empty_text_color=None, **kwargs):
+        super().__init__(master, **kwargs)
+
+        self.fetch_rows = fetch_rows
+        self.count_rows = count_rows
+        self.create_card = create_card
+        self.fill_card = fill_card
+        self.row_height = row_height
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+
+        self._total = 0
+        self._top_px = 0.0
+        self._blocks = {}  # block number -> list of rows, in insertion (LRU) order
+        self._pending_blocks = set()
+        self._generation = 0  # Bumped on reload so late answers for old data are dropped
+        self._pool = []
+        self._wraplength = 500
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self._viewport.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self._on_scrollbar)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self._empty_text = empty_text
+        self._empty_label = ctk.CTkLabel(self._viewport, text=empty_text, font=font,
+                                         text_color=empty_text_color)
+
+        self._viewport.bind("<Configure>", self._on_viewport_configure)
+        self._bind_mousewheel(self._viewport)
+
+    # --- Public API ---
+
+    def reload(self):
+        """Re-count the rows and drop cached blocks, keeping the current scroll position."""
+        self._generation += 1
+        generation = self._generation
+        if self._total == 0:
+            self._show_message("Loading entries...")
+        self.count_rows(lambda total: self._on_count(generation, total))
+
+    def scroll_to_top(self):
+        self._top_px = 0.0
+        self._render()
+
+    # --- Data ---
+
+    def _on_count(self, generation, total):
+        if generation != self._generation:
+            return
+        if total is None:
+            self._show_message("Could not load entries.")
+            return
+        self._blocks.clear()
+        self._pending_blocks.clear()
+        self._total = total
+        self._top_px = min(self._top_px, self._max_top_px())
+        for card in self._pool:
+            card._row_index = None
+            card._is_placeholder = False
+        self._render()
+
+    def _on_block(self, generation, block_no, rows):
+        if generation != self._generation:
+            return
+        self._pending_blocks.discard(block_no)
+        if rows is None:
+            return
+        if len(self._blocks) >= self.max_blocks:
+            # Evict the least recently used block
+            del self._blocks[next(iter(self._blocks))]
+        self._blocks[block_no] = rows
+        self._render()
+
+    def _get_row(self, index):
+        """Return the row at index, or None (and request its block) if it isn't loaded yet."""
+        block_no, position = divmod(index, self.block_size)
+        block = self._blocks.pop(block_no, None)
+        if block is None:
+            if block_no not in self._pending_blocks:
+                self._pending_blocks.add(block_no)
+                generation = self._generation
+                self.fetch_rows(block_no * self.block_size, self.block_size,
+                                lambda rows: self._on_block(generation, block_no, rows))
+            return None
+        self._blocks[block_no] = block
+        return block[position] if position < len(block) else None
+
+    # --- Geometry ---
+
+    def _viewport_height(self):
+        return max(self._viewport.winfo_height(), 1)
+
+    def _max_top_px(self):
+        return max(self._total * self.row_height - self._viewport_height(), 0)
+
+    def _ensure_pool(self):
+        needed = math.ceil(self._viewport_height() / self.row_height) + 1
+        while len(self._pool) < needed:
+            card = self.create_card(self._viewport)
+            card._row_index = None
+            card._is_placeholder = False
+            self._bind_mousewheel(card)
+            self._pool.append(card)
+
+    def _show_message(self, text):
+        for card in self._pool:
+            card.place_forget()
+        self._empty_label.configure(text=text)
+        self._empty_label.place(relx=0.5, y=20, anchor="n")
+        self._scrollbar.set(0.0, 1.0)
+
+    @timed("view.entries.render")
+    def _render(self):
+        if self._total == 0:
+            self._show_message(self._empty_text)
+            return
+        self._empty_label.place_forget()
+
+        self._ensure_pool()
+        first_index = int(self._top_px // self.row_height)
+        shift = self._top_px - first_index * self.row_height
+
+        for slot, card in enumerate(self._pool):
+            index = first_index + slot
+            if index >= self._total:
+                card.place_forget()
+                card._row_index = None
+                continue
+            row = self._get_row(index)
+            if row is None:
+                # Still loading: show a placeholder and refill once the block arrives
+                if not card._is_placeholder:
+                    self.fill_card(card, None, self._wraplength)
+                card._row_index = None
+                card._is_placeholder = True
+            elif card._row_index != index:
+                self.fill_card(card, row, self._wraplength)
+                card._row_index = index
+                card._is_placeholder = False
+            card.place(x=0, y=slot * self.row_height - shift, relwidth=1.0,
+                       height=self.row_height - 10)
+
+        content_height = self._total * self.row_height
+        first = self._top_px / content_height
+        last = min((self._top_px + self._viewport_height()) / content_height, 1.0)
+        self._scrollbar.set(first, last)
+
+    # --- Events ---
+
+    def _on_viewport_configure(self, event):
+        wraplength = max(event.width - 60, 100)
+        if wraplength != self._wraplength:
+            self._wraplength = wraplength
+            for card in self._pool:
+                card._row_index = None
+                card._is_placeholder = False
+        self._top_px = min(self._top_px, self._max_top_px())
+        self._render()
+
+    def _scroll_by(self, pixels):
+        top_px = min(max(self._top_px + pixels, 0.0), self._max_top_px())
+        if top_px != self._top_px:
+            self._top_px = top_px
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._top_px = min(max(float(args[0]) * self._total * self.row_height, 0.0), self._max_top_px())
+            self._render()
+        elif action == "scroll":
+            amount, what = int(args[0]), args[1]
+            step = self._viewport_height() if what == "pages" else self.row_height // 3
+            self._scroll_by(amount * step)
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            delta = -1
+        elif event.num == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self._scroll_by(delta * self.row_height // 3)
+
+    def _bind_mousewheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel, add="+")
+        widget.bind("<Button-4>", self._on_mousewheel, add="+")
+        widget.bind("<Button-5>", self._on_mousewheel, add="+")
+        for child in widget.winfo_children():
+            if isinstance(child, (tk.Canvas, tk.Label)):
+                # CTk widgets draw on an internal canvas and label; bind those too
+                continue
+            self._bind_mousewheel(child)
@@ -0,0 +1,139 @@
+import tkinter as tk
+from datetime import date, timedelta
+import customtkinter as ctk
+from instrumentation import timed
+
+CELL = 11
+GAP = 2
+LEFT_MARGIN = 28
+TOP_MARGIN = 16
+WEEKS = 54  # A leap year starting on a Sunday touches 54 Monday-based weeks
+# Empty, then four intensity levels
+LEVEL_COLORS = ("#EBEDF0", "#BFDBFE", "#93C5FD", "#3B82F6", "#1D4ED8")
+MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+class YearHeatmap(ctk.CTkFrame):
+    """Calendar heatmap of entries per day for one year, GitHub style.
+
+    The grid is one cell per day in week columns, drawn once on a canvas;
+    show() only recolours the cells, so switching years or refreshing costs a
+    few hundred item updates regardless of journal size. Data comes from the
+    per-day aggregates (a list of DayStats). on_year_change(year) is called by the
+    year buttons and on_day_click(day) when a cell with entries is clicked.
+    """
+
+    def __init__(self, master, year=None, on_year_change=None, on_day_click=None, **kwargs):
+        kwargs.setdefault("fg_color", "#FFFFFF")
+        kwargs.setdefault("border_width", 1)
+        kwargs.setdefault("border_color", "#E0E0E0")
+        kwargs.setdefault("corner_radius", 10)
+        super().__init__(master, **kwargs)
+        self.year = year or date.today().year
+        self.on_year_change = on_year_change
+        self.on_day_click = on_day_click
+        self._stats = {}  # day -> DayStats
+        self._cell_days = {}  # canvas item -> 'YYYY-MM-DD'
+        self._summary = ""
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=15, pady=(10, 0))
+        ctk.CTkButton(header, text="‹", width=28, height=24, font=("Inter", 13),
+                      fg_color="transparent", text_color="#4B5563", hover_color="#F3F4F6",
+                      command=lambda: self._step_year(-1)).pack(side="left")
+        self.year_label = ctk.CTkLabel(header, text=str(self.year), font=("Inter", 13, "bold"),
+                                       text_color="#1F2937", width=50)
+        self.year_label.pack(side="left")
+        ctk.CTkButton(header, text="›", width=28, height=24, font=("Inter", 13),
+                      fg_color="transparent", text_color="#4B5563", hover_color="#F3F4F6",
+                      command=lambda: self._step_year(1)).pack(side="left")
+        self.summary_label = ctk.CTkLabel(header, text="", font=("Inter", 12), text_color="#6B7280")
+        self.summary_label.pack(side="left", padx=(15, 0))
+
+        width = LEFT_MARGIN + WEEKS * (CELL + GAP)
+        height = TOP_MARGIN + 7 * (CELL + GAP)
+        self.canvas = tk.Canvas(self, width=width, height=height, bg="#FFFFFF",
+                                highlightthickness=0, borderwidth=0)
+        self.canvas.pack(padx=15, pady=(5, 10), anchor="w")
+        for row, name in ((1, "Mon"), (3, "Wed"), (5, "Fri")):
+            self.canvas.create_text(0, TOP_MARGIN + row * (CELL + GAP) + CELL // 2, text=name,
+                                    anchor="w", fill="#6B7280", font=("Inter", 8))
+        self._cells = [self.canvas.create_rectangle(0, 0, 0, 0, width=0, state="hidden")
+                       for _ in range(366)]
+        self.canvas.tag_bind("cell", "<Enter>", self._on_cell_enter)
+        self.canvas.tag_bind("cell", "<Leave>", lambda event: self.summary_label.configure(text=self._summary))
+        self.canvas.tag_bind("cell", "<Button-1>", self._on_cell_click)
+        self._layout_year()
+
+    def _layout_year(self):
+        """Place one cell per day of self.year; weeks run Monday to Sunday."""
+        self.canvas.delete("month")
+        self._cell_days.clear()
+        first = date(self.year, 1, 1)
+        day, index = first, 0
+        while day.year == self.year:
+            week = ((day - first).days + first.weekday()) // 7
+            x = LEFT_MARGIN + week * (CELL + GAP)
+            y = TOP_MARGIN + day.weekday() * (CELL + GAP)
+            item = self._cells[index]
+            self.canvas.coords(item, x, y, x + CELL, y + CELL)
+            self.canvas.itemconfigure(item, state="normal", fill=LEVEL_COLORS[0], tags=("cell",))
+            self._cell_days[item] = day.isoformat()
+            if day.day == 1:
+                self.canvas.create_text(x, 0, text=MONTH_NAMES[day.month - 1], anchor="nw",
+                                        fill="#6B7280", font=("Inter", 8), tags=("month",))
+            day += timedelta(days=1)
+            index += 1
+        for item in self._cells[index:]:
+            self.canvas.itemconfigure(item, state="hidden", tags=())
+        self.year_label.configure(text=str(self.year))
+
+    def _step_year(self, step):
+        self.year += step
+        self._stats = {}
+        self._layout_year()
+        self._summary = "Loading..."
+        self.summary_label.configure(text=self._summary)
+        if self.on_year_change:
+            self.on_year_change(self.year)
+
+    @timed("view.library.heatmap")
+    def show(self, day_stats, streaks=None):
+        """Colour the cells from the year's DayStats; streaks (a Streaks) adds to the summary line."""
+        self._stats = {stats.day: stats for stats in day_stats}
+        peak = max((stats.entry_count for stats in day_stats), default=0)
+        for item, day in self._cell_days.items():
+            stats = self._stats.get(day)
+            level = 0
+            if stats is not None:
+                # Scale to the busiest day of the year so sparse and busy journals both show contrast
+                level = min(1 + (stats.entry_count - 1) * 4 // max(peak, 1), 4)
+            self.canvas.itemconfigure(item, fill=LEVEL_COLORS[level])
+
+        total = sum(stats.entry_count for stats in day_stats)
+        summary = f"{total:,} entries on {len(day_stats):,} days in {self.year}"
+        if streaks is not None:
+            summary += f" · current streak {streaks.current} · longest {streaks.longest}"
+        self._summary = summary
+        self.summary_label.configure(text=summary)
+
+    def _event_day(self):
+        items = self.canvas.find_withtag("current")
+        return self._cell_days.get(items[0]) if items else None
+
+    def _on_cell_enter(self, event):
+        day = self._event_day()
+        if day is None:
+            return
+        stats = self._stats.get(day)
+        if stats is None:
+            text = f"{day}: no entries"
+        else:
+            text = (f"{day}: {stats.entry_count} {'entry' if stats.entry_count == 1 else 'entries'}, "
+                    f"{stats.total_chars:,} characters")
+        self.summary_label.configure(text=text)
+
+    def _on_cell_click(self, event):
+        day = self._event_day()
+        if day is not None and day in self._stats and self.on_day_click:
+            self.on_day_click(day)
@@ -0,0 +1,287 @@
+"""
+Coordination between processes writing the same journal.
+
+Several processes may open one database: two app windows, the app and a
+script using code_journal.py, a cron job taking backups. SQLite serializes
+their writes, but a writer that finds the database locked just sleeps in the
+busy handler, for up to the profile's busy_timeout (30 s). On the database
+worker that stalls every query queued behind the write.
+
+Every write transaction therefore goes through write_transaction():
+
+1. It takes the process's writer lease: an advisory lock on '<db>.lock'
+   (flock on POSIX, msvcrt.locking on Windows), so only one process at a
+   time even tries to write. Threads of one process queue on a mutex first.
+   The holder's pid is written to the lock file for error messages.
+2. It starts the transaction with BEGIN IMMEDIATE, so the write lock is
+   taken up front and a read-then-write cannot fail halfway. Writers that
+   do not use the lease (the sqlite3 shell, older versions of this app) can
+   still hold the database, so a busy BEGIN is retried.
+
+Both waits poll with exponential backoff plus jitter, so waiting processes
+do not retry in lockstep, and both share one deadline: the connection
+profile's write_timeout_ms (see db_config.py), or WRITE_TIMEOUT_S when
+called directly. When it passes, JournalBusy is raised: the UI reports it
+instead of hanging.
+Reads are unaffected; in WAL mode they never wait for a writer. Read-only
+processes can open the journal with mode=ro (see database.use_database).
+
+stats() counts the transactions, how many had to wait, for how long, busy
+retries and timeouts; contended waits are also recorded as db.write_wait
+spans. benchmarks/stress_writers.py runs many writer processes against one
+journal.
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from instrumentation import get_logger, recorder
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+WRITE_TIMEOUT_S = 5.0
+FIRST_BACKOFF_S = 0.002
+MAX_BACKOFF_S = 0.01
+# How long one BEGIN IMMEDIATE attempt may sit in SQLite's busy handler
+BEGIN_BUSY_MS = 20
+LOCK_SUFFIX = ".lock"
+_HOLDER_OFFSET = 1  # Windows locks byte 0; the holder's pid is written after it
+_HOLDER_SIZE = 32
+log = get_logger("write_lock")
+
+
+class JournalBusy(sqlite3.OperationalError):
+    """Another writer held the journal for longer than the write timeout."""
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _backoff(attempt: int, deadline: float) -> bool:
+    """Sleep before the next attempt; False once the deadline has passed."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return False
+    delay = min(FIRST_BACKOFF_S * (2 ** attempt), MAX_BACKOFF_S) * random.uniform(0.5, 1.5)
+    time.sleep(min(delay, remaining))
+    return True
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values = {'transactions': 0, 'contended': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0,
+                            'busy_retries': 0, 'timeouts': 0}
+
+    def add(self, **counts) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                if name == 'wait_ms_max':
+                    self._values[name] = max(self._values[name], value)
+                else:
+                    self._values[name] += value
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+_stats = _Stats()
+
+
+def stats() -> Dict[str, float]:
+    """Contention counters of this process since start (or the last reset_stats())."""
+    return _stats.snapshot()
+
+
+def reset_stats() -> None:
+    _stats.reset()
+
+
+def format_stats(values: Optional[Dict[str, float]] = None) -> str:
+    values = values or stats()
+    contended = values['contended']
+    average = values['wait_ms_total'] / contended if contended else 0.0
+    return (f"{values['transactions']} write transactions, {contended} waited "
+            f"(avg {average:.1f} ms, max {values['wait_ms_max']:.1f} ms), "
+            f"{values['busy_retries']} busy retries, {values['timeouts']} timeouts")
+
+
+class WriterLease:
+    """The advisory lock that lets one process at a time write a database file.
+
+    Reentrant within a thread. The lock file stays open for the life of the
+    process; only the lock is taken and released.
+    """
+
+    def __init__(self, db_path: str):
+        self.path = os.path.abspath(db_path) + LOCK_SUFFIX
+        self._mutex = threading.RLock()
+        self._depth = 0
+        self._fd = None
+        self._pid = None
+
+    def _open(self) -> int:
+        # A forked child shares the parent's open file, and with it the flock; it needs its own
+        if self._fd is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        return self._fd
+
+    def holder(self) -> Optional[int]:
+        """The pid that last took the lease, if recorded."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(_HOLDER_OFFSET)
+                return int(f.read(_HOLDER_SIZE).strip(b"\0 \n") or 0) or None
+        except (OSError, ValueError):
+            return None
+
+    def _busy(self, timeout: float, what: str) -> JournalBusy:
+        _stats.add(timeouts=1)
+        holder = self.holder()
+        by = f" (process {holder})" if holder and holder != os.getpid() else ""
+        return JournalBusy(f"The journal is busy: {what} for more than {timeout:.1f} s{by}. Try again shortly.")
+
+    def acquire(self, deadline: float) -> None:
+        """Take the lease, waiting until deadline (a time.monotonic() value) at most."""
+        timeout = max(deadline - time.monotonic(), 0.0)
+        if not self._mutex.acquire(timeout=timeout):
+            raise self._busy(timeout, "another thread was writing")
+        if self._depth:
+            self._depth += 1
+            return
+        try:
+            fd = self._open()
+            attempt = 0
+            while not _try_lock(fd):
+                if not _backoff(attempt, deadline):
+                    raise self._busy(timeout, "another process was writing")
+                attempt += 1
+            os.lseek(fd, _HOLDER_OFFSET, os.SEEK_SET)
+            os.write(fd, str(os.getpid()).encode().ljust(_HOLDER_SIZE))
+        except BaseException:
+            self._mutex.release()
+            raise
+        self._depth = 1
+
+    def release(self) -> None:
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                _unlock(self._fd)
+        finally:
+            self._mutex.release()
+
+    @contextmanager
+    def hold(self, timeout: float = WRITE_TIMEOUT_S) -> Iterator[None]:
+        self.acquire(time.monotonic() + timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_leases: Dict[str, WriterLease] = {}
+_leases_lock = threading.Lock()
+
+
+def lease_for(db_path: str) -> WriterLease:
+    """The process-wide lease for a database file."""
+    key = os.path.normcase(os.path.abspath(db_path))
+    with _leases_lock:
+        lease = _leases.get(key)
+        if lease is None:
+            lease = _leases[key] = WriterLease(db_path)
+        return lease
+
+
+def begin_immediate(conn: sqlite3.Connection, deadline: float) -> int:
+    """BEGIN IMMEDIATE, retried with backoff while another connection writes; returns the retries."""
+    busy_timeout = conn.execute("PRAGMA busy_timeout;").fetchone()[0]
+    conn.execute(f"PRAGMA busy_timeout = {BEGIN_BUSY_MS};")
+    attempt = 0
+    try:
+        while True:
+            try:
+                conn.execute("BEGIN IMMEDIATE;")
+                return attempt
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                if not _backoff(attempt, deadline):
+                    raise
+                attempt += 1
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)};")
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection, db_path: str,
+                      timeout: float = WRITE_TIMEOUT_S) -> Iterator[sqlite3.Connection]:
+    """Hold the writer lease and a BEGIN IMMEDIATE transaction on conn for the with-block.
+
+    Commits when the block succeeds and rolls back when it raises. Raises
+    JournalBusy if the lease or the database lock cannot be had within timeout.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    start = time.monotonic()
+    deadline = start + timeout
+    lease = lease_for(db_path)
+    lease.acquire(deadline)
+    try:
+        try:
+            retries = begin_immediate(conn, deadline)
+        except sqlite3.OperationalError as e:
+            # begin_immediate() only gives up on a lock at the deadline; other errors pass through
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            raise lease._busy(timeout, "another program was writing") from None
+        waited_ms = (time.monotonic() - start) * 1000
+        counts = {'transactions': 1, 'busy_retries': retries}
+        if waited_ms >= 1.0:
+            counts.update(contended=1, wait_ms_total=waited_ms, wait_ms_max=waited_ms)
+            recorder.record("db.write_wait", time.time() - waited_ms / 1000, waited_ms)
+        _stats.add(**counts)
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        lease.release()